@@ -1,37 +1,421 @@
-from flask import Flask, request, jsonify, abort
+from flask import Flask, Blueprint, current_app, request, jsonify, abort, Response, stream_with_context, g
+import gzip
 import logging
-from src.schedule_manager import ScheduleManager
+import os
+import threading
+import time
+from src.schedule_manager import ScheduleManager, warm_up
+from src.solver_settings import SolverSettings
+from src.solver_pool import warm_pool, default_workers
+from src.job_store import InMemoryJobStore, FileJobStore
+from src.job_runner import JobRunner, QueueFullError
+from src.schedule_cache import ScheduleCache
+from src.warm_start import parse_previous_schedules
+from src.metrics import MetricsRegistry, SIZE_BUCKETS
+from src.compact_format import to_compact, COMPACT_MIMETYPE
+from src.request_schema import normalize_request
+from src.feasibility import InfeasibleRequestError
+from src.time_grid import TimeGrid, DAYS
+from src.scenarios import build_scenarios, run_scenarios
+from src.timetable_store import InMemoryTimetableStore, FileTimetableStore, new_timetable
+from src.timetable_edits import edit_timetable, EditRejectedError
+from src.timetable_index import VIEWS
+from src.validator import validate_response
+from src import json_codec
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
+routes = Blueprint('scheduler', __name__)
 
-@app.route('/generate-schedule', methods=['POST'])
+
+class SchedulerService:
+    """
+    State shared by the requests of one application: job queue, schedule
+    cache and metrics. Configured from the environment, see create_app.
+    """
+
+    def __init__(self, environ):
+        # Background jobs: kept in memory unless SCHEDULER_JOB_DIR names a directory
+        job_dir = environ.get('SCHEDULER_JOB_DIR')
+        self.job_store = FileJobStore(job_dir) if job_dir else InMemoryJobStore()
+        self.job_runner = JobRunner(
+            self.job_store,
+            max_workers=int(environ.get('SCHEDULER_JOB_WORKERS', 2)),
+            max_queue=int(environ.get('SCHEDULER_JOB_QUEUE_DEPTH', 16))
+        )
+
+        # Solved schedules by request and by section; the disk tier is enabled by
+        # SCHEDULER_CACHE_DIR
+        self.schedule_cache = ScheduleCache(
+            max_entries=int(environ.get('SCHEDULER_CACHE_ENTRIES', 1024)),
+            directory=environ.get('SCHEDULER_CACHE_DIR'),
+            max_disk_bytes=int(environ.get('SCHEDULER_CACHE_DISK_BYTES', 256 * 1024 * 1024))
+        )
+
+        # Prometheus metrics of this process, served on /metrics
+        metrics = MetricsRegistry()
+        self.metrics = metrics
+        self.request_latency = metrics.histogram(
+            "scheduler_request_duration_seconds", "HTTP request latency by endpoint", labels=("endpoint",))
+        self.requests_total = metrics.counter(
+            "scheduler_requests_total", "HTTP requests by endpoint and status code", labels=("endpoint", "code"))
+        self.phase_latency = metrics.histogram(
+            "scheduler_phase_duration_seconds",
+            "Time spent per schedule request phase (parse, build, solve, extract, serialize)", labels=("phase",))
+        self.model_solve_latency = metrics.histogram(
+            "scheduler_model_solve_seconds", "CP-SAT solve time per model", labels=("solve_mode",))
+        self.model_variables = metrics.histogram(
+            "scheduler_model_variables", "Variables per CP-SAT model", labels=("solve_mode",),
+            buckets=SIZE_BUCKETS)
+        self.sections_total = metrics.counter(
+            "scheduler_sections_total", "Sections returned by status and source", labels=("status", "source"))
+        self.invalid_responses_total = metrics.counter(
+            "scheduler_invalid_responses_total", "Issues found by the post-solve validator, by type",
+            labels=("type",))
+        metrics.add_collector(self.cache_metrics)
+
+        # Stored timetables edited with deltas: kept in memory unless
+        # SCHEDULER_TIMETABLE_DIR names a directory
+        timetable_dir = environ.get('SCHEDULER_TIMETABLE_DIR')
+        self.timetable_store = FileTimetableStore(timetable_dir) if timetable_dir else InMemoryTimetableStore()
+
+        # SCHEDULER_VALIDATE_RESPONSES=1 checks every solved response with
+        # src.validator before it is returned
+        self.validate_responses = is_enabled(environ.get('SCHEDULER_VALIDATE_RESPONSES', False))
+
+        # Scenarios accepted by one POST /scenarios
+        self.max_scenarios = int(environ.get('SCHEDULER_MAX_SCENARIOS', 32))
+
+        # Set while the solver is being loaded ahead of the first request
+        self.warming = threading.Event()
+
+    def cache_metrics(self):
+        stats = self.schedule_cache.stats()
+        return [
+            ("scheduler_cache_hits_total", "counter", "Schedule cache hits", stats["hits"]),
+            ("scheduler_cache_misses_total", "counter", "Schedule cache misses", stats["misses"]),
+            ("scheduler_cache_memory_entries", "gauge", "Entries in the in-memory cache tier",
+             stats["memory_entries"])
+        ]
+
+    def prewarm(self):
+        """
+        Load the solver in this process and start the solver pool workers,
+        each with a tiny solve, so the first request runs at steady-state
+        speed. Runs in a background thread; GET /ready answers 503 meanwhile.
+        """
+        self.warming.set()
+        try:
+            logger.info(f"Solver warmed up in {warm_up():.2f}s")
+            # Requests only use the pool when more than one worker is allowed
+            if default_workers() > 1:
+                for future in warm_pool(warm_up):
+                    future.result()
+                logger.info("Solver pool warmed up")
+        except Exception as e:
+            logger.error(f"Solver warm-up failed: {str(e)}")
+        finally:
+            self.warming.clear()
+
+
+def create_app(config=None, environ=None):
+    """
+    Application factory, e.g. `gunicorn "app:create_app()"` or wsgi.py.
+    Solver settings come from the SCHEDULER_* environment variables (see
+    SolverSettings.FIELDS); SCHEDULER_PREWARM=1 loads the solver and starts
+    the pool workers at startup instead of on the first request.
+    :param config: Flask configuration overrides, e.g. {"SOLVER_SETTINGS": SolverSettings(...)}
+    :param environ: Environment to read, os.environ when omitted
+    """
+    environ = os.environ if environ is None else environ
+    app = Flask(__name__)
+    # Server-level solver defaults and time limits, see SolverSettings.FIELDS
+    app.config['SOLVER_SETTINGS'] = SolverSettings.from_env(environ)
+    app.config['SOLVER_PREWARM'] = is_enabled(environ.get('SCHEDULER_PREWARM', False))
+    app.config.update(config or {})
+
+    service = SchedulerService(environ)
+    app.extensions['scheduler'] = service
+    app.register_blueprint(routes)
+
+    if app.config['SOLVER_PREWARM']:
+        service.warming.set()
+        threading.Thread(target=service.prewarm, name="solver-prewarm", daemon=True).start()
+    return app
+
+
+def current_service():
+    return current_app.extensions['scheduler']
+
+
+def is_enabled(value):
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+def create_schedule_manager(service, settings, data, args, cache=None, **kwargs):
+    """
+    Validate a schedule request and build its ScheduleManager.
+    Raises ValueError for invalid requests.
+    :param service: SchedulerService of the application
+    :param settings: Server SolverSettings the request may override
+    :param data: Request body
+    :param args: Query string parameters
+    :param cache: ScheduleCache to use instead of the service cache
+    """
+    if 'middle_school' not in data and 'high_school' not in data:
+        raise ValueError("At least one of 'middle_school' or 'high_school' must be provided")
+
+    rooms = data.get('rooms', [])
+    teachers = data.get('teachers', [])
+
+    if not rooms:
+        raise ValueError("Rooms data is missing or empty")
+    if not teachers:
+        raise ValueError("Teachers data is missing or empty")
+
+    # "section" (default), "level" or "school"
+    solve_mode = args.get('solve_mode', data.get('solve_mode', 'section'))
+
+    # "exact" (default, CP-SAT) or "fast" (greedy only)
+    mode = args.get('mode', data.get('mode', 'exact'))
+
+    # Days and periods, {"time_grid": {"days": [...], "slots": [...], ...}};
+    # the fixed 5-day x 8-slot week when omitted
+    grid = None
+    if data.get('time_grid') is not None:
+        grid = TimeGrid.from_dict(data['time_grid'])
+
+    # "sessions", "compact" or "interval" per-section model; "interval"
+    # scales best on fine grids and is the default when a grid is given
+    formulation = args.get('formulation', data.get('formulation', 'interval' if grid else 'sessions'))
+
+    # Request-level overrides, e.g. {"solver": {"max_time_per_section": 5}}
+    settings = settings.merge(data.get('solver', {}))
+
+    # Warm start from a previous response: {"previous": {...}, "minimize_changes": true}
+    previous = None
+    if data.get('previous') is not None:
+        previous = parse_previous_schedules(data['previous'], grid.days if grid else DAYS)
+    minimize_changes = bool(data.get('minimize_changes', False))
+
+    if cache is None and wants_cache(data, args):
+        cache = service.schedule_cache
+
+    return ScheduleManager(
+        data, rooms, teachers, solve_mode=solve_mode, formulation=formulation,
+        settings=settings, cache=cache,
+        previous=previous, minimize_changes=minimize_changes, mode=mode, grid=grid, **kwargs
+    )
+
+
+def wants_cache(data, args):
+    """?cache=0 forces a fresh solve."""
+    return str(args.get('cache', data.get('cache', True))).lower() not in ('0', 'false', 'no')
+
+
+def read_json_body():
+    """Parse the request body with the fast codec, None when it is missing or malformed."""
+    try:
+        return json_codec.loads(request.get_data(cache=False))
+    except ValueError:
+        return None
+
+
+def wants_diagnostics(data, args):
+    """?diagnostics=1 or {"diagnostics": true} adds a diagnostics block to the response."""
+    return is_enabled(args.get('diagnostics', data.get('diagnostics', False)))
+
+
+def record_run(service, schedule_manager, phases):
+    """
+    Feed the metrics of `service` with a finished run.
+    :param phases: Request phases measured outside the manager, e.g. parse and serialize
+    """
+    for phase, elapsed in dict(schedule_manager.timings, **phases).items():
+        if phase != 'total':
+            service.phase_latency.observe(elapsed, phase=phase)
+    for timings, stats in schedule_manager.model_runs:
+        if 'solve' in timings:
+            service.model_solve_latency.observe(timings['solve'], solve_mode=schedule_manager.solve_mode)
+        if 'variables' in stats:
+            service.model_variables.observe(stats['variables'], solve_mode=schedule_manager.solve_mode)
+    if schedule_manager.request_cache_hit:
+        service.sections_total.inc(len(schedule_manager.sections), status="cached", source="request_cache")
+        return
+    for section in schedule_manager.diagnostics()['sections']:
+        service.sections_total.inc(status=section.get('status', 'unknown'), source=section.get('source', 'unknown'))
+
+
+def check_response(service, data, schedules, phases):
+    """
+    Post-solve guard: validate a response against its request when
+    SCHEDULER_VALIDATE_RESPONSES is set, logging and counting its issues.
+    The response is returned either way.
+    :return: Report of src.validator, None when validation is disabled
+    """
+    if not service.validate_responses:
+        return None
+    report = validate_response(data, schedules, max_issues=20)
+    phases['validate'] = report['time']
+    if not report['valid']:
+        for kind, count in report['counts'].items():
+            service.invalid_responses_total.inc(count, type=kind)
+        logger.error(f"Invalid schedule response: {report['counts']}")
+    return report
+
+
+def run_diagnostics(schedule_manager, phases):
+    diagnostics = schedule_manager.diagnostics()
+    diagnostics['timings'] = dict(phases, **diagnostics['timings'])
+    return diagnostics
+
+
+def server_timing(timings):
+    return ", ".join(f"{phase};dur={elapsed * 1000:.1f}" for phase, elapsed in timings.items())
+
+
+def count_sections(data):
+    return sum(
+        len(year_entry.get('sections', []))
+        for level in ('middle_school', 'high_school')
+        for year_entry in data.get(level, {}).get('years', [])
+    )
+
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def wants_stream():
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def wants_compact():
+    """?format=compact or "Accept: application/vnd.timetable.compact+json"."""
+    if request.args.get('format', '').lower() == 'compact':
+        return True
+    return request.accept_mimetypes.best == COMPACT_MIMETYPE
+
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+
+def schedule_response(body, status=200):
+    """
+    JSON response of schedules in the default shape or the compact columnar
+    one, encoded straight to bytes and gzip-encoded when the client accepts it.
+    """
+    if wants_compact():
+        response = Response(json_codec.dumps(to_compact(body)), status=status, mimetype=COMPACT_MIMETYPE)
+    else:
+        # Sorted keys like jsonify, so the default bytes keep their order
+        response = Response(json_codec.dumps(body, sort_keys=True), status=status,
+                            mimetype='application/json')
+    response.vary.add('Accept')
+    return compress_response(response)
+
+
+def compress_response(response):
+    """gzip-encode a response when the client accepts it and it is worth it."""
+    response.vary.add('Accept-Encoding')
+    if 'gzip' in request.accept_encodings and response.content_length >= GZIP_MIN_BYTES:
+        response.set_data(gzip.compress(response.get_data(), compresslevel=5))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+def stream_schedules(service, schedule_manager, phases, diagnostics=False):
+    """
+    One JSON line per section as soon as it is solved, then a summary line.
+    Sections arrive in completion order; each line names its level and year.
+    :param phases: Request phases measured so far, serialization is added
+    :param diagnostics: Add the diagnostics block to the summary line
+    """
+    statuses = {}
+    phases = dict(phases, serialize=0.0)
+    try:
+        for _, section_result in schedule_manager.iter_section_schedules():
+            statuses[section_result['status']] = statuses.get(section_result['status'], 0) + 1
+            start = time.perf_counter()
+            line = json_codec.dumps(section_result) + b"\n"
+            phases['serialize'] += time.perf_counter() - start
+            yield line
+        summary = {
+            "sections": len(schedule_manager.sections),
+            "statuses": statuses,
+            "timings": schedule_manager.timings
+        }
+        if schedule_manager.custom_grid:
+            summary["time_grid"] = schedule_manager.grid.to_dict()
+        if diagnostics:
+            summary["diagnostics"] = run_diagnostics(schedule_manager, phases)
+        record_run(service, schedule_manager, phases)
+        yield json_codec.dumps({"summary": summary}) + b"\n"
+        logger.info("Successfully streamed schedules")
+    except Exception as e:
+        # Headers are already sent, report the failure in-band
+        logger.error(f"Unexpected error while streaming schedules: {str(e)}")
+        yield json_codec.dumps({"error": f"Internal server error: {str(e)}"}) + b"\n"
+
+
+@routes.before_app_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+
+@routes.after_app_request
+def record_request(response):
+    # Streamed responses are counted when their headers are sent
+    endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+    service = current_service()
+    service.request_latency.observe(time.perf_counter() - g.request_start, endpoint=endpoint)
+    service.requests_total.inc(endpoint=endpoint, code=response.status_code)
+    return response
+
+
+@routes.route('/generate-schedule', methods=['POST'])
 def generate_schedule():
-    data = request.json
+    start = time.perf_counter()
+    data = read_json_body()
     if not data:
         abort(400, "Request body is missing or not in JSON format")
-    
-    try:
-        if 'middle_school' not in data and 'high_school' not in data:
-            abort(400, "At least one of 'middle_school' or 'high_school' must be provided")
-        
-        rooms = data.get('rooms', [])
-        teachers = data.get('teachers', [])
-        
-        if not rooms:
-            abort(400, "Rooms data is missing or empty")
-        if not teachers:
-            abort(400, "Teachers data is missing or empty")
-
-        schedule_manager = ScheduleManager(data, rooms, teachers)
+
+    try:
+        normalize_request(data)
+        service = current_service()
+        schedule_manager = create_schedule_manager(service, current_app.config['SOLVER_SETTINGS'],
+                                                   data, request.args)
+        diagnostics = wants_diagnostics(data, request.args)
+        phases = {"parse": time.perf_counter() - start}
+        schedule_manager.check_feasibility()
+
+        # NDJSON via "Accept: application/x-ndjson" or ?stream=1
+        if wants_stream():
+            return Response(stream_with_context(stream_schedules(service, schedule_manager, phases, diagnostics)),
+                            mimetype=NDJSON_MIMETYPE)
+
         schedules = schedule_manager.generate_schedules()
 
         logger.info("Successfully generated schedules")
 
-        return jsonify(schedules), 200
-    
+        validation = check_response(service, data, schedules, phases)
+        if diagnostics:
+            schedules = dict(schedules, diagnostics=run_diagnostics(schedule_manager, phases))
+            if validation is not None:
+                schedules['diagnostics']['validation'] = validation
+        start = time.perf_counter()
+        response = schedule_response(schedules)
+        phases['serialize'] = time.perf_counter() - start
+        record_run(service, schedule_manager, phases)
+        response.headers['Server-Timing'] = server_timing(dict(schedule_manager.timings, **phases))
+
+        return response
+
+    except InfeasibleRequestError as e:
+        return jsonify({"error": str(e), "problems": e.problems}), 422
     except KeyError as e:
         logger.error(f"Key error during schedule generation: {str(e)}")
         return jsonify({"error": f"Missing key in request data: {str(e)}"}), 400
@@ -43,5 +427,279 @@ def generate_schedule():
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 
+@routes.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queue a schedule generation; poll GET /jobs/<id> for the result."""
+    data = read_json_body()
+    if not data:
+        abort(400, "Request body is missing or not in JSON format")
+
+    try:
+        # Validate up front so a bad payload fails the POST, not the job
+        normalize_request(data)
+        args = request.args.to_dict()
+        # Jobs run outside the application context
+        service = current_service()
+        settings = current_app.config['SOLVER_SETTINGS']
+        create_schedule_manager(service, settings, data, args).check_feasibility()
+
+        def work(progress_callback, cancel_event):
+            start = time.perf_counter()
+            schedule_manager = create_schedule_manager(
+                service, settings, data, args, progress_callback=progress_callback, cancel_event=cancel_event
+            )
+            phases = {"parse": time.perf_counter() - start}
+            schedules = schedule_manager.generate_schedules()
+            validation = check_response(service, data, schedules, phases)
+            record_run(service, schedule_manager, phases)
+            if wants_diagnostics(data, args):
+                schedules = dict(schedules, diagnostics=run_diagnostics(schedule_manager, phases))
+                if validation is not None:
+                    schedules['diagnostics']['validation'] = validation
+            return schedules
+
+        job = service.job_runner.submit(work, total=count_sections(data))
+        logger.info(f"Queued schedule job {job['id']}")
+        return jsonify({"id": job['id'], "status": job['status']}), 202
+
+    except QueueFullError as e:
+        return jsonify({"error": str(e)}), 429
+    except InfeasibleRequestError as e:
+        return jsonify({"error": str(e), "problems": e.problems}), 422
+    except KeyError as e:
+        logger.error(f"Key error in job request: {str(e)}")
+        return jsonify({"error": f"Missing key in request data: {str(e)}"}), 400
+    except ValueError as ve:
+        logger.error(f"Validation error: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        logger.error(f"Unexpected error while queueing a job: {str(e)}")
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@routes.route('/scenarios', methods=['POST'])
+def solve_scenarios():
+    """
+    What-if comparison: {"base": <schedule request>, "scenarios": [{"name":
+    ..., "changes": [...]}]} with the changes of src.scenarios.CHANGE_OPS.
+    The base is solved first and the scenarios concurrently after it;
+    sections a scenario does not change are shared with the base through
+    the cache (a cache private to the call with ?cache=0). Every scenario
+    reports feasibility, statuses, solve time and the sections that differ
+    from the base; ?schedules=0 leaves the schedules out.
+    """
+    data = read_json_body()
+    if not isinstance(data, dict) or not isinstance(data.get('base'), dict):
+        abort(400, "Request body must be a JSON object with a 'base' schedule request")
+
+    try:
+        service = current_service()
+        base = normalize_request(data['base'])
+        scenarios = build_scenarios(base, data.get('scenarios', []))
+        if len(scenarios) > service.max_scenarios:
+            raise ValueError(f"At most {service.max_scenarios} scenarios are accepted per call")
+
+        args = request.args
+        settings = current_app.config['SOLVER_SETTINGS']
+        cache = service.schedule_cache if wants_cache(base, args) else ScheduleCache()
+        base_manager = create_schedule_manager(service, settings, base, args, cache=cache)
+        scenario_managers = [
+            (name, create_schedule_manager(service, settings, scenario, args, cache=cache))
+            for name, scenario in scenarios
+        ]
+        results = run_scenarios(base_manager, scenario_managers, default_workers())
+        managers = [base_manager] + [schedule_manager for _, schedule_manager in scenario_managers]
+        for schedule_manager, result in zip(managers, [results['base']] + results['scenarios']):
+            if result['schedules'] is not None:
+                record_run(service, schedule_manager, {})
+
+        if not is_enabled(args.get('schedules', True)):
+            for result in [results['base']] + results['scenarios']:
+                del result['schedules']
+        logger.info(f"Solved {len(scenarios)} scenarios")
+        return compress_response(Response(json_codec.dumps(results, sort_keys=True), mimetype='application/json'))
+
+    except KeyError as e:
+        logger.error(f"Key error in scenario request: {str(e)}")
+        return jsonify({"error": f"Missing key in request data: {str(e)}"}), 400
+    except ValueError as ve:
+        logger.error(f"Validation error: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        logger.error(f"Unexpected error while solving scenarios: {str(e)}")
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@routes.route('/timetables', methods=['POST'])
+def create_timetable():
+    """
+    Solve a schedule request and store the result as a timetable that
+    POST /timetables/<id>/edits then changes in place. Stored timetables
+    are solved per level by default, so no teacher is booked twice.
+    """
+    data = read_json_body()
+    if not data:
+        abort(400, "Request body is missing or not in JSON format")
+
+    try:
+        normalize_request(data)
+        data.pop('previous', None)
+        data.setdefault('solve_mode', 'level')
+        service = current_service()
+        schedule_manager = create_schedule_manager(service, current_app.config['SOLVER_SETTINGS'],
+                                                   data, request.args)
+        schedules = schedule_manager.generate_schedules()
+        record_run(service, schedule_manager, {})
+        timetable = service.timetable_store.create(new_timetable(data, schedules))
+        logger.info(f"Stored timetable {timetable['id']}")
+        return schedule_response({"id": timetable['id'], "version": timetable['version'],
+                                  "schedules": schedules}, status=201)
+
+    except InfeasibleRequestError as e:
+        return jsonify({"error": str(e), "problems": e.problems}), 422
+    except KeyError as e:
+        logger.error(f"Key error in timetable request: {str(e)}")
+        return jsonify({"error": f"Missing key in request data: {str(e)}"}), 400
+    except ValueError as ve:
+        logger.error(f"Validation error: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        logger.error(f"Unexpected error while storing a timetable: {str(e)}")
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@routes.route('/timetables/<timetable_id>', methods=['GET'])
+def get_timetable(timetable_id):
+    timetable = current_service().timetable_store.get(timetable_id)
+    if timetable is None:
+        return jsonify({"error": f"Unknown timetable {timetable_id}"}), 404
+    return compress_response(Response(json_codec.dumps(timetable, sort_keys=True), mimetype='application/json'))
+
+
+@routes.route('/timetables/<timetable_id>', methods=['DELETE'])
+def delete_timetable(timetable_id):
+    if not current_service().timetable_store.delete(timetable_id):
+        return jsonify({"error": f"Unknown timetable {timetable_id}"}), 404
+    return jsonify({"id": timetable_id, "deleted": True}), 200
+
+
+@routes.route('/timetables/<timetable_id>/<view>/<name>', methods=['GET'])
+def query_timetable(timetable_id, view, name):
+    """
+    Entries of one teacher, room, section or day of a stored timetable,
+    e.g. GET /timetables/<id>/teachers/HS_Teacher_Math_0?day=mardi or
+    GET /timetables/<id>/rooms/HS_Room_1S1?day=mardi&slot=3, answered from
+    the timetable's index without reading the whole timetable. Optional
+    query parameters: day, slot (1-based, with a day) and level.
+    """
+    if view not in VIEWS:
+        return jsonify({"error": f"Unknown view '{view}', expected one of {', '.join(VIEWS)}"}), 404
+    index = current_service().timetable_store.index(timetable_id)
+    if index is None:
+        return jsonify({"error": f"Unknown timetable {timetable_id}"}), 404
+    field = VIEWS[view]
+    if not index.knows(field, name):
+        return jsonify({"error": f"Unknown {field} '{name}' in timetable {timetable_id}"}), 404
+
+    try:
+        slot = request.args.get('slot')
+        if slot is not None:
+            try:
+                slot = int(slot)
+            except ValueError:
+                raise ValueError("'slot' must be a slot number")
+        day = request.args.get('day')
+        level = request.args.get('level')
+        entries = index.lookup(field, name, day=day, slot=slot, level=level)
+    except ValueError as ve:
+        return jsonify({"error": str(ve)}), 400
+
+    body = {"id": index.id, "version": index.version, field: name, "entries": entries}
+    for parameter, value in (("day", day), ("slot", slot), ("level", level)):
+        if value is not None:
+            body[parameter] = value
+    return Response(json_codec.dumps(body), mimetype='application/json')
+
+
+@routes.route('/timetables/<timetable_id>/edits', methods=['POST'])
+def edit_stored_timetable(timetable_id):
+    """
+    Apply {"changes": [...], "version": n} to a stored timetable, see
+    src.timetable_edits.EDIT_OPS. Only the sections the changes affect are
+    re-solved; the response lists the entries added and removed per
+    section. A "version" other than the stored one answers 409.
+    """
+    data = read_json_body()
+    if not data:
+        abort(400, "Request body is missing or not in JSON format")
+
+    service = current_service()
+    store = service.timetable_store
+    try:
+        with store.edit_lock(timetable_id):
+            timetable = store.get(timetable_id)
+            if timetable is None:
+                return jsonify({"error": f"Unknown timetable {timetable_id}"}), 404
+            if data.get('version') is not None and data['version'] != timetable['version']:
+                return jsonify({"error": f"Timetable {timetable_id} is at version {timetable['version']}",
+                                "version": timetable['version']}), 409
+
+            settings = current_app.config['SOLVER_SETTINGS'].merge(timetable['request'].get('solver', {}))
+            edit = edit_timetable(timetable, data.get('changes', []), settings)
+            store.put(timetable)
+        logger.info(f"Edited timetable {timetable_id}: {edit['resolved_sections']} sections re-solved")
+        return jsonify(dict(edit, id=timetable_id, version=timetable['version'])), 200
+
+    except EditRejectedError as e:
+        return jsonify({"error": str(e), "status": e.status}), 422
+    except KeyError as e:
+        logger.error(f"Key error in timetable edit: {str(e)}")
+        return jsonify({"error": f"Missing key in request data: {str(e)}"}), 400
+    except ValueError as ve:
+        logger.error(f"Validation error: {str(ve)}")
+        return jsonify({"error": str(ve)}), 400
+    except Exception as e:
+        logger.error(f"Unexpected error while editing timetable {timetable_id}: {str(e)}")
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@routes.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = current_service().job_store.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job {job_id}"}), 404
+    if job['result'] is not None and wants_compact():
+        job['result'] = to_compact(job['result'])
+        return Response(json_codec.dumps(job), mimetype=COMPACT_MIMETYPE)
+    return jsonify(job), 200
+
+
+@routes.route('/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    job = current_service().job_runner.cancel(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job {job_id}"}), 404
+    return jsonify({"id": job['id'], "status": job['status']}), 200
+
+
+@routes.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(current_service().schedule_cache.stats()), 200
+
+
+@routes.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    return Response(current_service().metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+@routes.route('/ready', methods=['GET'])
+def ready():
+    """Readiness probe: 503 while the solver is still being warmed up."""
+    if current_service().warming.is_set():
+        return jsonify({"status": "warming"}), 503
+    return jsonify({"status": "ready"}), 200
+
+
 if __name__ == '__main__':
-    app.run(debug=True)
+    # Development server; see wsgi.py for production
+    create_app().run(debug=True)
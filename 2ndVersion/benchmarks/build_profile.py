@@ -0,0 +1,63 @@
+"""
+Model-construction profile for ScheduleGenerator.
+
+Builds (without solving) the model of one synthetic section for a grid of
+session and teacher counts and prints the build time per variable. The
+session formulation creates sessions x teachers-of-the-subject x slots
+variables, so a flat us/var column means construction is linear.
+
+Run from 2ndVersion/:
+    python -m benchmarks.build_profile
+"""
+import logging
+import time
+
+from src.schedule_generator import ScheduleGenerator, FORMULATIONS
+from src.schedule_index import ScheduleIndex
+
+SUBJECTS = ["Math", "Arabic", "French", "English", "Science",
+            "Physics", "Islamic", "History and Geography"]
+
+
+def make_instance(sessions_per_subject, teachers_per_subject):
+    section = {
+        "section": "1S1",
+        "stream": "science",
+        "subjects": [{"name": name, "coef": sessions_per_subject} for name in SUBJECTS]
+    }
+    teachers = [
+        {"name": f"HS_Teacher_{name}_{i}", "subjects": [{"name": name}]}
+        for name in SUBJECTS
+        for i in range(teachers_per_subject)
+    ]
+    rooms = [{"name": "HS_Room_1S1", "type": "general"}]
+    return section, rooms, teachers
+
+
+def profile(formulation, sessions_per_subject, teachers_per_subject, repeat=3):
+    section, rooms, teachers = make_instance(sessions_per_subject, teachers_per_subject)
+    index = ScheduleIndex(rooms, teachers)
+    best = None
+    for _ in range(repeat):
+        generator = ScheduleGenerator("high_school", 1, section, rooms, teachers,
+                                      formulation=formulation, index=index)
+        start = time.perf_counter()
+        generator.build_model()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, generator.stats
+
+
+if __name__ == "__main__":
+    logging.disable(logging.INFO)
+    print(f"{'formulation':<12}{'sessions':>10}{'teachers':>10}{'variables':>11}"
+          f"{'build ms':>10}{'us/var':>8}")
+    for formulation in FORMULATIONS:
+        for sessions_per_subject in (1, 2, 4):
+            for teachers_per_subject in (1, 2, 4, 8):
+                elapsed, stats = profile(formulation, sessions_per_subject, teachers_per_subject)
+                num_sessions = sessions_per_subject * len(SUBJECTS)
+                num_teachers = teachers_per_subject * len(SUBJECTS)
+                print(f"{formulation:<12}{num_sessions:>10}{num_teachers:>10}"
+                      f"{stats['variables']:>11}{elapsed * 1000:>10.1f}"
+                      f"{elapsed * 1e6 / stats['variables']:>8.1f}")
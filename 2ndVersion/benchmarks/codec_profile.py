@@ -0,0 +1,141 @@
+"""
+Request parsing and response serialization profile.
+
+Compares the former path (json.loads of the body, jsonify-style
+json.dumps with sorted keys) with the json_codec path (orjson when it is
+installed, followed by request_schema.normalize_request) on a synthetic
+district, and the default response shape with the compact one. Every
+measurement runs in a fresh process that only imports what its path
+needs, so the peak RSS belongs to that path alone.
+
+Run from 2ndVersion/:
+    python -m benchmarks.codec_profile --sections-per-year 300
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.run_benchmarks import peak_memory_mb
+
+PATHS = ("parse-stdlib", "parse-codec", "emit-stdlib", "emit-codec", "emit-codec-compact")
+
+
+def fake_schedules(data):
+    """A response for `data` with every session placed, slots taken in order."""
+    from src.schedule_generator import DAYS, TIME_SLOTS, describe_slot, is_sport
+
+    schedules = {}
+    for level, prefix in (("middle_school", "MS"), ("high_school", "HS")):
+        if level not in data:
+            continue
+        years = []
+        for year_entry in data[level]['years']:
+            sections = []
+            for section in year_entry['sections']:
+                schedule = []
+                position = 0
+                for subject in section['subjects']:
+                    for _ in range(subject['coef']):
+                        d, s = divmod(position, len(TIME_SLOTS))
+                        if is_sport(subject['name']) and s % 2:
+                            position += 1
+                            d, s = divmod(position, len(TIME_SLOTS))
+                        time_str, slot_label = describe_slot(TIME_SLOTS, subject['name'], s)
+                        position += 2 if is_sport(subject['name']) else 1
+                        schedule.append({
+                            "day": DAYS[d % len(DAYS)],
+                            "room": f"{prefix}_Room_{section['section']}",
+                            "subject": subject['name'],
+                            "teacher": f"{prefix}_Teacher_{subject['name']}_0",
+                            "time": time_str,
+                            "slot": slot_label,
+                            "section": section['section'],
+                            "stream": section.get('stream')
+                        })
+                sections.append({"section": section['section'], "stream": section.get('stream'),
+                                 "schedule": schedule, "status": "OPTIMAL"})
+            years.append({"year": year_entry['year'], "sections": sections})
+        schedules[level] = {"years": years}
+    return schedules
+
+
+def measure(path, input_path):
+    """Run one path on the file at input_path in this process."""
+    with open(input_path, "rb") as f:
+        payload = f.read()
+    value = json.loads(payload) if path.startswith("emit") else None
+
+    if path == "parse-stdlib":
+        start = time.perf_counter()
+        result = json.loads(payload)
+    elif path == "parse-codec":
+        from src import json_codec
+        from src.request_schema import normalize_request
+        start = time.perf_counter()
+        result = normalize_request(json_codec.loads(payload))
+    elif path == "emit-stdlib":
+        start = time.perf_counter()
+        result = json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    elif path == "emit-codec":
+        from src import json_codec
+        start = time.perf_counter()
+        result = json_codec.dumps(value, sort_keys=True)
+    else:
+        from src import json_codec
+        from src.compact_format import to_compact
+        start = time.perf_counter()
+        result = json_codec.dumps(to_compact(value))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "path": path,
+        "seconds": elapsed,
+        "peak_rss_mb": peak_memory_mb(),
+        "output_bytes": len(result) if isinstance(result, bytes) else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections-per-year", type=int, default=300)
+    parser.add_argument("--run-path", nargs=2, metavar=("PATH", "INPUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_path:
+        print(json.dumps(measure(*args.run_path)))
+        return
+
+    from benchmarks.instances import generate_instance
+    from src import json_codec
+
+    data = generate_instance(sections_per_year=args.sections_per_year)
+    with tempfile.TemporaryDirectory() as tmp:
+        request_path = os.path.join(tmp, "request.json")
+        response_path = os.path.join(tmp, "response.json")
+        with open(request_path, "w") as f:
+            json.dump(data, f)
+        with open(response_path, "w") as f:
+            json.dump(fake_schedules(data), f)
+
+        print(f"codec backend: {json_codec.BACKEND}, request {os.path.getsize(request_path)} bytes, "
+              f"response {os.path.getsize(response_path)} bytes")
+        print(f"{'path':<22}{'ms':>10}{'peak MB':>10}{'bytes':>12}")
+        for path in PATHS:
+            input_path = request_path if path.startswith("parse") else response_path
+            completed = subprocess.run(
+                [sys.executable, "-m", "benchmarks.codec_profile", "--run-path", path, input_path],
+                capture_output=True, text=True, check=True
+            )
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            memory = result['peak_rss_mb']
+            print(f"{path:<22}{result['seconds'] * 1000:>10.1f}"
+                  f"{memory if memory is not None else float('nan'):>10.1f}"
+                  f"{result['output_bytes'] or '':>12}")
+
+
+if __name__ == "__main__":
+    main()
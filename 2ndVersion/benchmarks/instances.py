@@ -0,0 +1,134 @@
+"""
+Synthetic school instances for benchmarks.
+
+generate_instance() builds a request body in the format of
+script.py::generate_sample_data (levels, teachers, rooms) with a chosen
+number of sections per year, a coef profile, a sport load and a teacher
+supply derived from the available slots:
+
+- "tight": the fewest teachers per subject that can cover the weekly
+  sessions of every section of the level on the grid,
+- "loose": twice as many.
+
+The same arguments and seed always produce the same instance.
+"""
+import math
+import random
+
+from src.time_grid import DAYS, TIME_SLOTS
+
+# Weekly sessions per subject, Sport is set separately
+COEF_PROFILES = {
+    "standard": {"Math": 4, "Arabic": 5, "French": 3, "English": 2, "Science": 2,
+                 "Physics": 2, "Islamic": 1, "History and Geography": 3},
+    "light": {"Math": 3, "Arabic": 3, "French": 2, "English": 2, "Science": 1,
+              "Physics": 1, "Islamic": 1, "History and Geography": 2},
+    "heavy": {"Math": 6, "Arabic": 6, "French": 4, "English": 3, "Science": 3,
+              "Physics": 3, "Islamic": 2, "History and Geography": 4}
+}
+
+TIGHTNESS = ("tight", "loose")
+
+LEVELS = {
+    # level: (teacher/room prefix, number of years, section letters)
+    "middle_school": ("MS", 4, ("M",)),
+    "high_school": ("HS", 3, ("S", "L"))
+}
+
+STREAMS = {"S": "science", "L": "litterature"}
+
+
+def section_subjects(profile, sport_sessions, coef_jitter, rng):
+    subjects = []
+    for name, coef in COEF_PROFILES[profile].items():
+        if coef_jitter:
+            coef = max(1, coef + rng.randint(-coef_jitter, coef_jitter))
+        subjects.append({"name": name, "coef": coef})
+    if sport_sessions:
+        subjects.append({"name": "Sport", "coef": sport_sessions})
+    return subjects
+
+
+def weekly_slots(subjects):
+    """Slots taken by a week of `subjects`; a sport session takes two."""
+    return sum(s['coef'] * (2 if s['name'].lower() == "sport" else 1) for s in subjects)
+
+
+def generate_instance(sections_per_year=2, levels=("middle_school", "high_school"),
+                      coef_profile="standard", sport_sessions=1, tightness="loose",
+                      teachers_per_subject=None, coef_jitter=0, multi_subject=0.0,
+                      days=len(DAYS), slots_per_day=len(TIME_SLOTS), seed=0):
+    """
+    :param sections_per_year: Sections in every year of every level
+    :param levels: Levels to generate
+    :param coef_profile: Key of COEF_PROFILES
+    :param sport_sessions: Weekly two-slot sport sessions per section
+    :param tightness: One of TIGHTNESS, ignored when teachers_per_subject is given
+    :param teachers_per_subject: Fixed teacher count per subject and level
+    :param coef_jitter: Each section's coefs vary by up to this many sessions
+    :param multi_subject: Share of teachers who also teach a second subject
+    :param days: Days of the grid the teacher supply is computed for
+    :param slots_per_day: Slots per day of that grid
+    :param seed: Random seed of the jitter and the second subjects
+    :return: Request body {"middle_school": ..., "high_school": ..., "teachers": [...], "rooms": [...]}
+    """
+    if coef_profile not in COEF_PROFILES:
+        raise ValueError(f"Unknown coef profile '{coef_profile}', expected one of {', '.join(COEF_PROFILES)}")
+    if tightness not in TIGHTNESS:
+        raise ValueError(f"Unknown tightness '{tightness}', expected one of {', '.join(TIGHTNESS)}")
+
+    rng = random.Random(seed)
+    grid_slots = days * slots_per_day
+    data = {"teachers": [], "rooms": []}
+
+    for level in levels:
+        prefix, num_years, letters = LEVELS[level]
+        years = []
+        demand = {}
+        for year in range(1, num_years + 1):
+            sections = []
+            for i in range(1, sections_per_year + 1):
+                letter = letters[(i - 1) % len(letters)]
+                name = f"{year}{letter}{i}"
+                subjects = section_subjects(coef_profile, sport_sessions, coef_jitter, rng)
+                if weekly_slots(subjects) > grid_slots:
+                    raise ValueError(f"Section {name} needs {weekly_slots(subjects)} slots, "
+                                     f"the grid has {grid_slots}")
+                section = {"section": name, "subjects": subjects}
+                if level == "high_school":
+                    section["stream"] = STREAMS[letter]
+                sections.append(section)
+                data["rooms"].append({"name": f"{prefix}_Room_{name}", "type": "general"})
+                for subject in subjects:
+                    length = 2 if subject['name'].lower() == "sport" else 1
+                    demand[subject['name']] = demand.get(subject['name'], 0) + subject['coef'] * length
+            years.append({"year": year, "sections": sections})
+        data[level] = {"years": years}
+
+        subject_names = list(demand)
+        for subject_name in subject_names:
+            if teachers_per_subject is not None:
+                count = teachers_per_subject
+            else:
+                count = math.ceil(demand[subject_name] / grid_slots)
+                if tightness == "loose":
+                    count *= 2
+            for i in range(count):
+                subjects = [{"name": subject_name}]
+                if len(subject_names) > 1 and rng.random() < multi_subject:
+                    second = rng.choice([s for s in subject_names if s != subject_name])
+                    subjects.append({"name": second})
+                data["teachers"].append({"name": f"{prefix}_Teacher_{subject_name}_{i}",
+                                         "subjects": subjects})
+    return data
+
+
+def count_sessions(data):
+    """Weekly sessions requested by every section of an instance."""
+    return sum(
+        subject['coef']
+        for level in LEVELS if level in data
+        for year_entry in data[level]['years']
+        for section in year_entry['sections']
+        for subject in section['subjects']
+    )
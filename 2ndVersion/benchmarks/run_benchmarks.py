@@ -0,0 +1,271 @@
+"""
+Scaling benchmark of the schedulers on synthetic instances.
+
+Every case of a suite is an instance of benchmarks.instances solved by one
+engine in a fresh Python process, so peak memory and import state are per
+case. For each case the runner records model build, solve and total time,
+peak memory, model size, solver statuses and the quality of the result
+(sessions placed, teacher and section double-bookings), then writes
+everything to a JSON file. Passing an earlier file with --compare prints
+the time ratio of every case found in both.
+
+Engines:
+    v1-greedy       1stVersion random greedy
+    v2-section      2ndVersion CP-SAT, one model per section
+    v2-compact      same with the compact formulation
+    v2-interval     same with the interval formulation
+    v2-level        one joint model per level
+    v2-school       one joint model for the whole request
+    v2-fast         greedy scheduler only (mode=fast)
+    v2-lns          greedy start repaired by large neighborhood search
+
+Run from 2ndVersion/:
+    python -m benchmarks.run_benchmarks --suite scale --output results.json
+    python -m benchmarks.run_benchmarks --suite scale --compare results.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+# (version directory, ScheduleManager arguments)
+ENGINES = {
+    "v1-greedy": ("1stVersion", {}),
+    "v2-section": ("2ndVersion", {"solve_mode": "section"}),
+    "v2-compact": ("2ndVersion", {"solve_mode": "section", "formulation": "compact"}),
+    "v2-interval": ("2ndVersion", {"solve_mode": "section", "formulation": "interval"}),
+    "v2-level": ("2ndVersion", {"solve_mode": "level"}),
+    "v2-school": ("2ndVersion", {"solve_mode": "school"}),
+    "v2-fast": ("2ndVersion", {"mode": "fast"}),
+    "v2-lns": ("2ndVersion", {"solve_mode": "lns"})
+}
+
+# Suite name -> list of (case name, generate_instance arguments)
+SUITES = {
+    "smoke": [
+        ("1x-standard", {"sections_per_year": 1}),
+    ],
+    "scale": [
+        (f"{n}x-standard-loose", {"sections_per_year": n})
+        for n in (1, 2, 4, 8)
+    ],
+    "tight": [
+        (f"{n}x-{profile}-tight", {"sections_per_year": n, "coef_profile": profile, "tightness": "tight"})
+        for profile in ("standard", "heavy")
+        for n in (2, 4)
+    ],
+    "mixed": [
+        (f"{n}x-jitter-multi", {"sections_per_year": n, "coef_jitter": 1, "multi_subject": 0.3,
+                                "sport_sessions": 2})
+        for n in (2, 4)
+    ]
+}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def peak_memory_mb():
+    """Peak resident memory of this process, None where it cannot be read."""
+    # VmHWM is reset by exec, ru_maxrss keeps the peak of the parent process
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def check_schedules(data, schedules):
+    """
+    Quality of a response: sessions placed against sessions requested and
+    double-bookings of teachers and sections (a sport session holds two
+    slots).
+    """
+    required = 0
+    placed = 0
+    teacher_slots = {}
+    section_slots = {}
+    for level in ("middle_school", "high_school"):
+        if level not in data:
+            continue
+        for year_entry in data[level]['years']:
+            required += sum(s['coef'] for section in year_entry['sections'] for s in section['subjects'])
+        for year_entry in schedules.get(level, {}).get('years', []):
+            for section in year_entry['sections']:
+                for entry in section['schedule']:
+                    placed += 1
+                    first, _, last = str(entry['slot']).partition("-")
+                    for slot in range(int(first), int(last or first) + 1):
+                        for slots, owner in ((teacher_slots, entry['teacher']),
+                                             (section_slots, (level, section['section']))):
+                            key = (owner, entry['day'], slot)
+                            slots[key] = slots.get(key, 0) + 1
+    return {
+        "sessions_required": required,
+        "sessions_placed": placed,
+        "teacher_conflicts": sum(n - 1 for n in teacher_slots.values() if n > 1),
+        "section_conflicts": sum(n - 1 for n in section_slots.values() if n > 1)
+    }
+
+
+def run_case(engine, instance_path, max_time_per_section, seed):
+    """
+    Solve one instance with one engine in the current process. Must run in
+    a fresh interpreter: both versions are imported as the `src` package.
+    """
+    version, options = ENGINES[engine]
+    sys.path.insert(0, os.path.join(ROOT, version))
+    logging.disable(logging.WARNING)
+    with open(instance_path) as f:
+        data = json.load(f)
+
+    result = {}
+    if version == "1stVersion":
+        import random
+        from src.schedule_manager import ScheduleManager
+        random.seed(seed)
+        start = time.perf_counter()
+        schedules = ScheduleManager(data, data['rooms'], data['teachers']).generate_schedules()
+        result["timings"] = {"total": time.perf_counter() - start}
+        result["stats"] = {}
+        result["statuses"] = {}
+    else:
+        from src.schedule_manager import ScheduleManager
+        from src.solver_settings import SolverSettings
+        settings = SolverSettings(max_time_per_section=max_time_per_section, random_seed=seed)
+        start = time.perf_counter()
+        manager = ScheduleManager(data, data['rooms'], data['teachers'], max_workers=1,
+                                  settings=settings, **options)
+        schedules = manager.generate_schedules()
+        total = time.perf_counter() - start
+        result["timings"] = dict(manager.timings, total=total)
+        result["stats"] = manager.stats
+        statuses = {}
+        for level_schedule in schedules.values():
+            for year_entry in level_schedule['years']:
+                for section in year_entry['sections']:
+                    statuses[section['status']] = statuses.get(section['status'], 0) + 1
+        result["statuses"] = statuses
+
+    result["quality"] = check_schedules(data, schedules)
+    result["peak_memory_mb"] = peak_memory_mb()
+    return result
+
+
+def spawn_case(engine, instance_path, args):
+    command = [sys.executable, "-m", "benchmarks.run_benchmarks", "--run-case", engine, instance_path,
+               "--time-limit", str(args.time_limit), "--seed", str(args.seed)]
+    completed = subprocess.run(command, capture_output=True, text=True,
+                               cwd=os.path.join(ROOT, "2ndVersion"))
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_suite(args):
+    from benchmarks.instances import generate_instance, count_sessions
+
+    engines = args.engines.split(",") if args.engines else list(ENGINES)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for case_name, instance_args in SUITES[args.suite]:
+            data = generate_instance(seed=args.seed, **instance_args)
+            instance_path = os.path.join(tmp, f"{case_name}.json")
+            with open(instance_path, "w") as f:
+                json.dump(data, f)
+            sections = sum(len(y['sections']) for level in ("middle_school", "high_school")
+                           if level in data for y in data[level]['years'])
+            for engine in engines:
+                record = {
+                    "case": case_name,
+                    "engine": engine,
+                    "instance": dict(instance_args, seed=args.seed),
+                    "sections": sections,
+                    "teachers": len(data['teachers']),
+                    "sessions": count_sessions(data)
+                }
+                record.update(spawn_case(engine, instance_path, args))
+                results.append(record)
+                print_record(record)
+    return results
+
+
+def print_record(record):
+    if "error" in record:
+        print(f"{record['case']:<24}{record['engine']:<12} error: {record['error']}")
+        return
+    timings = record['timings']
+    quality = record['quality']
+    memory = record['peak_memory_mb']
+    print(f"{record['case']:<24}{record['engine']:<12}{record['sections']:>5} sec"
+          f"{timings.get('build', 0.0):>9.3f}s{timings.get('solve', 0.0):>9.3f}s"
+          f"{timings['total']:>9.3f}s"
+          f"{memory if memory is not None else float('nan'):>8.0f}MB"
+          f"{record['stats'].get('variables', 0):>9} vars"
+          f"  placed {quality['sessions_placed']}/{quality['sessions_required']}"
+          f"  conflicts {quality['teacher_conflicts']}/{quality['section_conflicts']}"
+          f"  {record['statuses']}")
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(r['case'], r['engine']): r for r in json.load(f)['results'] if "error" not in r}
+    print(f"\n{'case':<24}{'engine':<12}{'baseline':>10}{'current':>10}{'ratio':>8}")
+    for record in results:
+        before = baseline.get((record['case'], record['engine']))
+        if before is None or "error" in record:
+            continue
+        old, new = before['timings']['total'], record['timings']['total']
+        print(f"{record['case']:<24}{record['engine']:<12}{old:>9.3f}s{new:>9.3f}s"
+              f"{new / old if old else float('nan'):>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--suite", choices=sorted(SUITES), default="smoke")
+    parser.add_argument("--engines", help=f"Comma-separated subset of {', '.join(ENGINES)}")
+    parser.add_argument("--time-limit", type=float, default=10.0, help="max_time_per_section in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON file the results are written to")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--run-case", nargs=2, metavar=("ENGINE", "INSTANCE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_case:
+        engine, instance_path = args.run_case
+        print(json.dumps(run_case(engine, instance_path, args.time_limit, args.seed)))
+        return
+
+    results = run_suite(args)
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "suite": args.suite,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "time_limit": args.time_limit,
+        "results": results
+    }
+    if args.compare:
+        compare(results, args.compare)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
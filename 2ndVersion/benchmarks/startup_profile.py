@@ -0,0 +1,146 @@
+"""
+Service startup profile: time from launching a server process to its first
+successful schedule response.
+
+Each variant starts the application in a fresh process behind a local
+WSGI server. The client waits until GET /ready answers 200, as a load
+balancer would, then posts a synthetic request (cache disabled) and
+finally a few more to measure the steady-state latency.
+
+Variants:
+    eager     solver imported before the app is created (former behaviour)
+    lazy      solver imported by the first request that needs it
+    prewarm   SCHEDULER_PREWARM=1: solver and pool workers warmed at startup
+
+Run from 2ndVersion/:
+    python -m benchmarks.startup_profile --sections-per-year 1
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+VARIANTS = ("eager", "lazy", "prewarm")
+
+
+def serve(port, eager):
+    """Run the application in this process until it is killed."""
+    import logging
+    from werkzeug.serving import make_server
+
+    logging.disable(logging.WARNING)
+    if eager:
+        import src.schedule_generator  # noqa: F401
+        import src.joint_schedule_generator  # noqa: F401
+    from app import create_app
+    make_server("127.0.0.1", port, create_app(), threaded=True).serve_forever()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def call(url, body=None):
+    """(status code, seconds) of one request, status None when the server is not listening yet."""
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=600) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, ConnectionError):
+        status = None
+    return status, time.perf_counter() - start
+
+
+def profile(variant, body, args):
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    environ = dict(os.environ, SCHEDULER_MAX_TIME_PER_SECTION=str(args.time_limit))
+    if variant == "prewarm":
+        environ['SCHEDULER_PREWARM'] = "1"
+    command = [sys.executable, "-m", "benchmarks.startup_profile", "--serve", str(port)]
+    if variant == "eager":
+        command.append("--eager")
+
+    launched = time.perf_counter()
+    server = subprocess.Popen(command, env=environ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        listening = None
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError(f"{variant} server exited with code {server.returncode}")
+            status, _ = call(f"{base}/ready")
+            if status is not None and listening is None:
+                listening = time.perf_counter() - launched
+            if status == 200:
+                break
+            time.sleep(0.01)
+        ready = time.perf_counter() - launched
+
+        status, first_latency = call(f"{base}/generate-schedule?cache=0", body)
+        if status != 200:
+            raise RuntimeError(f"{variant} server answered {status}")
+        first_response = time.perf_counter() - launched
+        steady = [call(f"{base}/generate-schedule?cache=0", body)[1] for _ in range(args.repeat)]
+    finally:
+        server.kill()
+        server.wait()
+
+    return {
+        "variant": variant,
+        "listening": listening,
+        "ready": ready,
+        "first_response": first_response,
+        "first_latency": first_latency,
+        "steady_latency": statistics.median(steady)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections-per-year", type=int, default=1)
+    parser.add_argument("--time-limit", type=float, default=10.0, help="max_time_per_section in seconds")
+    parser.add_argument("--repeat", type=int, default=3, help="Requests of the steady-state latency")
+    parser.add_argument("--variants", help=f"Comma-separated subset of {', '.join(VARIANTS)}")
+    parser.add_argument("--output", help="JSON file the results are written to")
+    parser.add_argument("--serve", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    parser.add_argument("--eager", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.eager)
+        return
+
+    from benchmarks.instances import generate_instance
+
+    body = json.dumps(generate_instance(sections_per_year=args.sections_per_year)).encode("utf-8")
+    variants = args.variants.split(",") if args.variants else list(VARIANTS)
+    print(f"{'variant':<10}{'listening':>11}{'ready':>9}{'first resp':>12}"
+          f"{'first req':>11}{'steady req':>12}")
+    results = []
+    for variant in variants:
+        result = profile(variant, body, args)
+        results.append(result)
+        print(f"{variant:<10}{result['listening']:>10.2f}s{result['ready']:>8.2f}s"
+              f"{result['first_response']:>11.2f}s{result['first_latency']:>10.2f}s"
+              f"{result['steady_latency']:>11.2f}s")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "cpu_count": os.cpu_count(),
+                       "sections_per_year": args.sections_per_year, "results": results}, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Shared fixtures of the tests under tests/. Run from 2ndVersion/:
+    python -m pytest -q
+"""
+import copy
+import json
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_data(name):
+    with open(os.path.join(ROOT, "Data", name)) as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="session")
+def sample_data():
+    return load_data("sample_data.json")
+
+
+@pytest.fixture
+def sample(sample_data):
+    """A fresh copy of Data/sample_data.json that a test may change."""
+    return copy.deepcopy(sample_data)
+
+
+@pytest.fixture
+def app():
+    from app import create_app
+    return create_app({"TESTING": True}, environ={})
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,152 @@
+import logging
+
+from src.time_grid import DAYS, TIME_SLOTS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COMPACT_FORMAT = "compact-v1"
+COMPACT_MIMETYPE = "application/vnd.timetable.compact+json"
+
+# Per-entry columns of a compact section schedule
+COLUMNS = ("day", "slot", "length", "subject", "teacher")
+
+LEVELS = ("middle_school", "high_school")
+
+
+def parse_slot_label(slot_label):
+    """'3' -> (2, 1) and '1-2' -> (0, 2): 0-based start slot and length."""
+    first, _, last = str(slot_label).partition("-")
+    start = int(first) - 1
+    return start, int(last) - start if last else 1
+
+
+def to_compact(schedules, days=DAYS, time_slots=TIME_SLOTS):
+    """
+    Columnar form of a /generate-schedule response. Days, slots, subjects,
+    teachers and rooms are listed once; every section keeps its room and
+    stream once and its entries as parallel integer arrays (COLUMNS) into
+    those tables. Slots are 0-based starts with a length in slots, a
+    missing teacher is -1. Alternative timetables of a section are encoded
+    with the same columns. Keys other than the levels are copied as is.
+    A response built on a custom grid carries it as "time_grid", whose
+    days and slots then take precedence over the arguments.
+    """
+    if isinstance(schedules.get('time_grid'), dict):
+        days = schedules['time_grid']['days']
+        time_slots = dict(enumerate(schedules['time_grid']['slots']))
+    day_positions = {day: d for d, day in enumerate(days)}
+    # Value -> position in first-seen order; insertion order gives the tables
+    subjects = {}
+    teachers = {}
+    rooms = {}
+    slot_labels = {}
+
+    def encode(schedule):
+        """(columns, room of the first entry) of a section schedule."""
+        day_column, slot_column, length_column, subject_column, teacher_column = [], [], [], [], []
+        room = None
+        for entry in schedule:
+            slot = entry['slot']
+            parsed = slot_labels.get(slot)
+            if parsed is None:
+                parsed = slot_labels[slot] = parse_slot_label(slot)
+            day_column.append(day_positions[entry['day']])
+            slot_column.append(parsed[0])
+            length_column.append(parsed[1])
+            subject_column.append(subjects.setdefault(entry['subject'], len(subjects)))
+            teacher = entry.get('teacher')
+            teacher_column.append(-1 if teacher is None else teachers.setdefault(teacher, len(teachers)))
+            if room is None:
+                room = entry.get('room')
+        return dict(zip(COLUMNS, (day_column, slot_column, length_column, subject_column, teacher_column))), room
+
+    compact = {
+        "format": COMPACT_FORMAT,
+        "days": list(days),
+        "slots": [time_slots[s] for s in sorted(time_slots)]
+    }
+    for key, value in schedules.items():
+        if key not in LEVELS:
+            compact[key] = value
+            continue
+        years = []
+        for year_entry in value.get('years', []):
+            sections = []
+            for section in year_entry.get('sections', []):
+                columns, room = encode(section.get('schedule', []))
+                compact_section = {
+                    key: item for key, item in section.items() if key != 'schedule'
+                }
+                compact_section["room"] = -1 if room is None else rooms.setdefault(room, len(rooms))
+                compact_section.update(columns)
+                if 'alternatives' in section:
+                    # Alternatives share the section's room
+                    compact_section["alternatives"] = [
+                        dict({key: item for key, item in alternative.items() if key != 'schedule'},
+                             **encode(alternative['schedule'])[0])
+                        for alternative in section['alternatives']
+                    ]
+                sections.append(compact_section)
+            years.append({"year": year_entry.get('year'), "sections": sections})
+        compact[key] = {"years": years}
+
+    compact["subjects"] = list(subjects)
+    compact["teachers"] = list(teachers)
+    compact["rooms"] = list(rooms)
+    return compact
+
+
+def from_compact(compact):
+    """Rebuild the default response shape from to_compact() output."""
+    if compact.get("format") != COMPACT_FORMAT:
+        raise ValueError(f"Expected a '{COMPACT_FORMAT}' payload")
+    days = compact["days"]
+    time_slots = dict(enumerate(compact["slots"]))
+    subjects = compact["subjects"]
+    teachers = compact["teachers"]
+    rooms = compact["rooms"]
+
+    def decode(columns, room, compact_section):
+        schedule = []
+        for d, s, length, j, t in zip(*(columns[name] for name in COLUMNS)):
+            last = s + length - 1
+            schedule.append({
+                "day": days[d],
+                "room": room,
+                "subject": subjects[j],
+                "teacher": teachers[t] if t >= 0 else None,
+                "time": f"{time_slots[s]['start']} - {time_slots[last]['end']}",
+                "slot": f"{s+1}-{last+1}" if length > 1 else f"{s+1}",
+                "section": compact_section.get('section'),
+                "stream": compact_section.get('stream')
+            })
+        return schedule
+
+    schedules = {}
+    for key, value in compact.items():
+        if key in ("format", "days", "slots", "subjects", "teachers", "rooms"):
+            continue
+        if key not in LEVELS:
+            schedules[key] = value
+            continue
+        years = []
+        for year_entry in value['years']:
+            sections = []
+            for compact_section in year_entry['sections']:
+                room = rooms[compact_section['room']] if compact_section['room'] >= 0 else None
+                section = {
+                    key: item for key, item in compact_section.items()
+                    if key not in COLUMNS and key != 'room'
+                }
+                section["schedule"] = decode(compact_section, room, compact_section)
+                if 'alternatives' in compact_section:
+                    section["alternatives"] = [
+                        dict({key: item for key, item in alternative.items() if key not in COLUMNS},
+                             schedule=decode(alternative, room, compact_section))
+                        for alternative in compact_section['alternatives']
+                    ]
+                sections.append(section)
+            years.append({"year": year_entry['year'], "sections": sections})
+        schedules[key] = {"years": years}
+    return schedules
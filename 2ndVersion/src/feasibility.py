@@ -0,0 +1,174 @@
+import logging
+
+import numpy as np
+
+from src.time_grid import TimeGrid
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class InfeasibleRequestError(ValueError):
+    """Raised when a request cannot be scheduled; `problems` explains why."""
+
+    def __init__(self, problems):
+        super().__init__(f"The request cannot be scheduled: {len(problems)} capacity problem(s)")
+        self.problems = problems
+
+
+def level_capacity_problems(level, sections, teachers, grid, shared_teachers):
+    """
+    Capacity analysis of the sections of one teacher pool.
+    :param sections: List of (year, section) of the level
+    :param teachers: The level's teacher pool
+    :param grid: TimeGrid of the request
+    :param shared_teachers: Whether the sections compete for the same
+                            teachers (joint and fast modes) or are solved
+                            as independent models (section mode)
+    """
+    grid_slots = grid.week_slots
+    problems = []
+
+    # Demand matrix: sections x subjects, in slots (a session takes its length)
+    subject_index = {}
+    subject_names = []
+    for _, section in sections:
+        for subject in section['subjects']:
+            key = subject['name'].lower()
+            if key not in subject_index:
+                subject_index[key] = len(subject_names)
+                subject_names.append(subject['name'])
+    demand = np.zeros((len(sections), len(subject_names)), dtype=np.int64)
+    for k, (_, section) in enumerate(sections):
+        for subject in section['subjects']:
+            demand[k, subject_index[subject['name'].lower()]] += subject['coef'] * grid.length(subject)
+
+    # 1. Sessions that fit nowhere in a day of the grid
+    too_long = {}
+    for _, section in sections:
+        for subject in section['subjects']:
+            if subject['coef'] and not grid.subject_starts(subject):
+                too_long.setdefault(subject['name'], (grid.length(subject), []))[1].append(section['section'])
+    for subject_name, (length, section_names) in too_long.items():
+        problems.append({
+            "type": "session_too_long",
+            "level": level,
+            "subject": subject_name,
+            "length": length,
+            "sections": section_names
+        })
+
+    # Eligibility matrix: subjects x teachers
+    eligible = np.zeros((len(subject_names), len(teachers)), dtype=bool)
+    for t, teacher in enumerate(teachers):
+        for subject in teacher['subjects']:
+            j = subject_index.get(subject['name'].lower())
+            if j is not None:
+                eligible[j, t] = True
+
+    # 2. Sections needing more slots than the week has
+    section_load = demand.sum(axis=1)
+    for k in np.flatnonzero(section_load > grid_slots):
+        year_number, section = sections[k]
+        problems.append({
+            "type": "section_over_capacity",
+            "level": level,
+            "year": year_number,
+            "section": section['section'],
+            "required_slots": int(section_load[k]),
+            "available_slots": grid_slots
+        })
+
+    # 3. Subjects nobody in the pool teaches
+    subject_demand = demand.sum(axis=0)
+    teacher_count = eligible.sum(axis=1)
+    for j in np.flatnonzero((teacher_count == 0) & (subject_demand > 0)):
+        problems.append({
+            "type": "subject_without_teacher",
+            "level": level,
+            "subject": subject_names[j],
+            "sections": [sections[k][1]['section'] for k in np.flatnonzero(demand[:, j] > 0)]
+        })
+
+    if not shared_teachers or not len(teachers):
+        return problems
+
+    # 4. Subjects whose teachers cannot cover every section together
+    capacity = teacher_count * grid_slots
+    for j in np.flatnonzero((teacher_count > 0) & (subject_demand > capacity)):
+        problems.append({
+            "type": "subject_over_capacity",
+            "level": level,
+            "subject": subject_names[j],
+            "teachers": int(teacher_count[j]),
+            "required_slots": int(subject_demand[j]),
+            "available_slots": int(capacity[j])
+        })
+
+    # 5. Teachers who alone teach subjects adding up to more than a week
+    sole = teacher_count == 1
+    forced = eligible[sole].T.astype(np.int64) @ subject_demand[sole]
+    for t in np.flatnonzero(forced > grid_slots):
+        problems.append({
+            "type": "teacher_over_capacity",
+            "level": level,
+            "teacher": teachers[t]['name'],
+            "subjects": [subject_names[j] for j in np.flatnonzero(sole & eligible[:, t])],
+            "required_slots": int(forced[t]),
+            "available_slots": grid_slots
+        })
+
+    # 6. Groups of subjects sharing teachers: the demand of a connected
+    # group of subjects and teachers cannot exceed the group's capacity
+    parent = list(range(len(subject_names)))
+
+    def find(j):
+        while parent[j] != j:
+            parent[j] = parent[parent[j]]
+            j = parent[j]
+        return j
+
+    for t in range(len(teachers)):
+        subjects = np.flatnonzero(eligible[:, t])
+        for j in subjects[1:]:
+            parent[find(j)] = find(subjects[0])
+    groups = {}
+    for j in range(len(subject_names)):
+        groups.setdefault(find(j), []).append(j)
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        group_teachers = int(eligible[group].any(axis=0).sum())
+        required = int(subject_demand[group].sum())
+        if required > group_teachers * grid_slots:
+            problems.append({
+                "type": "pool_over_capacity",
+                "level": level,
+                "subjects": [subject_names[j] for j in group],
+                "teachers": group_teachers,
+                "required_slots": required,
+                "available_slots": group_teachers * grid_slots
+            })
+    return problems
+
+
+def find_capacity_problems(levels, data, shared_teachers, grid=None):
+    """
+    Necessary conditions for a request to be schedulable, checked with a
+    few array operations per level before any model is built.
+    :param levels: List of (level, teacher pool) as built by ScheduleManager
+    :param data: Request body
+    :param shared_teachers: See level_capacity_problems
+    :param grid: TimeGrid of the request, the default grid when omitted
+    :return: List of problem dictionaries, empty when no check fails
+    """
+    grid = grid if grid is not None else TimeGrid()
+    problems = []
+    for level, teachers in levels:
+        sections = [
+            (year_entry.get('year'), section)
+            for year_entry in data[level].get('years', [])
+            for section in year_entry.get('sections', [])
+        ]
+        problems.extend(level_capacity_problems(level, sections, teachers, grid, shared_teachers))
+    return problems
@@ -0,0 +1,216 @@
+import logging
+import time
+
+from src.schedule_index import ScheduleIndex
+from src.time_grid import TimeGrid
+from src.solver_settings import STATUS_FEASIBLE, STATUS_PARTIAL
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class GreedyScheduler:
+    """
+    Constructive scheduler for several sections at once, without a solver.
+
+    Availability is kept as one bitmask per (teacher, day) and per
+    (section, day). Sessions are placed most constrained first: the
+    longest (Sport blocks), then sessions with the fewest eligible teachers. A session that
+    fits nowhere is repaired by moving the single session blocking one of
+    its candidate placements elsewhere. Teachers are shared by name across
+    every section given, so a full result has no double booking.
+    """
+
+    def __init__(self, sections, rooms, max_repairs=2000, grid=None):
+        """
+        :param sections: List of (level, year, section, teachers) tuples
+        :param rooms: List of rooms
+        :param max_repairs: Repair attempts allowed for the whole run
+        :param grid: TimeGrid of the request, the default grid when omitted
+        """
+        self.sections = sections
+        self.rooms = rooms
+        self.max_repairs = max_repairs
+        self.grid = grid if grid is not None else TimeGrid()
+        self.days = self.grid.days
+        self.time_slots = self.grid.time_slots
+        self.status = None
+        self.timings = {}
+        self.stats = {}
+
+        self.teachers = []
+        self.teacher_index = {}
+        indexes = {}
+        self.section_rooms = []
+        # Session list: (k, subject position, length, eligible global teacher
+        # indices, start slots)
+        self.sessions = []
+        for k, (level, _, section, teachers) in enumerate(sections):
+            if id(teachers) not in indexes:
+                indexes[id(teachers)] = ScheduleIndex(rooms, teachers)
+                for teacher in teachers:
+                    if teacher['name'] not in self.teacher_index:
+                        self.teacher_index[teacher['name']] = len(self.teachers)
+                        self.teachers.append(teacher)
+            index = indexes[id(teachers)]
+            self.section_rooms.append(index.get_assigned_room(level, section['section']))
+            for j, subject in enumerate(section['subjects']):
+                eligible = tuple(self.teacher_index[teachers[t]['name']]
+                                 for t in index.find_suitable_teachers_indices(subject['name']))
+                length = self.grid.length(subject)
+                starts = self.grid.subject_starts(subject)
+                for _ in range(subject['coef']):
+                    self.sessions.append((k, j, length, eligible, starts))
+
+        num_days = len(self.days)
+        self.teacher_busy = [[0] * num_days for _ in self.teachers]
+        self.section_busy = [[0] * num_days for _ in sections]
+        # Session -> (d, s, t) once placed; (owner, d, slot) -> session
+        self.placement = [None] * len(self.sessions)
+        self.teacher_slot = {}
+        self.section_slot = {}
+        self.load = [0] * len(self.teachers)
+        # Sessions of one (section, subject) per day, to spread them over the week
+        self.subject_days = {}
+        self.repairs = 0
+
+    def place(self, i, d, s, t):
+        k, j, length, _, _ = self.sessions[i]
+        mask = ((1 << length) - 1) << s
+        self.teacher_busy[t][d] |= mask
+        self.section_busy[k][d] |= mask
+        for slot in range(s, s + length):
+            self.teacher_slot[(t, d, slot)] = i
+            self.section_slot[(k, d, slot)] = i
+        self.placement[i] = (d, s, t)
+        self.load[t] += 1
+        self.subject_days[(k, j, d)] = self.subject_days.get((k, j, d), 0) + 1
+
+    def remove(self, i):
+        k, j, length, _, _ = self.sessions[i]
+        d, s, t = self.placement[i]
+        mask = ((1 << length) - 1) << s
+        self.teacher_busy[t][d] &= ~mask
+        self.section_busy[k][d] &= ~mask
+        for slot in range(s, s + length):
+            del self.teacher_slot[(t, d, slot)]
+            del self.section_slot[(k, d, slot)]
+        self.placement[i] = None
+        self.load[t] -= 1
+        self.subject_days[(k, j, d)] -= 1
+
+    def find_placement(self, i, exclude=None):
+        """
+        Best free (d, s, t) for session i: days with the fewest sessions of
+        the same subject first, then the least loaded day of the section,
+        the earliest slot and the least loaded teacher.
+        :param exclude: (d, s) to skip
+        """
+        k, j, length, eligible, starts = self.sessions[i]
+        section_busy = self.section_busy[k]
+        days = sorted(range(len(self.days)),
+                      key=lambda d: (self.subject_days.get((k, j, d), 0), bin(section_busy[d]).count("1"), d))
+        for d in days:
+            for s in starts:
+                if (d, s) == exclude:
+                    continue
+                mask = ((1 << length) - 1) << s
+                if section_busy[d] & mask:
+                    continue
+                free = [t for t in eligible if not self.teacher_busy[t][d] & mask]
+                if free:
+                    return d, s, min(free, key=lambda t: self.load[t])
+        return None
+
+    def repair(self, i):
+        """
+        Place session i by moving one blocking session. Every candidate
+        (d, s, t) of i blocked by exactly one placed session is tried: the
+        blocker is lifted, i takes its spot and the blocker is placed
+        elsewhere, or the move is undone.
+        """
+        k, j, length, eligible, starts = self.sessions[i]
+        for d in range(len(self.days)):
+            for s in starts:
+                for t in eligible:
+                    if self.repairs >= self.max_repairs:
+                        return False
+                    blockers = set()
+                    for slot in range(s, s + length):
+                        if (k, d, slot) in self.section_slot:
+                            blockers.add(self.section_slot[(k, d, slot)])
+                        if (t, d, slot) in self.teacher_slot:
+                            blockers.add(self.teacher_slot[(t, d, slot)])
+                    if len(blockers) != 1:
+                        continue
+                    self.repairs += 1
+                    blocker = blockers.pop()
+                    old = self.placement[blocker]
+                    self.remove(blocker)
+                    self.place(i, d, s, t)
+                    moved = self.find_placement(blocker, exclude=(old[0], old[1]))
+                    if moved is not None:
+                        self.place(blocker, *moved)
+                        return True
+                    self.remove(i)
+                    self.place(blocker, *old)
+        return False
+
+    def generate_schedules(self):
+        """
+        :return: One schedule list per entry of `sections`, in the same order;
+                 self.unplaced counts the sessions left out per section
+        """
+        start = time.perf_counter()
+        # Longest sessions (Sport blocks) first, then those with the fewest teachers
+        order = sorted(range(len(self.sessions)),
+                       key=lambda i: (-self.sessions[i][2], len(self.sessions[i][3]), i))
+        unplaced = []
+        for i in order:
+            found = self.find_placement(i)
+            if found is not None:
+                self.place(i, *found)
+            elif not self.repair(i):
+                unplaced.append(i)
+        self.timings['solve'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        schedules = [[] for _ in self.sections]
+        self.unplaced = [0 for _ in self.sections]
+        for i, (k, j, length, _, _) in enumerate(self.sessions):
+            section = self.sections[k][2]
+            if self.placement[i] is None:
+                self.unplaced[k] += 1
+                continue
+            d, s, t = self.placement[i]
+            subject_name = section['subjects'][j]['name']
+            time_str, slot_label = self.grid.describe(s, length)
+            schedules[k].append({
+                "day": self.days[d],
+                "room": self.section_rooms[k],
+                "subject": subject_name,
+                "teacher": self.teachers[t]['name'],
+                "time": time_str,
+                "slot": slot_label,
+                "section": section['section'],
+                "stream": section.get('stream')
+            })
+        self.timings['extract'] = time.perf_counter() - start
+        self.status = STATUS_PARTIAL if unplaced else STATUS_FEASIBLE
+        self.stats = {"sessions": len(self.sessions), "unplaced": len(unplaced), "repairs": self.repairs}
+        if unplaced:
+            logger.warning(f"Greedy scheduler left {len(unplaced)} of {len(self.sessions)} sessions unplaced")
+        return schedules
+
+    def placement_keys(self):
+        """
+        Placed sessions of every section as (lowercased subject, d, s,
+        teacher name), the form used for solver hints (see warm_start).
+        """
+        keys = [[] for _ in self.sections]
+        for i, (k, j, _, _, _) in enumerate(self.sessions):
+            if self.placement[i] is not None:
+                d, s, t = self.placement[i]
+                subject_name = self.sections[k][2]['subjects'][j]['name']
+                keys[k].append((subject_name.lower(), d, s, self.teachers[t]['name']))
+        return keys
@@ -0,0 +1,90 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.job_store import new_job, JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+from src.schedule_manager import ScheduleCancelled
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised by JobRunner.submit when max_queue jobs are already waiting or running."""
+
+
+class JobRunner:
+    """
+    Runs schedule generation jobs on a bounded pool of background threads
+    and records their status, progress and result in a job store. The
+    heavy solving itself still happens in the solver process pool.
+    """
+
+    def __init__(self, store, max_workers=2, max_queue=16):
+        """
+        :param store: InMemoryJobStore or FileJobStore
+        :param max_workers: Jobs running at the same time
+        :param max_queue: Jobs accepted (queued or running) at the same time
+        """
+        self.store = store
+        self.max_queue = max_queue
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="schedule-job")
+        self.lock = threading.Lock()
+        self.futures = {}
+        self.cancel_events = {}
+
+    def submit(self, work, total=0):
+        """
+        :param work: Callable (progress_callback, cancel_event) -> JSON-serializable result
+        :param total: Number of sections, reported as progress total until the job starts
+        :return: The created job record
+        """
+        with self.lock:
+            if len(self.futures) >= self.max_queue:
+                raise QueueFullError(f"Too many schedule jobs in progress (limit {self.max_queue})")
+            job = self.store.create(new_job(total))
+            cancel_event = threading.Event()
+            self.cancel_events[job['id']] = cancel_event
+            self.futures[job['id']] = self.executor.submit(self.run, job['id'], work, cancel_event)
+        return job
+
+    def run(self, job_id, work, cancel_event):
+        try:
+            if cancel_event.is_set():
+                self.store.update(job_id, status=JOB_CANCELLED)
+                return
+            self.store.update(job_id, status=JOB_RUNNING)
+
+            def progress_callback(done, total):
+                self.store.update(job_id, progress={"done": done, "total": total})
+
+            result = work(progress_callback, cancel_event)
+            self.store.update(job_id, status=JOB_DONE, result=result)
+        except ScheduleCancelled:
+            logger.info(f"Job {job_id} cancelled")
+            self.store.update(job_id, status=JOB_CANCELLED)
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            self.store.update(job_id, status=JOB_FAILED, error=str(e))
+        finally:
+            with self.lock:
+                self.futures.pop(job_id, None)
+                self.cancel_events.pop(job_id, None)
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued job immediately, or stop a running one before its
+        next model is started.
+        :return: The job record, None for an unknown job
+        """
+        with self.lock:
+            cancel_event = self.cancel_events.get(job_id)
+            future = self.futures.get(job_id)
+        if cancel_event is not None:
+            cancel_event.set()
+            if future is not None and future.cancel():
+                with self.lock:
+                    self.futures.pop(job_id, None)
+                    self.cancel_events.pop(job_id, None)
+                return self.store.update(job_id, status=JOB_CANCELLED)
+        return self.store.get(job_id)
@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+
+def new_job(total=0):
+    now = time.time()
+    return {
+        "id": uuid.uuid4().hex,
+        "status": JOB_QUEUED,
+        "progress": {"done": 0, "total": total},
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now
+    }
+
+
+class InMemoryJobStore:
+    """
+    Jobs kept in a dictionary of the serving process. Finished jobs are
+    dropped after `ttl` seconds.
+    """
+
+    def __init__(self, ttl=3600):
+        self.ttl = ttl
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def create(self, job):
+        with self.lock:
+            self.purge()
+            self.jobs[job['id']] = dict(job)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def update(self, job_id, **fields):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            job.update(fields)
+            job['updated_at'] = time.time()
+            return dict(job)
+
+    def purge(self):
+        expiry = time.time() - self.ttl
+        for job_id in [job_id for job_id, job in self.jobs.items()
+                       if job['status'] in FINISHED_STATES and job['updated_at'] < expiry]:
+            del self.jobs[job_id]
+
+
+class FileJobStore:
+    """
+    One JSON file per job in a local directory, so job status and results
+    survive a restart and can be read by every worker process of the server.
+    """
+
+    def __init__(self, directory, ttl=3600):
+        self.directory = directory
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, job_id):
+        # Job ids are uuid4 hex strings; anything else cannot name a file here
+        if not job_id.isalnum():
+            return None
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def read(self, job_id):
+        path = self.path(job_id)
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def write(self, job):
+        path = self.path(job['id'])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(job, f)
+        os.replace(tmp_path, path)
+
+    def create(self, job):
+        with self.lock:
+            self.purge()
+            self.write(job)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.read(job_id)
+
+    def update(self, job_id, **fields):
+        with self.lock:
+            job = self.read(job_id)
+            if job is None:
+                return None
+            job.update(fields)
+            job['updated_at'] = time.time()
+            self.write(job)
+            return job
+
+    def purge(self):
+        expiry = time.time() - self.ttl
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, filename)
+            if os.path.getmtime(path) >= expiry:
+                continue
+            try:
+                with open(path) as f:
+                    finished = json.load(f)['status'] in FINISHED_STATES
+            except (OSError, ValueError, KeyError):
+                finished = True
+            if finished:
+                os.remove(path)
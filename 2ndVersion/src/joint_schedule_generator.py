@@ -0,0 +1,338 @@
+import logging
+import time
+from collections import defaultdict, Counter
+from ortools.sat.python import cp_model
+
+from src.schedule_index import room_prefix
+from src.time_grid import TimeGrid
+from src.solver_settings import SolverSettings, STATUS_TIMEOUT
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class JointScheduleGenerator:
+    """
+    Builds a single CP-SAT model for several sections at once so that a
+    teacher shared by those sections can never be booked twice in the same
+    (day, slot).
+    """
+
+    def __init__(self, sections, rooms, settings=None, deadline=None, previous=None,
+                 minimize_changes=False, grid=None, unavailable=None, fixed=None, allow_unplaced=False):
+        """
+        :param sections: List of (level, year, section, teachers) tuples to schedule together
+        :param rooms: List of rooms
+        :param settings: SolverSettings, solver defaults when omitted
+        :param deadline: Wall-clock time (time.time()) by which the request must finish
+        :param previous: One list of previous entries per section, as
+                         (lowercased subject, d, s, teacher name), used as solver hints
+        :param minimize_changes: Maximize the number of previous entries kept
+        :param grid: TimeGrid of the request, the default grid when omitted
+        :param unavailable: {teacher name: set of (d, slot)} the teacher cannot
+                            teach, e.g. booked by sections outside the model
+        :param fixed: One list of entries per section, as in `previous`, kept
+                      as they are: they hold their section's and teacher's
+                      slots and count towards their subject's coef
+        :param allow_unplaced: Place at most `coef` sessions per subject and
+                               maximize the sessions placed instead of
+                               requiring all of them; not combined with
+                               minimize_changes
+        """
+        self.sections = sections
+        self.rooms = rooms
+        self.settings = settings if settings is not None else SolverSettings()
+        self.deadline = deadline
+        self.previous = previous or [[] for _ in sections]
+        self.minimize_changes = minimize_changes
+        self.allow_unplaced = allow_unplaced
+        self.status = None
+
+        self.grid = grid if grid is not None else TimeGrid()
+        self.days = self.grid.days
+        self.time_slots = self.grid.time_slots
+
+        # Fixed entries are constants rather than variables of the model
+        self.fixed = fixed or [[] for _ in sections]
+        self.unavailable = {name: set(slots) for name, slots in (unavailable or {}).items()}
+        self.section_busy = [set() for _ in sections]
+        self.fixed_count = Counter()
+        self.invalid_fixed = False
+        for k, keys in enumerate(self.fixed):
+            lengths = {s['name'].lower(): self.grid.length(s) for s in sections[k][2]['subjects']}
+            for subject, d, s, teacher in keys:
+                if subject not in lengths:
+                    self.invalid_fixed = True
+                    continue
+                span = {(d, slot) for slot in range(s, s + lengths[subject])}
+                self.section_busy[k] |= span
+                self.unavailable.setdefault(teacher, set()).update(span)
+                self.fixed_count[(k, subject)] += 1
+
+        self.room_names = {room['name'] for room in rooms}
+        self.section_rooms = [
+            self.get_assigned_room(level, section) for level, _, section, _ in sections
+        ]
+
+        # Teachers are shared by name across every section of the model
+        self.teachers = []
+        self.teacher_index = {}
+        for _, _, _, teachers in sections:
+            for teacher in teachers:
+                if teacher['name'] not in self.teacher_index:
+                    self.teacher_index[teacher['name']] = len(self.teachers)
+                    self.teachers.append(teacher)
+
+        self.model = cp_model.CpModel()
+        self.x = {}
+        self.timings = {}
+        self.stats = {}
+
+        # Previous teacher of each (k, lowercased subject, d, s)
+        self.previous_teacher = {}
+        for k, keys in enumerate(self.previous):
+            for subject, d, s, teacher in keys:
+                if teacher in self.teacher_index:
+                    self.previous_teacher[(k, subject, d, s)] = self.teacher_index[teacher]
+
+    def get_assigned_room(self, level, section):
+        room_name = f"{room_prefix(level)}{section['section']}"
+        if room_name in self.room_names:
+            return room_name
+        logger.error(f"No room assigned to section {section['section']}")
+        return None
+
+    def build_teacher_classes(self):
+        """
+        Group interchangeable teachers: same subjects, same teacher pools and
+        same unavailable slots.
+        The model only decides how many teachers of a class are busy at each
+        (day, slot); which member takes which session is decided afterwards.
+        :return: ({lowercased subject: [class index]} per pool id, list of classes)
+        """
+        pool_ids = defaultdict(set)
+        for _, _, _, teachers in self.sections:
+            for teacher in teachers:
+                pool_ids[teacher['name']].add(id(teachers))
+
+        signatures = {}
+        classes = []
+        self.teacher_class = {}
+        # Unavailable (d, slot) of the members of each class
+        self.class_unavailable = []
+        pools = defaultdict(lambda: defaultdict(list))
+        for teacher in self.teachers:
+            subjects = frozenset(s['name'].lower() for s in teacher['subjects'])
+            unavailable = frozenset(self.unavailable.get(teacher['name'], ()))
+            signature = (subjects, frozenset(pool_ids[teacher['name']]), unavailable)
+            if signature not in signatures:
+                signatures[signature] = len(classes)
+                classes.append([])
+                self.class_unavailable.append(unavailable)
+                for pool_id in signature[1]:
+                    for subj in subjects:
+                        pools[pool_id][subj].append(signatures[signature])
+            classes[signatures[signature]].append(self.teacher_index[teacher['name']])
+            self.teacher_class[self.teacher_index[teacher['name']]] = signatures[signature]
+        return pools, classes
+
+    def build_model(self):
+        num_days = len(self.days)
+        pools, self.teacher_classes = self.build_teacher_classes()
+
+        #
+        # 1) Bool variables x[(k, j, d, s, c)]: subject j of section k starts
+        #    at (d, s) with a teacher of class c. Sessions of one subject and
+        #    teachers of one class are interchangeable, so both are counted
+        #    instead of being enumerated one by one.
+        #
+        section_occupancy = defaultdict(list)
+        class_occupancy = defaultdict(list)
+        placed = []
+
+        for k, (_, _, section, teachers) in enumerate(self.sections):
+            by_subject = pools[id(teachers)]
+            busy = self.section_busy[k]
+            for j, subject in enumerate(section['subjects']):
+                subject_name = subject['name']
+                suitable_classes = by_subject.get(subject_name.lower(), [])
+                if not suitable_classes:
+                    logger.warning(f"No teacher can teach {subject_name} in section {section['section']}")
+                length = self.grid.length(subject)
+                remaining = subject['coef'] - self.fixed_count[(k, subject_name.lower())]
+                if remaining == 0 and self.fixed_count[(k, subject_name.lower())]:
+                    # Fully covered by fixed entries
+                    continue
+                demand = []
+                for d in range(num_days):
+                    for s in self.grid.subject_starts(subject):
+                        occupied = range(s, s + length)
+                        if busy and any((d, slot) in busy for slot in occupied):
+                            continue
+                        for c in suitable_classes:
+                            blocked = self.class_unavailable[c]
+                            if blocked and any((d, slot) in blocked for slot in occupied):
+                                continue
+                            var = self.model.NewBoolVar(f"x_{k}_{j}_{d}_{s}_{c}")
+                            self.x[(k, j, d, s, c)] = var
+                            demand.append(var)
+                            for slot in occupied:
+                                section_occupancy[(k, d, slot)].append(var)
+                                class_occupancy[(c, d, slot)].append(var)
+
+                #
+                # 2) Each subject gets exactly `coef` sessions, fixed ones included
+                #    (at most `coef` with allow_unplaced)
+                #
+                if remaining < 0:
+                    self.model.AddBoolOr([])
+                elif self.allow_unplaced:
+                    self.model.Add(sum(demand) <= remaining)
+                    placed.extend(demand)
+                else:
+                    self.model.Add(sum(demand) == remaining)
+        if self.invalid_fixed:
+            # A fixed entry of a subject the section no longer has
+            self.model.AddBoolOr([])
+
+        #
+        # 3) A section attends at most one session per (d, s), and a teacher
+        #    class never runs more sessions per (d, s) than it has members,
+        #    across all sections. A multi-slot session (Sport) occupies every
+        #    slot it spans, so no pairwise constraints are needed.
+        #
+        for occupying in section_occupancy.values():
+            if len(occupying) > 1:
+                self.model.AddAtMostOne(occupying)
+        for (c, _, _), occupying in class_occupancy.items():
+            capacity = len(self.teacher_classes[c])
+            if capacity == 1:
+                self.model.AddAtMostOne(occupying)
+            elif len(occupying) > capacity:
+                self.model.Add(sum(occupying) <= capacity)
+
+        if self.allow_unplaced:
+            self.model.Maximize(sum(placed))
+
+    def apply_previous(self):
+        """
+        Hint the previous timetable at class level and, with minimize_changes,
+        maximize the number of its entries that are kept.
+        """
+        wanted = Counter(
+            (k, subject, d, s, self.teacher_class[t])
+            for (k, subject, d, s), t in self.previous_teacher.items()
+        )
+        kept = []
+        for (k, j, d, s, c), var in self.x.items():
+            subject = self.sections[k][2]['subjects'][j]['name'].lower()
+            hint = wanted[(k, subject, d, s, c)] > 0
+            self.model.AddHint(var, hint)
+            if hint:
+                kept.append(var)
+        if self.minimize_changes:
+            self.model.Maximize(sum(kept))
+
+    def assign_teachers(self, sessions):
+        """
+        Hand out the members of each teacher class to the sessions it runs.
+        Sessions of one class and day are intervals that never overlap more
+        than the class size, so assigning them by start slot to a free
+        member always succeeds. The previous teacher of a session is kept
+        when free, otherwise the least loaded member not expected elsewhere.
+        :param sessions: List of (c, d, first_slot, last_slot, entry, preferred teacher) tuples
+        """
+        load = defaultdict(int)
+        by_class_day = defaultdict(list)
+        for c, d, first, last, entry, preferred in sessions:
+            by_class_day[(c, d)].append((first, last, entry, preferred))
+
+        for (c, _), day_sessions in by_class_day.items():
+            day_sessions.sort(key=lambda item: item[0])
+            reserved = {item[3] for item in day_sessions}
+            busy_until = {}
+            for first, last, entry, preferred in day_sessions:
+                free = [t for t in self.teacher_classes[c] if busy_until.get(t, -1) < first]
+                if preferred in free:
+                    t = preferred
+                else:
+                    t = min(free, key=lambda member: (member in reserved, load[member]))
+                busy_until[t] = last
+                load[t] += 1
+                entry["teacher"] = self.teachers[t]['name']
+
+    def make_entry(self, k, subject, d, s, teacher):
+        """Schedule entry of a session of `subject` of section k starting at (d, s)."""
+        section = self.sections[k][2]
+        time_str, slot_label = self.grid.describe(s, self.grid.length(subject))
+        return {
+            "day": self.days[d],
+            "room": self.section_rooms[k],
+            "subject": subject['name'],
+            "teacher": teacher,
+            "time": time_str,
+            "slot": slot_label,
+            "section": section['section'],
+            "stream": section.get('stream')
+        }
+
+    def generate_schedules(self):
+        """
+        Build and solve the joint model.
+        :return: One schedule list per entry of `sections`, in the same order
+        """
+        schedules = [[] for _ in self.sections]
+        if self.settings.time_limit(self.deadline) == 0:
+            logger.warning(f"Request time budget exhausted before a joint model of {len(self.sections)} sections")
+            self.status = STATUS_TIMEOUT
+            return schedules
+
+        start = time.perf_counter()
+        self.build_model()
+        if self.previous_teacher:
+            self.apply_previous()
+        self.timings['build'] = time.perf_counter() - start
+        proto = self.model.Proto()
+        self.stats['variables'] = len(proto.variables)
+        self.stats['constraints'] = len(proto.constraints)
+
+        start = time.perf_counter()
+        solver = self.settings.create_solver(self.deadline)
+        if self.allow_unplaced:
+            # Placing as many sessions as possible around fixed entries is
+            # a packing problem: the LP relaxation and symmetry detection
+            # cost seconds while plain search fills the free slots at once
+            solver.parameters.linearization_level = 0
+            solver.parameters.symmetry_level = 0
+        status = solver.Solve(self.model)
+        self.timings['solve'] = time.perf_counter() - start
+        self.status, use_solution = self.settings.section_status(status)
+        self.stats.update(self.settings.solver_stats(solver, status))
+
+        start = time.perf_counter()
+        if use_solution:
+            sessions = []
+            for (k, j, d, s, c), var in self.x.items():
+                if solver.BooleanValue(var):
+                    subject = self.sections[k][2]['subjects'][j]
+                    entry = self.make_entry(k, subject, d, s, None)
+                    schedules[k].append(entry)
+                    last = s + self.grid.length(subject) - 1
+                    preferred = self.previous_teacher.get((k, subject['name'].lower(), d, s))
+                    sessions.append((c, d, s, last, entry, preferred))
+            self.assign_teachers(sessions)
+            for k, keys in enumerate(self.fixed):
+                subjects = {subject['name'].lower(): subject for subject in self.sections[k][2]['subjects']}
+                for subject, d, s, teacher in keys:
+                    schedules[k].append(self.make_entry(k, subjects[subject], d, s, teacher))
+        else:
+            logger.error(f"No feasible joint solution found for {len(self.sections)} sections ({self.status})!")
+        self.timings['extract'] = time.perf_counter() - start
+
+        logger.info(
+            f"Joint model: {len(self.sections)} sections, {len(self.teachers)} teachers, "
+            f"{len(self.x)} variables, status {self.status}, "
+            f"build {self.timings['build']:.3f}s, solve {self.timings['solve']:.3f}s, "
+            f"extract {self.timings['extract']:.3f}s"
+        )
+        return schedules
@@ -0,0 +1,31 @@
+import json
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# orjson parses and encodes several times faster than the json module; it
+# is optional and the stdlib path produces the same documents
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def loads(payload):
+    """
+    Parse a JSON document from bytes or str.
+    Raises ValueError for malformed input with either backend.
+    """
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def dumps(value, sort_keys=False):
+    """Encode `value` as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(value, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
@@ -0,0 +1,312 @@
+import logging
+import random
+import time
+from collections import Counter
+
+from src.greedy_scheduler import GreedyScheduler
+from src.schedule_index import ScheduleIndex
+from src.time_grid import TimeGrid
+from src.warm_start import entry_key, entry_slots
+from src.solver_settings import SolverSettings, STATUS_OPTIMAL, STATUS_FEASIBLE, STATUS_PARTIAL
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Parts of the timetable freed by one LNS iteration:
+# "teacher": every entry of one teacher able to give a missing session, in
+#            the sections it teaches and the sections missing such sessions
+# "day":     one day of the sections of a level
+# "year":    every entry of the sections of one (level, year)
+NEIGHBORHOODS = ("teacher", "day", "year")
+
+
+class LnsScheduler:
+    """
+    Large neighborhood search over a whole request. The search starts from
+    a greedy assignment, or any given one from which entries double-booking
+    a teacher or a section, or given by a teacher unable to teach them, are
+    dropped, and its cost is the number of
+    sessions still missing. Every iteration frees a small part of the
+    timetable and re-solves it with a joint CP-SAT model under a short time
+    limit, all other entries being kept as they are. The model places as
+    many sessions as it can, hinted with the current ones, so a
+    neighborhood never loses any. The search stops when nothing is missing
+    or when the iterations, the request deadline or the patience run out.
+    """
+
+    def __init__(self, sections, rooms, settings=None, deadline=None, grid=None, initial=None,
+                 neighborhoods=NEIGHBORHOODS, max_iterations=200, max_sections=6, patience=30):
+        """
+        :param sections: List of (level, year, section, teachers) tuples
+        :param rooms: List of rooms
+        :param settings: SolverSettings; max_time_lns_iteration bounds every model
+        :param deadline: Wall-clock time (time.time()) by which the search must end
+        :param grid: TimeGrid of the request, the default grid when omitted
+        :param initial: One list of entries per section to start from, as
+                        (lowercased subject, d, s, teacher name) like the
+                        previous timetable of warm_start; a greedy_scheduler
+                        pass when omitted
+        :param neighborhoods: Kinds of neighborhood tried in turn, see NEIGHBORHOODS
+        :param max_iterations: Iterations at most
+        :param max_sections: Sections at most in one neighborhood; those
+                             missing sessions are kept first
+        :param patience: Consecutive iterations without improvement before giving up
+        """
+        self.sections = sections
+        self.rooms = rooms
+        self.settings = settings if settings is not None else SolverSettings()
+        self.deadline = deadline
+        self.grid = grid if grid is not None else TimeGrid()
+        self.initial = initial
+        self.neighborhoods = neighborhoods
+        self.max_iterations = max_iterations
+        self.max_sections = max_sections
+        self.patience = patience
+        self.random = random.Random(self.settings.random_seed or 0)
+
+        self.iteration_settings = self.settings.merge({
+            "max_time_per_section": self.settings.max_time_lns_iteration,
+            "return_best_feasible": True
+        })
+        self.indexes = {}
+        for _, _, _, teachers in sections:
+            if id(teachers) not in self.indexes:
+                self.indexes[id(teachers)] = ScheduleIndex(rooms, teachers)
+
+        self.schedules = None
+        self.section_statuses = None
+        self.curve = []
+        self.timings = {}
+        self.stats = {}
+
+    def make_entry(self, k, key):
+        """
+        Schedule entry of section k for an entry key, None for a subject it
+        does not have, a day or start slot off the grid or a teacher of its
+        pool unable to give it.
+        """
+        level, _, section, teachers = self.sections[k]
+        subject_name, d, s, teacher = key
+        subject = next((subject for subject in section['subjects']
+                        if subject['name'].lower() == subject_name), None)
+        if subject is None or not 0 <= d < len(self.grid.days) or s not in self.grid.subject_starts(subject):
+            return None
+        index = self.indexes[id(teachers)]
+        if not any(teachers[t]['name'] == teacher for t in index.find_suitable_teachers_indices(subject_name)):
+            return None
+        time_str, slot_label = self.grid.describe(s, self.grid.length(subject))
+        return {
+            "day": self.grid.days[d],
+            "room": index.get_assigned_room(level, section['section']),
+            "subject": subject['name'],
+            "teacher": teacher,
+            "time": time_str,
+            "slot": slot_label,
+            "section": section['section'],
+            "stream": section.get('stream')
+        }
+
+    def drop_clashes(self):
+        """
+        Drop, in order, every entry that double-books a teacher or a
+        section or exceeds its subject's coef.
+        :return: Number of entries dropped
+        """
+        teacher_slots = set()
+        section_slots = set()
+        dropped = 0
+        for k, entries in enumerate(self.schedules):
+            coefs = Counter()
+            for subject in self.sections[k][2]['subjects']:
+                coefs[subject['name'].lower()] += subject['coef']
+            kept = []
+            for entry in entries:
+                d = self.grid.days.index(entry['day'])
+                slots = [(d, slot) for slot in entry_slots(entry)]
+                subject = entry['subject'].lower()
+                if (coefs[subject] == 0 or any((k, d, slot) in section_slots for d, slot in slots)
+                        or any((entry['teacher'], d, slot) in teacher_slots for d, slot in slots)):
+                    dropped += 1
+                    continue
+                coefs[subject] -= 1
+                section_slots.update((k, d, slot) for d, slot in slots)
+                teacher_slots.update((entry['teacher'], d, slot) for d, slot in slots)
+                kept.append(entry)
+            self.schedules[k] = kept
+        return dropped
+
+    def find_missing(self):
+        """{k: Counter of lowercased subject -> sessions missing} of the sections missing any."""
+        missing = {}
+        for k, (_, _, section, _) in enumerate(self.sections):
+            counts = Counter()
+            for subject in section['subjects']:
+                counts[subject['name'].lower()] += subject['coef']
+            counts.subtract(entry['subject'].lower() for entry in self.schedules[k])
+            counts = +counts
+            if counts:
+                missing[k] = counts
+        return missing
+
+    def section_keys(self, k):
+        return [key for key in (entry_key(entry, self.grid.days) for entry in self.schedules[k])
+                if key is not None]
+
+    def limit(self, positions, missing):
+        """Keep at most max_sections positions, sections missing sessions first."""
+        positions = sorted(set(positions))
+        if len(positions) <= self.max_sections:
+            return positions
+        troubled = [k for k in positions if k in missing]
+        others = [k for k in positions if k not in missing]
+        self.random.shuffle(troubled)
+        self.random.shuffle(others)
+        return sorted((troubled + others)[:self.max_sections])
+
+    def choose_neighborhood(self, kind, missing):
+        """
+        :return: (label, positions, freed) where `freed` tells whether an
+                 entry of one of the sections at `positions` is re-solved,
+                 or None when this kind has nothing to free
+        """
+        if kind == "teacher":
+            candidates = Counter()
+            for k, subjects in missing.items():
+                teachers = self.sections[k][3]
+                index = self.indexes[id(teachers)]
+                for subject, count in subjects.items():
+                    for t in index.find_suitable_teachers_indices(subject):
+                        candidates[teachers[t]['name']] += count
+            if not candidates:
+                return None
+            names = sorted(candidates)
+            teacher = self.random.choices(names, weights=[candidates[name] for name in names])[0]
+            positions = [k for k, entries in enumerate(self.schedules)
+                         if any(entry['teacher'] == teacher for entry in entries)]
+            for k, subjects in missing.items():
+                teachers = self.sections[k][3]
+                index = self.indexes[id(teachers)]
+                if any(teachers[t]['name'] == teacher
+                       for subject in subjects for t in index.find_suitable_teachers_indices(subject)):
+                    positions.append(k)
+            return (f"teacher {teacher}", self.limit(positions, missing),
+                    lambda entry: entry['teacher'] == teacher)
+
+        level, year_number, _, _ = self.sections[self.random.choice(sorted(missing))]
+        if kind == "day":
+            day = self.random.choice(self.grid.days)
+            positions = [k for k, section in enumerate(self.sections) if section[0] == level]
+            return (f"day {day} of {level}", self.limit(positions, missing),
+                    lambda entry: entry['day'] == day)
+
+        positions = [k for k, section in enumerate(self.sections)
+                     if section[0] == level and section[1] == year_number]
+        return f"year {year_number} of {level}", self.limit(positions, missing), lambda entry: True
+
+    def solve_neighborhood(self, positions, freed):
+        """
+        Re-solve the freed entries of the sections at `positions`, and their
+        missing sessions, around every other entry.
+        :return: (one schedule per position or None when unsolved, status)
+        """
+        from src.joint_schedule_generator import JointScheduleGenerator
+
+        chosen = set(positions)
+        unavailable = {}
+        for k, entries in enumerate(self.schedules):
+            if k in chosen:
+                continue
+            for entry in entries:
+                d = self.grid.days.index(entry['day'])
+                unavailable.setdefault(entry['teacher'], set()).update((d, slot) for slot in entry_slots(entry))
+
+        fixed = [[key for key in (entry_key(entry, self.grid.days) for entry in self.schedules[k]
+                                  if not freed(entry)) if key is not None]
+                 for k in positions]
+        generator = JointScheduleGenerator([self.sections[k] for k in positions], self.rooms,
+                                           settings=self.iteration_settings, deadline=self.deadline,
+                                           previous=[self.section_keys(k) for k in positions],
+                                           grid=self.grid, unavailable=unavailable, fixed=fixed,
+                                           allow_unplaced=True)
+        schedules = generator.generate_schedules()
+        for phase, elapsed in generator.timings.items():
+            self.timings[phase] = self.timings.get(phase, 0.0) + elapsed
+        self.stats['models'] += 1
+        for name in ("variables", "constraints", "wall_time", "conflicts", "branches"):
+            self.stats[name] += generator.stats.get(name, 0)
+        if generator.status not in (STATUS_OPTIMAL, STATUS_FEASIBLE):
+            return None, generator.status
+        return schedules, generator.status
+
+    def generate_schedules(self):
+        """
+        :return: One schedule list per entry of `sections`, in the same order;
+                 self.section_statuses holds FEASIBLE for every complete
+                 section and PARTIAL for those still missing sessions
+        """
+        start = time.perf_counter()
+        self.stats = {"models": 0, "variables": 0, "constraints": 0,
+                      "wall_time": 0.0, "conflicts": 0, "branches": 0}
+        dropped = 0
+        if self.initial is not None:
+            self.schedules = [
+                [entry for entry in (self.make_entry(k, key) for key in keys) if entry is not None]
+                for k, keys in enumerate(self.initial)
+            ]
+            dropped = sum(len(keys) for keys in self.initial) - sum(len(entries) for entries in self.schedules)
+        else:
+            scheduler = GreedyScheduler(self.sections, self.rooms, grid=self.grid)
+            self.schedules = scheduler.generate_schedules()
+            self.timings['greedy'] = time.perf_counter() - start
+        dropped += self.drop_clashes()
+
+        missing = self.find_missing()
+        cost = sum(sum(subjects.values()) for subjects in missing.values())
+        initial_cost = cost
+        self.curve = [{"iteration": 0, "time": time.perf_counter() - start, "missing": cost}]
+        logger.info(f"LNS start: {len(self.sections)} sections, {cost} sessions missing "
+                    f"({dropped} clashing or invalid entries dropped)")
+
+        iteration = 0
+        stalled = 0
+        while cost > 0 and iteration < self.max_iterations and stalled < self.patience:
+            if self.deadline is not None and time.time() >= self.deadline:
+                logger.warning(f"LNS stopped by the request deadline with {cost} sessions missing")
+                break
+            kind = self.neighborhoods[iteration % len(self.neighborhoods)]
+            iteration += 1
+            chosen = self.choose_neighborhood(kind, missing)
+            if chosen is None:
+                stalled += 1
+                continue
+            label, positions, freed = chosen
+
+            schedules, status = self.solve_neighborhood(positions, freed)
+            previous_cost = cost
+            if schedules is not None:
+                before = [self.schedules[k] for k in positions]
+                for k, schedule in zip(positions, schedules):
+                    self.schedules[k] = schedule
+                new_missing = self.find_missing()
+                new_cost = sum(sum(subjects.values()) for subjects in new_missing.values())
+                if new_cost <= cost:
+                    missing, cost = new_missing, new_cost
+                else:
+                    for k, schedule in zip(positions, before):
+                        self.schedules[k] = schedule
+            stalled = stalled + 1 if cost >= previous_cost else 0
+
+            elapsed = time.perf_counter() - start
+            self.curve.append({"iteration": iteration, "time": elapsed, "missing": cost,
+                               "neighborhood": kind, "sections": len(positions), "status": status})
+            logger.info(f"LNS iteration {iteration}: {label}, {len(positions)} sections, {status}, "
+                        f"missing {previous_cost} -> {cost} ({elapsed:.2f}s)")
+
+        self.section_statuses = [STATUS_PARTIAL if k in missing else STATUS_FEASIBLE
+                                 for k in range(len(self.sections))]
+        elapsed = time.perf_counter() - start
+        self.stats.update({"iterations": iteration, "initial_missing": initial_cost,
+                           "missing": cost, "dropped": dropped, "curve": self.curve})
+        logger.info(f"LNS done: {initial_cost} -> {cost} sessions missing in {iteration} iterations, "
+                    f"{elapsed:.2f}s")
+        return self.schedules
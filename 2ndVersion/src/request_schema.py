@@ -0,0 +1,100 @@
+import logging
+import sys
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LEVELS = ("middle_school", "high_school")
+
+
+def require_list(value, path):
+    if type(value) is not list:
+        raise ValueError(f"'{path}' must be a list")
+    return value
+
+
+def require_object(value, path):
+    if type(value) is not dict:
+        raise ValueError(f"'{path}' must be an object")
+    return value
+
+
+def require_name(record, path):
+    name = record.get('name')
+    if type(name) is not str or not name:
+        raise ValueError(f"'{path}.name' must be a non-empty string")
+    return sys.intern(name)
+
+
+def normalize_subjects(subjects, path):
+    # Hot loop of large requests: paths are only formatted on failure
+    intern = sys.intern
+    for j, subject in enumerate(require_list(subjects, path)):
+        if type(subject) is not dict:
+            require_object(subject, f"{path}[{j}]")
+        name = subject.get('name')
+        if type(name) is not str or not name:
+            require_name(subject, f"{path}[{j}]")
+        coef = subject.get('coef')
+        # bool is a subclass of int, hence the exact type check
+        if type(coef) is not int or coef < 0:
+            raise ValueError(f"'{path}[{j}].coef' must be a non-negative integer")
+        length = subject.get('length')
+        if length is not None and (type(length) is not int or length < 1):
+            raise ValueError(f"'{path}[{j}].length' must be a positive integer")
+        subject['name'] = intern(name)
+
+
+def normalize_level(level_data, level):
+    require_object(level_data, level)
+    for y, year_entry in enumerate(require_list(level_data.get('years', []), f"{level}.years")):
+        year_path = f"{level}.years[{y}]"
+        require_object(year_entry, year_path)
+        sections = require_list(year_entry.get('sections', []), f"{year_path}.sections")
+        for i, section in enumerate(sections):
+            if type(section) is not dict:
+                require_object(section, f"{year_path}.sections[{i}]")
+            name = section.get('section')
+            if type(name) is not str or not name:
+                raise ValueError(f"'{year_path}.sections[{i}].section' must be a non-empty string")
+            section['section'] = sys.intern(name)
+            stream = section.get('stream')
+            if type(stream) is str:
+                section['stream'] = sys.intern(stream)
+            subjects = section.get('subjects')
+            if subjects is None:
+                subjects = section['subjects'] = []
+            normalize_subjects(subjects, f"{year_path}.sections[{i}].subjects")
+
+
+def normalize_request(data):
+    """
+    Validate a freshly parsed schedule request and normalize it in place,
+    in one pass over the payload. Names of subjects, teachers, sections,
+    streams and rooms are interned, so the thousands of repeated subject
+    names of a large district share one string each, and malformed records
+    fail with their path instead of surfacing later as a KeyError or a
+    solver error. Keys the scheduler does not know are left as they are.
+    Raises ValueError for invalid requests.
+    :return: `data`
+    """
+    require_object(data, "request")
+    for level in LEVELS:
+        if level in data:
+            normalize_level(data[level], level)
+
+    for t, teacher in enumerate(require_list(data.get('teachers', []), "teachers")):
+        path = f"teachers[{t}]"
+        require_object(teacher, path)
+        teacher['name'] = require_name(teacher, path)
+        subjects = teacher.get('subjects')
+        if subjects is None:
+            subjects = teacher['subjects'] = []
+        for j, subject in enumerate(require_list(subjects, f"{path}.subjects")):
+            require_object(subject, f"{path}.subjects[{j}]")
+            subject['name'] = require_name(subject, f"{path}.subjects[{j}]")
+
+    for r, room in enumerate(require_list(data.get('rooms', []), "rooms")):
+        require_object(room, f"rooms[{r}]")
+        room['name'] = require_name(room, f"rooms[{r}]")
+    return data
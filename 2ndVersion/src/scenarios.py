@@ -0,0 +1,235 @@
+import copy
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.request_schema import LEVELS, normalize_request, require_list, require_object
+from src.feasibility import InfeasibleRequestError
+from src.solver_settings import STATUS_OPTIMAL, STATUS_FEASIBLE
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Changes a scenario applies to the base request, by "op":
+# {"op": "remove_teacher", "name": "HS_Teacher_Physics_1"}
+# {"op": "add_teacher", "teacher": {"name": ..., "subjects": [...]}}
+# {"op": "remove_room", "name": "HS_Room_3L2"}
+# {"op": "add_room", "room": {"name": ..., "type": ...}}
+# {"op": "set_coef", "level": "high_school", "subject": "Arabic", "coef": 4,
+#  "year": 3, "section": "3L1"}            (year and section optional filters)
+# {"op": "add_section", "level": "high_school", "year": 3, "section": {...}}
+# {"op": "remove_section", "level": "high_school", "section": "3L2"}
+CHANGE_OPS = ("remove_teacher", "add_teacher", "remove_room", "add_room",
+              "set_coef", "add_section", "remove_section")
+
+
+def require_level(change, path):
+    level = change.get('level')
+    if level not in LEVELS:
+        raise ValueError(f"'{path}.level' must be one of {', '.join(LEVELS)}")
+    return level
+
+
+def remove_named(records, name, kind, path):
+    kept = [record for record in records if record.get('name') != name]
+    if len(kept) == len(records):
+        raise ValueError(f"'{path}': unknown {kind} '{name}'")
+    return kept
+
+
+def level_sections(data, level):
+    """(year entry, section) pairs of a level of `data`."""
+    return [
+        (year_entry, section)
+        for year_entry in data.get(level, {}).get('years', [])
+        for section in year_entry.get('sections', [])
+    ]
+
+
+def apply_change(data, change, path):
+    """Apply one change to the request `data` in place."""
+    require_object(change, path)
+    op = change.get('op')
+    if op not in CHANGE_OPS:
+        raise ValueError(f"'{path}.op' must be one of {', '.join(CHANGE_OPS)}")
+
+    if op == "remove_teacher":
+        data['teachers'] = remove_named(data.get('teachers', []), change.get('name'), "teacher", path)
+    elif op == "add_teacher":
+        data.setdefault('teachers', []).append(require_object(change.get('teacher'), f"{path}.teacher"))
+    elif op == "remove_room":
+        data['rooms'] = remove_named(data.get('rooms', []), change.get('name'), "room", path)
+    elif op == "add_room":
+        data.setdefault('rooms', []).append(require_object(change.get('room'), f"{path}.room"))
+    elif op == "set_coef":
+        level = require_level(change, path)
+        coef = change.get('coef')
+        if type(coef) is not int or coef < 0:
+            raise ValueError(f"'{path}.coef' must be a non-negative integer")
+        subject_name = str(change.get('subject', '')).lower()
+        matched = 0
+        for year_entry, section in level_sections(data, level):
+            if 'year' in change and year_entry.get('year') != change['year']:
+                continue
+            if 'section' in change and section.get('section') != change['section']:
+                continue
+            for subject in section.get('subjects', []):
+                if subject['name'].lower() == subject_name:
+                    subject['coef'] = coef
+                    matched += 1
+        if not matched:
+            raise ValueError(f"'{path}': no section of {level} matching it has subject '{change.get('subject')}'")
+    elif op == "add_section":
+        level = require_level(change, path)
+        section = require_object(change.get('section'), f"{path}.section")
+        level_data = data.setdefault(level, {"years": []})
+        years = level_data.setdefault('years', [])
+        year_entry = next((y for y in years if y.get('year') == change.get('year')), None)
+        if year_entry is None:
+            year_entry = {"year": change.get('year'), "sections": []}
+            years.append(year_entry)
+        year_entry.setdefault('sections', []).append(section)
+    else:
+        level = require_level(change, path)
+        name = change.get('section')
+        removed = False
+        for year_entry in data.get(level, {}).get('years', []):
+            sections = year_entry.get('sections', [])
+            kept = [section for section in sections if section.get('section') != name]
+            removed = removed or len(kept) != len(sections)
+            year_entry['sections'] = kept
+        if not removed:
+            raise ValueError(f"'{path}': unknown {level} section '{name}'")
+
+
+def build_scenarios(base, scenarios):
+    """
+    Apply every scenario's changes to its own copy of the base request.
+    Raises ValueError, with the path of the offending change, for invalid
+    scenarios.
+    :param base: Normalized base request
+    :param scenarios: [{"name": ..., "changes": [...]}, ...]
+    :return: List of (name, request)
+    """
+    built = []
+    names = set()
+    for i, scenario in enumerate(require_list(scenarios, "scenarios")):
+        path = f"scenarios[{i}]"
+        require_object(scenario, path)
+        name = scenario.get('name', f"scenario-{i + 1}")
+        if type(name) is not str or not name:
+            raise ValueError(f"'{path}.name' must be a non-empty string")
+        if name in names or name == "base":
+            raise ValueError(f"'{path}.name' must be unique and not 'base'")
+        names.add(name)
+
+        data = copy.deepcopy(base)
+        for j, change in enumerate(require_list(scenario.get('changes', []), f"{path}.changes")):
+            apply_change(data, change, f"{path}.changes[{j}]")
+        try:
+            normalize_request(data)
+        except ValueError as e:
+            raise ValueError(f"{path}: {str(e)}")
+        built.append((name, data))
+    return built
+
+
+def section_schedules(schedules):
+    """{(level, section name): set of placed entries} of a response."""
+    placed = {}
+    for level in LEVELS:
+        for year_entry in schedules.get(level, {}).get('years', []):
+            for section in year_entry.get('sections', []):
+                placed[(level, section.get('section'))] = {
+                    (entry['day'], str(entry['slot']), entry['subject'], entry['teacher'], entry['room'])
+                    for entry in section.get('schedule', [])
+                }
+    return placed
+
+
+def changed_sections(base_schedules, schedules):
+    """Sections of `schedules` added, removed or placed differently compared to the base."""
+    before = section_schedules(base_schedules)
+    after = section_schedules(schedules)
+    changes = []
+    for key in after:
+        if key not in before:
+            changes.append({"level": key[0], "section": key[1], "change": "added"})
+        elif after[key] != before[key]:
+            changes.append({"level": key[0], "section": key[1], "change": "changed"})
+    for key in before:
+        if key not in after:
+            changes.append({"level": key[0], "section": key[1], "change": "removed"})
+    return changes
+
+
+def run_scenario(name, schedule_manager):
+    """
+    Solve one scenario.
+    :return: {"name", "summary", "schedules"}; the schedules are None when
+             the capacity checks reject the scenario
+    """
+    start = time.perf_counter()
+    try:
+        schedule_manager.check_feasibility()
+    except InfeasibleRequestError as e:
+        return {
+            "name": name,
+            "summary": {"feasible": False, "problems": e.problems,
+                        "solve_time": time.perf_counter() - start},
+            "schedules": None
+        }
+    schedules = schedule_manager.generate_schedules()
+
+    statuses = {}
+    for level in LEVELS:
+        for year_entry in schedules.get(level, {}).get('years', []):
+            for section in year_entry['sections']:
+                statuses[section['status']] = statuses.get(section['status'], 0) + 1
+    # "solver", "cache" (e.g. shared with the base) or "previous" per section
+    if schedule_manager.request_cache_hit:
+        sources = {"request_cache": sum(statuses.values())}
+    else:
+        sources = {}
+        for section in schedule_manager.diagnostics()['sections']:
+            source = section.get('source', 'unknown')
+            sources[source] = sources.get(source, 0) + 1
+    return {
+        "name": name,
+        "summary": {
+            "feasible": set(statuses) <= {STATUS_OPTIMAL, STATUS_FEASIBLE},
+            "statuses": statuses,
+            "sources": sources,
+            "solve_time": time.perf_counter() - start
+        },
+        "schedules": schedules
+    }
+
+
+def run_scenarios(base_manager, scenario_managers, max_workers):
+    """
+    Solve the base request, then the scenarios concurrently. All managers
+    should share one ScheduleCache: sections a scenario leaves unchanged
+    (same subjects and teachers of those subjects) are then served from the
+    base's cached results instead of being solved again.
+    :param base_manager: ScheduleManager of the base request
+    :param scenario_managers: List of (name, ScheduleManager)
+    :param max_workers: Scenarios solved at the same time; their models
+                        share the solver process pool
+    :return: {"base": result, "scenarios": [result, ...]} with each
+             scenario summary listing its changed sections
+    """
+    base = run_scenario("base", base_manager)
+    if scenario_managers:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(scenario_managers))),
+                                thread_name_prefix="scenario") as executor:
+            results = list(executor.map(lambda item: run_scenario(*item), scenario_managers))
+    else:
+        results = []
+
+    for result in results:
+        if result['schedules'] is not None and base['schedules'] is not None:
+            changes = changed_sections(base['schedules'], result['schedules'])
+            result['summary']['changed_sections'] = changes
+        logger.info(f"Scenario {result['name']}: {result['summary'].get('statuses')}")
+    return {"base": base, "scenarios": results}
@@ -0,0 +1,215 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from src import json_codec
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def canonical_hash(value):
+    """SHA-256 of the canonical JSON form of `value` (sorted keys, no whitespace)."""
+    return hashlib.sha256(json_codec.dumps(value, sort_keys=True)).hexdigest()
+
+
+def normalize_teachers(teachers):
+    """Teacher pool independent of list order and subject spelling case."""
+    return sorted(
+        [teacher['name'], sorted({s['name'].lower() for s in teacher['subjects']})]
+        for teacher in teachers
+    )
+
+
+def normalize_rooms(rooms):
+    return sorted(room['name'] for room in rooms)
+
+
+def request_cache_key(data, levels, solve_mode, formulation, settings, previous=None,
+                      minimize_changes=False, mode="exact", grid=None):
+    """
+    Key of a whole request: its levels in input order, its teachers and
+    rooms in canonical order and every option that changes the result.
+    """
+    if previous is not None:
+        previous = sorted([list(key), sorted(entries)] for key, entries in previous.items())
+    return canonical_hash({
+        "levels": {level: data[level] for level, _ in levels},
+        "teachers": normalize_teachers(data.get('teachers', [])),
+        "rooms": normalize_rooms(data.get('rooms', [])),
+        "solve_mode": solve_mode,
+        "formulation": formulation,
+        "settings": settings.to_dict(),
+        "previous": previous,
+        "minimize_changes": minimize_changes,
+        "mode": mode,
+        "grid": grid.to_dict() if grid is not None else None
+    })
+
+
+def section_cache_key(level, section, teachers, formulation, settings, previous=None,
+                      minimize_changes=False, grid=None):
+    """
+    Key of one independently solved section. The section name, stream and
+    room are left out so that sections with the same subjects and teacher
+    pool share one entry; the request time budget is left out because it
+    does not change a completed result. Only the teachers of the section's
+    subjects are part of the key, as no other teacher enters its model, so
+    a change to another subject's teachers keeps the entry valid.
+    """
+    subject_names = {s['name'].lower() for s in section['subjects']}
+    teachers = [
+        teacher for teacher in teachers
+        if any(s['name'].lower() in subject_names for s in teacher['subjects'])
+    ]
+    solver_settings = settings.to_dict()
+    solver_settings.pop('max_time_per_request', None)
+    return canonical_hash({
+        "level": level,
+        "subjects": [[s['name'], s['coef'], s.get('length')] for s in section['subjects']],
+        "teachers": normalize_teachers(teachers),
+        "formulation": formulation,
+        "settings": solver_settings,
+        "previous": sorted(previous or []),
+        "minimize_changes": minimize_changes,
+        "grid": grid.to_dict() if grid is not None else None
+    })
+
+
+def strip_schedule(schedule):
+    """Drop the section-specific fields of schedule entries before caching them."""
+    return [
+        {key: entry[key] for key in ("day", "subject", "teacher", "time", "slot")}
+        for entry in schedule
+    ]
+
+
+def bind_schedule(entries, room, section):
+    """Rebuild full schedule entries of `section` from stripped cached ones."""
+    return [
+        {
+            "day": entry["day"],
+            "room": room,
+            "subject": entry["subject"],
+            "teacher": entry["teacher"],
+            "time": entry["time"],
+            "slot": entry["slot"],
+            "section": section['section'],
+            "stream": section.get('stream')
+        }
+        for entry in entries
+    ]
+
+
+class ScheduleCache:
+    """
+    Content-addressed cache of solved schedules: a bounded in-memory LRU
+    tier plus an optional on-disk tier evicting the least recently used
+    files beyond a size budget. Values are stored as JSON, so callers
+    always get a fresh copy.
+    """
+
+    def __init__(self, max_entries=1024, directory=None, max_disk_bytes=256 * 1024 * 1024):
+        """
+        :param max_entries: Entries kept in memory, 0 disables the memory tier
+        :param directory: Directory of the disk tier, None disables it
+        :param max_disk_bytes: Size budget of the disk tier
+        """
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "memory_hits": 0, "disk_hits": 0, "stores": 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        with self.lock:
+            encoded = self.memory.get(key)
+            if encoded is not None:
+                self.memory.move_to_end(key)
+                self.counters["hits"] += 1
+                self.counters["memory_hits"] += 1
+                return json_codec.loads(encoded)
+
+            if self.directory:
+                try:
+                    with open(self.path(key), "rb") as f:
+                        encoded = f.read()
+                    # Reading counts as a use for the disk LRU order
+                    os.utime(self.path(key))
+                except OSError:
+                    encoded = None
+                if encoded is not None:
+                    self.counters["hits"] += 1
+                    self.counters["disk_hits"] += 1
+                    self.remember(key, encoded)
+                    return json_codec.loads(encoded)
+
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, key, value):
+        encoded = json_codec.dumps(value)
+        with self.lock:
+            self.counters["stores"] += 1
+            self.remember(key, encoded)
+            if self.directory:
+                tmp_path = f"{self.path(key)}.{os.getpid()}.tmp"
+                try:
+                    with open(tmp_path, "wb") as f:
+                        f.write(encoded)
+                    os.replace(tmp_path, self.path(key))
+                    self.evict_disk()
+                except OSError as e:
+                    logger.error(f"Could not write schedule cache entry: {str(e)}")
+
+    def count_hit(self):
+        """Record a hit served without a lookup (a duplicate of an entry being solved)."""
+        with self.lock:
+            self.counters["hits"] += 1
+
+    def remember(self, key, encoded):
+        if self.max_entries <= 0:
+            return
+        self.memory[key] = encoded
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def evict_disk(self):
+        files = []
+        total = 0
+        for filename in os.listdir(self.directory):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        files.sort()
+        for _, size, path in files:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["memory_entries"] = len(self.memory)
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+            return stats
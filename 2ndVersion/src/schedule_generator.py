@@ -1,161 +1,648 @@
 import logging
+import time
+from collections import defaultdict, Counter
 from ortools.sat.python import cp_model
 
+from src.schedule_cache import strip_schedule
+from src.schedule_index import ScheduleIndex
+from src.schedule_quality import schedule_quality, quality_rank
+from src.time_grid import DAYS, TIME_SLOTS, TimeGrid, is_sport
+from src.solver_settings import SolverSettings, FORMULATIONS, STATUS_TIMEOUT, STATUS_INFEASIBLE
+from src.unsat_core import minimal_core
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Sport is a two-hour block and may only start on these slots of the default grid
+SPORT_START_SLOTS = (0, 2, 4, 6)
+
+# Share of a section's sessions that every alternative timetable places
+# differently from each one found before it
+ALTERNATIVE_MIN_CHANGES = 0.2
+
+def describe_slot(time_slots, subject_name, s):
+    """
+    Return the (time, slot) labels of a session starting at slot s of the
+    default grid. Sport spans two slots, everything else a single one; see
+    TimeGrid.describe for other grids.
+    """
+    if is_sport(subject_name) and s in SPORT_START_SLOTS:
+        time_str = f"{time_slots[s]['start']} - {time_slots[s+1]['end']}"
+        slot_label = f"{s+1}-{s+2}"  # 1-based indexing
+    else:
+        time_str = f"{time_slots[s]['start']} - {time_slots[s]['end']}"
+        slot_label = f"{s+1}"        # 1-based indexing
+    return time_str, slot_label
+
+
 class ScheduleGenerator:
-    def __init__(self, level, year, section, rooms, teachers):
+    def __init__(self, level, year, section, rooms, teachers, formulation="sessions", index=None,
+                 settings=None, deadline=None, previous=None, minimize_changes=False, grid=None):
+        """
+        :param index: ScheduleIndex over rooms/teachers shared between sections;
+                      built on the fly when omitted
+        :param settings: SolverSettings, solver defaults when omitted
+        :param deadline: Wall-clock time (time.time()) by which the request must finish
+        :param previous: Entries of a previous timetable of this section as
+                         (lowercased subject, d, s, teacher name), used as solver hints
+        :param minimize_changes: Maximize the number of previous entries kept
+        :param grid: TimeGrid of the request, the default grid when omitted
+        """
 
+        if formulation not in FORMULATIONS:
+            raise ValueError(f"Unknown formulation '{formulation}', expected one of {', '.join(FORMULATIONS)}")
         self.level = level
         self.year = year
         self.section = section
         self.rooms = rooms
         self.teachers = teachers
+        self.index = index if index is not None else ScheduleIndex(rooms, teachers)
 
         self.schedule = []
+        self.status = None
+        # Model variables of build_model and the (subject_name, d, s, t) keys
+        # of the solution behind self.schedule
+        self.assignments = None
+        self.solution = []
+        # Ranked [{"schedule", "quality"}] of generate_alternatives
+        self.alternatives = []
 
-        self.days = ["lundi", "mardi", "mercredi", "jeudi", "vendredi"]
-        self.time_slots = {
-            0: {"start": "8:00", "end": "9:00"},
-            1: {"start": "9:00", "end": "10:00"},
-            2: {"start": "10:00", "end": "11:00"},
-            3: {"start": "11:00", "end": "12:00"},
-            4: {"start": "13:30", "end": "14:30"},
-            5: {"start": "14:30", "end": "15:30"},
-            6: {"start": "15:30", "end": "16:30"},
-            7: {"start": "16:30", "end": "17:30"}
-        }
+        self.grid = grid if grid is not None else TimeGrid()
+        self.days = self.grid.days
+        self.time_slots = self.grid.time_slots
 
         self.room = self.get_assigned_room()
 
+        self.formulation = formulation
+        self.settings = settings if settings is not None else SolverSettings()
+        self.deadline = deadline
+        self.previous = previous or []
+        self.minimize_changes = minimize_changes
         self.model = cp_model.CpModel()
+        self.timings = {}
+        self.stats = {}
+        self.infeasibility = None
+        # Order interchangeable teachers by load, see break_teacher_symmetry
+        self.symmetry_breaking = True
 
     def get_assigned_room(self):
-
-        section_room_prefix = "MS_Room_" if self.level == "middle_school" else "HS_Room_"
-        section_name = self.section['section']
-        for room in self.rooms:
-            if room['name'] == f"{section_room_prefix}{section_name}":
-                return room['name']
-        logger.error(f"No room assigned to section {section_name}")
-        return None
+        return self.index.get_assigned_room(self.level, self.section['section'])
 
     def find_suitable_teachers_indices(self, subject_name):
-        indices = []
-        for i, teacher in enumerate(self.teachers):
-            for subj in teacher['subjects']:
-                if subj['name'].lower() == subject_name.lower():
-                    indices.append(i)
-                    break
-        return indices
+        return self.index.find_suitable_teachers_indices(subject_name)
 
-    def generate_schedule(self):
+    def build_session_model(self):
+        """
+        Original formulation: every subject is expanded into `coef` session
+        copies, each placed exactly once.
+        :return: List of ((subject_name, d, s, t), var) assignments
+        """
         subjects = self.section['subjects']
         sessions = []
         for subject in subjects:
-            name = subject['name']
-            coef = subject['coef']
-            for _ in range(coef):
-                sessions.append(name)
+            for _ in range(subject['coef']):
+                sessions.append(subject)
 
         num_days = len(self.days)        # e.g. 5
-        num_slots = len(self.time_slots) # e.g. 8
-        num_teachers = len(self.teachers)
         num_sessions = len(sessions)
 
         #
         # 1) Create CP-SAT bool variables x[(i, d, s, t)] for valid combos
         #
         x = {}
+        session_vars = [[] for _ in range(num_sessions)]
         for i in range(num_sessions):
-            subject_name = sessions[i]
+            subject_name = sessions[i]['name']
             suitable_teachers = self.find_suitable_teachers_indices(subject_name)
+            # Multi-slot sessions (Sport) only start where the grid allows
+            starts = self.grid.subject_starts(sessions[i])
             for d in range(num_days):
-                for s in range(num_slots):
-                    # Only create "sport" sessions at the valid start slots (0,2,4,6)
-                    if subject_name.lower() == "sport" and s not in [0, 2, 4, 6]:
-                        continue
+                for s in starts:
                     for t in suitable_teachers:
-                        x[(i, d, s, t)] = self.model.NewBoolVar(f"x_{i}_{d}_{s}_{t}")
+                        var = self.model.NewBoolVar(f"x_{i}_{d}_{s}_{t}")
+                        x[(i, d, s, t)] = var
+                        session_vars[i].append(var)
 
         #
         # 2) Each session i must be assigned exactly once
         #
         for i in range(num_sessions):
-            # gather all x-variables that correspond to this session i
-            i_keys = [key for key in x.keys() if key[0] == i]
-            self.model.Add(sum(x[k] for k in i_keys) == 1)
-
-        #
-        # 3) Teacher conflict constraints:
-        #    a) No two sessions share the same (d, s, t)
-        #    b) If a session is Sport and occupies (d,s,t), it blocks (d,s+1,t) too
-        #
-
-        # Instead of looping over 0..(num_days-1), etc., we only loop over the
-        # actual (d,s,t) that appear in x.keys().
-        # Then we group by day/slot/teacher to apply the constraints.
-        from collections import defaultdict
-        
-        # a) For each (d, s, t), collect all i
-        # b) sum(...) <= 1
-        # c) if any i is Sport, block next_slot
-        day_slot_teacher_map = defaultdict(list)
-        for (i2, d2, s2, t2) in x.keys():
-            day_slot_teacher_map[(d2, s2, t2)].append(i2)
-
-        for (d2, s2, t2), conflict_sessions in day_slot_teacher_map.items():
-            # a) Teacher can't teach >1 session in the same day/slot
-            self.model.Add(
-                sum(x[(i2, d2, s2, t2)] for i2 in conflict_sessions) <= 1
-            )
-
-            # b) If a session is Sport at slot s2, it also blocks s2+1
-            #    We'll look for any j in day_slot_teacher_map[(d2, s2+1, t2)]
-            next_slot = s2 + 1
-            if next_slot < num_slots:
-                next_conflict = day_slot_teacher_map.get((d2, next_slot, t2), [])
-                # For each i that’s Sport in conflict_sessions, forbid pairing with j in next_conflict
-                for i in conflict_sessions:
-                    if sessions[i].lower() == "sport":
-                        for j in next_conflict:
-                            if j != i:
-                                self.model.Add(x[(i, d2, s2, t2)] + x[(j, d2, next_slot, t2)] <= 1)
-
-        #
-        # 4) Solve the model
-        #
-        solver = cp_model.CpSolver()
+            self.model.AddExactlyOne(session_vars[i])
+
+        #
+        # 3) Teacher conflict constraints: a teacher teaches at most one
+        #    session per (d, s), and a session longer than one slot (Sport)
+        #    occupies every slot it spans. One at-most-one per occupied
+        #    (d, s, t) replaces the former pairwise constraints between a
+        #    Sport session and the sessions of its second slot.
+        #
+        lengths = [self.grid.length(subject) for subject in sessions]
+        teacher_occupancy = defaultdict(list)
+        section_occupancy = defaultdict(list)
+        for (i, d, s, t), var in x.items():
+            for slot in range(s, s + lengths[i]):
+                teacher_occupancy[(d, slot, t)].append(var)
+                section_occupancy[(d, slot)].append(var)
+        for occupying in teacher_occupancy.values():
+            if len(occupying) > 1:
+                self.model.AddAtMostOne(occupying)
+
+        #
+        # 4) The section attends at most one session per (d, s)
+        #
+        for occupying in section_occupancy.values():
+            if len(occupying) > 1:
+                self.model.AddAtMostOne(occupying)
+
+        self.assignment_sessions = [i for (i, _, _, _) in x.keys()]
+        return [((sessions[i]['name'], d, s, t), var) for (i, d, s, t), var in x.items()]
+
+    def build_compact_model(self):
+        """
+        Compact formulation: one variable per (subject, day, slot, teacher)
+        and a demand constraint sum == coef per subject. Identical session
+        copies no longer need to be permuted by the solver.
+        :return: List of ((subject_name, d, s, t), var) assignments
+        """
+        num_days = len(self.days)
+
+        #
+        # 1) x[(j, d, s, t)]: subject j starts at (d, s) with teacher t
+        #
+        assignments = []
+        teacher_occupancy = defaultdict(list)
+        section_occupancy = defaultdict(list)
+        teacher_load = defaultdict(list)
+        eligibility = defaultdict(list)
+        for j, subject in enumerate(self.section['subjects']):
+            subject_name = subject['name']
+            suitable_teachers = self.find_suitable_teachers_indices(subject_name)
+            length = self.grid.length(subject)
+            demand = []
+            for t in suitable_teachers:
+                eligibility[t].append(j)
+            for d in range(num_days):
+                for s in self.grid.subject_starts(subject):
+                    for t in suitable_teachers:
+                        var = self.model.NewBoolVar(f"x_{j}_{d}_{s}_{t}")
+                        assignments.append(((subject_name, d, s, t), var))
+                        demand.append(var)
+                        teacher_load[t].append(var)
+                        for slot in range(s, s + length):
+                            teacher_occupancy[(d, slot, t)].append(var)
+                            section_occupancy[(d, slot)].append(var)
+
+            #
+            # 2) Each subject gets exactly `coef` sessions
+            #
+            self.model.Add(sum(demand) == subject['coef'])
+
+        #
+        # 3) A teacher teaches at most one session per (d, s), and the
+        #    section attends at most one; a multi-slot session (Sport)
+        #    occupies every slot it spans
+        #
+        for occupying in list(teacher_occupancy.values()) + list(section_occupancy.values()):
+            if len(occupying) > 1:
+                self.model.AddAtMostOne(occupying)
+
+        self.break_teacher_symmetry(eligibility, teacher_load)
+        return assignments
+
+    def build_interval_model(self):
+        """
+        Interval formulation: the compact variables are the presence
+        literals of optional fixed-size intervals on a week-long time line
+        (day * slots per day + slot). One no-overlap per teacher and one for
+        the section replace the per-slot occupancy constraints, so the model
+        does not grow with the length of the sessions or the number of
+        slots they span, and the section never attends two sessions at once.
+        :return: List of ((subject_name, d, s, t), var) assignments
+        """
+        num_days = len(self.days)
+        num_slots = len(self.time_slots)
+
+        #
+        # 1) x[(j, d, s, t)]: subject j starts at (d, s) with teacher t,
+        #    present interval [d * num_slots + s, + length)
+        #
+        assignments = []
+        teacher_intervals = defaultdict(list)
+        section_intervals = []
+        teacher_load = defaultdict(list)
+        eligibility = defaultdict(list)
+        for j, subject in enumerate(self.section['subjects']):
+            subject_name = subject['name']
+            suitable_teachers = self.find_suitable_teachers_indices(subject_name)
+            length = self.grid.length(subject)
+            demand = []
+            for t in suitable_teachers:
+                eligibility[t].append(j)
+            for d in range(num_days):
+                for s in self.grid.subject_starts(subject):
+                    for t in suitable_teachers:
+                        var = self.model.NewBoolVar(f"x_{j}_{d}_{s}_{t}")
+                        interval = self.model.NewOptionalFixedSizeIntervalVar(
+                            d * num_slots + s, length, var, f"i_{j}_{d}_{s}_{t}"
+                        )
+                        assignments.append(((subject_name, d, s, t), var))
+                        demand.append(var)
+                        teacher_load[t].append(var)
+                        teacher_intervals[t].append(interval)
+                        section_intervals.append(interval)
+
+            #
+            # 2) Each subject gets exactly `coef` sessions
+            #
+            self.model.Add(sum(demand) == subject['coef'])
+
+        #
+        # 3) No two sessions of a teacher, or of the section, overlap
+        #
+        for intervals in teacher_intervals.values():
+            if len(intervals) > 1:
+                self.model.AddNoOverlap(intervals)
+        if len(section_intervals) > 1:
+            self.model.AddNoOverlap(section_intervals)
+
+        self.break_teacher_symmetry(eligibility, teacher_load)
+        return assignments
+
+    def break_teacher_symmetry(self, eligibility, teacher_load):
+        """
+        Symmetry breaking of the compact and interval formulations: teachers
+        eligible for exactly the same subjects of this section are
+        interchangeable, order them by load.
+        :param eligibility: {t: [subject positions]}
+        :param teacher_load: {t: [variables of t]}
+        """
+        if not self.symmetry_breaking:
+            return
+        equivalent = defaultdict(list)
+        for t, subject_indices in eligibility.items():
+            equivalent[tuple(subject_indices)].append(t)
+        for group in equivalent.values():
+            for a, b in zip(group, group[1:]):
+                self.model.Add(sum(teacher_load[a]) >= sum(teacher_load[b]))
+
+    def build_model(self):
+        """
+        Build the model with the configured formulation and record its size.
+        :return: List of ((subject_name, d, s, t), var) assignments
+        """
+        start = time.perf_counter()
+        if self.formulation == "compact":
+            assignments = self.build_compact_model()
+        elif self.formulation == "interval":
+            assignments = self.build_interval_model()
+        else:
+            assignments = self.build_session_model()
+        if self.previous:
+            self.apply_previous(assignments)
+        self.timings['build'] = time.perf_counter() - start
+        proto = self.model.Proto()
+        self.stats['variables'] = len(proto.variables)
+        self.stats['constraints'] = len(proto.constraints)
+        return assignments
+
+    def apply_previous(self, assignments):
+        """
+        Hint the previous timetable of the section and, with minimize_changes,
+        maximize the number of its entries that are kept.
+        """
+        previous = Counter(self.previous)
+        if self.formulation == "sessions":
+            # Hand the previous entries of a subject to its session copies in
+            # order, so every copy is hinted at a single (d, s, t)
+            targets_by_subject = defaultdict(list)
+            for subject, d, s, teacher in self.previous:
+                targets_by_subject[subject].append((d, s, teacher))
+            session_targets = {}
+            for i, ((subject_name, _, _, _), _) in zip(self.assignment_sessions, assignments):
+                if i not in session_targets:
+                    targets = targets_by_subject[subject_name.lower()]
+                    session_targets[i] = targets.pop(0) if targets else None
+            hinted = [
+                session_targets[i] == (d, s, self.teachers[t]['name'])
+                for i, ((_, d, s, t), _) in zip(self.assignment_sessions, assignments)
+            ]
+        else:
+            hinted = [
+                (subject_name.lower(), d, s, self.teachers[t]['name']) in previous
+                for (subject_name, d, s, t), _ in assignments
+            ]
+
+        kept = []
+        for ((subject_name, d, s, t), var), hint in zip(assignments, hinted):
+            self.model.AddHint(var, hint)
+            if (subject_name.lower(), d, s, self.teachers[t]['name']) in previous:
+                kept.append(var)
+        if self.minimize_changes:
+            self.model.Maximize(sum(kept))
+
+    def build_diagnosis_model(self):
+        """
+        Compact model of the section in which every constraint family is
+        guarded by assumption literals: the demand of each subject, the
+        no-overlap of each teacher and of the section, and the further
+        slots blocked by each teacher's multi-slot (Sport) sessions.
+        Teacher availability, once modelled, belongs here as one more family.
+        Descriptions never name the section: identical sections and the
+        section cache share one diagnosis.
+        :return: (CpModel, literals, one description dictionary per literal)
+        """
+        model = cp_model.CpModel()
+        num_days = len(self.days)
+        literals = []
+        descriptions = []
+
+        def guard(description):
+            literal = model.NewBoolVar(f"assume_{len(literals)}")
+            literals.append(literal)
+            descriptions.append(description)
+            return literal
+
+        # (d, s, t) -> sessions starting there, multi-slot sessions started earlier
+        starting = defaultdict(list)
+        blocking = defaultdict(list)
+        blocking_subjects = defaultdict(list)
+        teacher_load = defaultdict(list)
+        section_occupancy = defaultdict(list)
+        for j, subject in enumerate(self.section['subjects']):
+            subject_name = subject['name']
+            suitable_teachers = self.find_suitable_teachers_indices(subject_name)
+            length = self.grid.length(subject)
+            if length > 1:
+                for t in suitable_teachers:
+                    blocking_subjects[t].append(subject_name)
+            demand = []
+            for d in range(num_days):
+                for s in self.grid.subject_starts(subject):
+                    for t in suitable_teachers:
+                        var = model.NewBoolVar(f"x_{j}_{d}_{s}_{t}")
+                        demand.append(var)
+                        starting[(d, s, t)].append(var)
+                        teacher_load[t].append(length * var)
+                        section_occupancy[(d, s)].append(var)
+                        for slot in range(s + 1, s + length):
+                            blocking[(d, slot, t)].append(var)
+                            section_occupancy[(d, slot)].append(var)
+            literal = guard({
+                "type": "subject_demand",
+                "subject": subject_name,
+                "sessions": subject['coef'],
+                "teachers": [self.teachers[t]['name'] for t in suitable_teachers]
+            })
+            model.Add(sum(demand) == subject['coef']).OnlyEnforceIf(literal)
+
+        teacher_literals = {}
+        blocking_literals = {}
+        for (d, s, t), occupying in starting.items():
+            if len(occupying) > 1:
+                if t not in teacher_literals:
+                    teacher_literals[t] = guard({"type": "teacher_no_overlap", "teacher": self.teachers[t]['name']})
+                model.Add(sum(occupying) <= 1).OnlyEnforceIf(teacher_literals[t])
+            blocks = blocking.get((d, s, t), [])
+            if blocks:
+                if t not in blocking_literals:
+                    blocking_literals[t] = guard({"type": "multi_slot_blocking", "teacher": self.teachers[t]['name'],
+                                                  "subjects": blocking_subjects[t]})
+                model.Add(sum(blocks) + sum(occupying) <= 1).OnlyEnforceIf(blocking_literals[t])
+
+        section_literal = None
+        for occupying in section_occupancy.values():
+            if len(occupying) > 1:
+                if section_literal is None:
+                    section_literal = guard({"type": "section_no_overlap"})
+                model.Add(sum(occupying) <= 1).OnlyEnforceIf(section_literal)
+        if section_literal is not None:
+            # Weekly total of the section, implied like the teachers' ones below
+            model.Add(sum(sum(occupying) for occupying in section_occupancy.values())
+                      <= self.grid.week_slots).OnlyEnforceIf(section_literal)
+
+        # Implied by the no-overlap and multi-slot blocking of a teacher,
+        # stated once more as a weekly total so that overloads are proved at once
+        for t, load in teacher_load.items():
+            enforced = [teacher_literals[t]] if t in teacher_literals else []
+            if t in blocking_literals:
+                enforced.append(blocking_literals[t])
+            model.Add(sum(load) <= self.grid.week_slots).OnlyEnforceIf(enforced)
+        return model, literals, descriptions
+
+    def diagnose_infeasibility(self):
+        """
+        Explain an infeasible section with a minimal set of constraint
+        families that cannot hold together, within the diagnosis time
+        budget of the settings.
+        :return: Dictionary with a human-readable "reason", the conflicting
+                 "constraints" and whether the set is proven "minimal"
+        """
+        start = time.perf_counter()
+        model, literals, descriptions = self.build_diagnosis_model()
+        found = minimal_core(model, literals, self.settings, self.settings.diagnosis_deadline(self.deadline))
+        self.timings['diagnose'] = time.perf_counter() - start
+
+        section_name = self.section['section']
+        if found is None:
+            return {
+                "reason": "No conflicting constraints found within the time budget",
+                "constraints": [],
+                "minimal": False
+            }
+        core, minimal = found
+        constraints = [descriptions[p] for p in core]
+        messages = []
+        for constraint in constraints:
+            if constraint['type'] == "subject_demand":
+                unit = "two-slot session" if is_sport(constraint['subject']) else "session"
+                if constraint['sessions'] != 1:
+                    unit += "s"
+                if constraint['teachers']:
+                    messages.append(f"{constraint['subject']} needs {constraint['sessions']} {unit} "
+                                    f"taught by {', '.join(constraint['teachers'])}")
+                else:
+                    messages.append(f"{constraint['subject']} needs {constraint['sessions']} {unit} "
+                                    f"but no teacher teaches it")
+            elif constraint['type'] == "teacher_no_overlap":
+                messages.append(f"{constraint['teacher']} teaches one session at a time")
+            elif constraint['type'] == "section_no_overlap":
+                messages.append("the section attends one session at a time")
+            else:
+                messages.append(f"a {' or '.join(constraint['subjects'])} session of {constraint['teacher']} "
+                                f"also takes the following slots")
+        logger.info(f"Diagnosed section {section_name} in {self.timings['diagnose']:.3f}s: {'; '.join(messages)}")
+        return {
+            "reason": f"Cannot be scheduled: {'; '.join(messages)}",
+            "constraints": constraints,
+            "minimal": minimal
+        }
+
+    def generate_schedule(self):
+        if self.settings.time_limit(self.deadline) == 0:
+            logger.warning(f"Request time budget exhausted before section {self.section['section']}")
+            self.status = STATUS_TIMEOUT
+            return self.schedule
+
+        self.assignments = self.build_model()
+        self.solve_model(self.assignments)
+        return self.schedule
+
+    def generate_copies(self, sections, hints):
+        """
+        Solve the model of this section for structurally identical sections
+        (same subjects and teacher pool): the model is built once, then
+        every section is solved on it with its own hints and random seed.
+        Hints are kept as far as possible (as with minimize_changes), since
+        presolve would otherwise drop them on easy models and hand every
+        copy the same timetable.
+        :param sections: Sections with the subjects of self.section, itself first
+        :param hints: One list of hint entries per section, see `previous`
+        :return: One (schedule, status, timings, stats) tuple per section
+        """
+        # Ordering teachers by load would steer every copy to the same
+        # teachers whatever its hints
+        self.symmetry_breaking = False
+        self.minimize_changes = True
+        results = []
+        assignments = None
+        for copy, (section, previous) in enumerate(zip(sections, hints)):
+            self.section = section
+            self.room = self.get_assigned_room()
+            self.previous = previous
+            self.schedule = []
+            self.timings = {}
+            self.stats = {}
+            if self.settings.time_limit(self.deadline) == 0:
+                logger.warning(f"Request time budget exhausted before section {section['section']}")
+                self.status = STATUS_TIMEOUT
+            elif assignments is None:
+                assignments = self.build_model()
+                model_size = dict(self.stats)
+                self.solve_model(assignments)
+            else:
+                # Only the hints change between copies
+                start = time.perf_counter()
+                self.model.ClearHints()
+                self.model.clear_objective()
+                if self.previous:
+                    self.apply_previous(assignments)
+                self.timings['build'] = time.perf_counter() - start
+                self.stats.update(model_size)
+                self.solve_model(assignments, copy)
+            results.append((self.schedule, self.status, self.timings, self.stats))
+        return results
+
+    def generate_alternatives(self, count):
+        """
+        Collect up to `count` distinct timetables of the section on one model
+        built once. After each solve a cut requires the next timetable to
+        place at least ALTERNATIVE_MIN_CHANGES of the sessions differently
+        from every timetable found so far; the search stops at `count`
+        timetables, when no other one exists or at the request deadline.
+        The timetables are ranked by schedule_quality and the best one
+        becomes self.schedule; self.alternatives holds all of them, best
+        first, as stripped entries with their quality.
+        :return: The best schedule
+        """
+        schedule = self.generate_schedule()
+        if not self.solution:
+            return schedule
+
+        assignments = self.assignments
+        by_key = defaultdict(list)
+        for key, var in assignments:
+            by_key[key].append(var)
+        min_changes = max(1, round(len(self.solution) * ALTERNATIVE_MIN_CHANGES))
+        found = [self.schedule]
+        while len(found) < count and self.settings.time_limit(self.deadline) != 0:
+            # Sessions of the same subject are interchangeable, so the cut
+            # counts the (subject, d, s, t) entries of the last timetable
+            self.model.Add(sum(var for key in self.solution for var in by_key[key])
+                           <= len(self.solution) - min_changes)
+            start = time.perf_counter()
+            solver = self.settings.create_solver(self.deadline)
+            solver.parameters.random_seed = (self.settings.random_seed or 0) + len(found)
+            status = solver.Solve(self.model)
+            self.timings['solve'] += time.perf_counter() - start
+            for name, value in self.settings.solver_stats(solver, status).items():
+                if name != "solver_status":
+                    self.stats[name] += value
+            if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                break
+            start = time.perf_counter()
+            self.schedule, self.solution = self.extract_schedule(solver, assignments)
+            found.append(self.schedule)
+            self.timings['extract'] += time.perf_counter() - start
+
+        qualities = [schedule_quality(schedule) for schedule in found]
+        order = sorted(range(len(found)), key=lambda i: quality_rank(qualities[i]))
+        self.schedule = found[order[0]]
+        self.alternatives = [{"schedule": strip_schedule(found[i]), "quality": qualities[i]} for i in order]
+        logger.info(f"Found {len(found)} alternative timetables for section {self.section['section']}")
+        return self.schedule
+
+    def extract_schedule(self, solver, assignments):
+        """
+        :return: (schedule entries, (subject_name, d, s, t) keys) of the
+                 solution held by `solver`
+        """
+        schedule = []
+        solution = []
+        lengths = {subject['name']: self.grid.length(subject) for subject in self.section['subjects']}
+        for (subject_name, d2, s2, t2), var in assignments:
+            if solver.BooleanValue(var):
+                time_str, slot_label = self.grid.describe(s2, lengths[subject_name])
+
+                schedule.append({
+                    "day": self.days[d2],
+                    "room": self.room,
+                    "subject": subject_name,
+                    "teacher": self.teachers[t2]['name'],
+                    "time": time_str,
+                    "slot": slot_label,
+                    "section": self.section['section'],
+                    "stream": self.section.get('stream')
+                })
+                solution.append((subject_name, d2, s2, t2))
+        return schedule, solution
+
+    def solve_model(self, assignments, seed_offset=0):
+        """
+        Solve the built model and fill self.schedule, self.status and the
+        solve and extract timings.
+        :param seed_offset: Added to the random seed, so copies of one model
+                            do not all follow the same search
+        """
+        #
+        # Solve the model
+        #
+        start = time.perf_counter()
+        solver = self.settings.create_solver(self.deadline)
+        if seed_offset:
+            solver.parameters.random_seed = (self.settings.random_seed or 0) + seed_offset
         status = solver.Solve(self.model)
+        self.timings['solve'] = time.perf_counter() - start
+        self.status, use_solution = self.settings.section_status(status)
+        self.stats.update(self.settings.solver_stats(solver, status))
 
         #
-        # 5) Build self.schedule from solution if feasible
+        # Build self.schedule from solution if feasible
         #
-        if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
+        start = time.perf_counter()
+        if use_solution:
             logger.info(f"Found a feasible assignment for section {self.section['section']}!")
-            # We'll loop directly over x.keys() to avoid any KeyErrors
-            for (i2, d2, s2, t2) in x.keys():
-                if solver.Value(x[(i2, d2, s2, t2)]) == 1:
-                    subject_name = sessions[i2]
-                    if subject_name.lower() == "sport" and s2 in [0,2,4,6]:
-                        time_str = f"{self.time_slots[s2]['start']} - {self.time_slots[s2+1]['end']}"
-                        slot_label = f"{s2+1}-{s2+2}"  # 1-based indexing
-                    else:
-                        time_str = f"{self.time_slots[s2]['start']} - {self.time_slots[s2]['end']}"
-                        slot_label = f"{s2+1}"        # 1-based indexing
-
-                    self.schedule.append({
-                        "day": self.days[d2],
-                        "room": self.room,
-                        "subject": subject_name,
-                        "teacher": self.teachers[t2]['name'],
-                        "time": time_str,
-                        "slot": slot_label,
-                        "section": self.section['section'],
-                        "stream": self.section.get('stream')
-                    })
+            self.schedule, self.solution = self.extract_schedule(solver, assignments)
         else:
-            logger.error(f"No feasible solution found for section {self.section['section']}!")
+            logger.error(f"No feasible solution found for section {self.section['section']} ({self.status})!")
+        self.timings['extract'] = time.perf_counter() - start
 
-        return self.schedule
+        # A search cut short without any solution is diagnosed as well: the
+        # guarded compact model often proves infeasibility where the full
+        # model runs out of time
+        if not use_solution and status != cp_model.FEASIBLE and self.settings.diagnose_infeasible:
+            # Copies of one model share its diagnosis
+            if self.infeasibility is None:
+                self.infeasibility = self.diagnose_infeasibility()
+            if self.infeasibility['constraints']:
+                self.status = STATUS_INFEASIBLE
+            self.stats['infeasibility'] = self.infeasibility
@@ -0,0 +1,43 @@
+import logging
+from collections import defaultdict
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def room_prefix(level):
+    return "MS_Room_" if level == "middle_school" else "HS_Room_"
+
+
+class ScheduleIndex:
+    """
+    Lookup tables built once per request and shared by every section that
+    draws from the same teacher pool, so model construction never rescans
+    the teacher or room lists.
+    """
+
+    def __init__(self, rooms, teachers):
+        """
+        :param rooms: List of rooms
+        :param teachers: List of teachers (the pool of one level)
+        """
+        self.rooms = rooms
+        self.teachers = teachers
+
+        self.room_names = {room['name'] for room in rooms}
+
+        # lowercased subject name -> teacher indices, in pool order
+        self.teachers_by_subject = defaultdict(list)
+        for i, teacher in enumerate(teachers):
+            for subj in dict.fromkeys(s['name'].lower() for s in teacher['subjects']):
+                self.teachers_by_subject[subj].append(i)
+
+    def find_suitable_teachers_indices(self, subject_name):
+        return self.teachers_by_subject.get(subject_name.lower(), [])
+
+    def get_assigned_room(self, level, section_name):
+        room_name = f"{room_prefix(level)}{section_name}"
+        if room_name in self.room_names:
+            return room_name
+        logger.error(f"No room assigned to section {section_name}")
+        return None
@@ -1,80 +1,670 @@
-from src.schedule_generator import ScheduleGenerator
+from src.greedy_scheduler import GreedyScheduler
+from src.schedule_index import ScheduleIndex
+from src.solver_pool import iter_tasks, default_workers
+from src.solver_settings import (
+    SolverSettings, FORMULATIONS, STATUS_OPTIMAL, STATUS_FEASIBLE, STATUS_PARTIAL, STATUS_TIMEOUT
+)
+from src.schedule_cache import (
+    request_cache_key, section_cache_key, strip_schedule, bind_schedule
+)
+from src.warm_start import count_moved, reuse_previous
+from src.feasibility import find_capacity_problems, InfeasibleRequestError
+from src.time_grid import TimeGrid
+from collections import Counter
 import logging
+import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# "section": one model per section (teachers are not shared between models)
+# "level":   one joint model per level
+# "school":  one joint model for every section of the request
+# "lns":     greedy (or previous) timetable of the whole request repaired by
+#            large neighborhood search, see src.lns
+SOLVE_MODES = ("section", "level", "school", "lns")
+
+# "exact": CP-SAT models as chosen by the solve mode
+# "fast":  one GreedyScheduler pass over every section, no solver
+MODES = ("exact", "fast")
+
+
+class ScheduleCancelled(Exception):
+    """Raised by ScheduleManager.generate_schedules when its cancel event is set."""
+
+
+# The CP-SAT generators are imported by the functions that solve with them:
+# OR-Tools takes most of the import time of the service, which requests in
+# fast mode, cache hits and rejected requests never need.
+
+
+def warm_up():
+    """
+    Import the CP-SAT generators and run a tiny solve, so that the first
+    request served by this process does not pay for loading the solver.
+    Runs in the service process and in every pool worker at startup.
+    """
+    start = time.perf_counter()
+    from ortools.sat.python import cp_model
+    import src.schedule_generator  # noqa: F401
+    import src.joint_schedule_generator  # noqa: F401
+    model = cp_model.CpModel()
+    x = model.NewBoolVar("x")
+    model.Add(x == 1)
+    SolverSettings(max_time_per_section=1.0, num_workers=1).create_solver().Solve(model)
+    return time.perf_counter() - start
+
+
+def solve_section(level, year_number, section, index, formulation, settings, deadline,
+                  previous=None, minimize_changes=False, grid=None):
+    """
+    Solve one section on its own. Runs in a pool worker.
+    :param index: ScheduleIndex of the level's rooms and teacher pool
+    :param previous: Previous entries of the section used as hints, see warm_start
+    :param grid: TimeGrid of the request
+    :return: List with one (schedule, status, timings, stats) tuple; with
+             settings.alternatives the stats hold the ranked "alternatives"
+    """
+    logger.info(f"Generating schedule for {level} {year_number} {section['section']}")
+    if not previous and settings.greedy_hint:
+        previous = greedy_hints([(level, year_number, section, index.teachers)], index.rooms, grid)[0]
+        minimize_changes = False
+    from src.schedule_generator import ScheduleGenerator
+    generator = ScheduleGenerator(
+        level=level,
+        year=year_number,
+        section=section,
+        rooms=index.rooms,
+        teachers=index.teachers,
+        formulation=formulation,
+        index=index,
+        settings=settings,
+        deadline=deadline,
+        previous=previous,
+        minimize_changes=minimize_changes,
+        grid=grid
+    )
+    if (settings.alternatives or 1) > 1:
+        schedule = generator.generate_alternatives(settings.alternatives)
+        generator.stats['alternatives'] = generator.alternatives
+    else:
+        schedule = generator.generate_schedule()
+    return [(schedule, generator.status, generator.timings, generator.stats)]
+
+
+def solve_section_group(level, members, index, formulation, settings, deadline, grid=None):
+    """
+    Solve structurally identical sections on one model built once, each
+    with its own hints and random seed. The hints come from a single greedy
+    pass over the whole group, so the hinted timetables do not book a
+    teacher of the pool twice. Runs in a pool worker.
+    :param members: List of (year, section) with the same subjects
+    :param index: ScheduleIndex of the level's rooms and teacher pool
+    :return: One (schedule, status, timings, stats) tuple per member
+    """
+    logger.info(f"Generating schedules for {len(members)} identical {level} sections")
+    hints = [[] for _ in members]
+    if settings.greedy_hint:
+        hints = greedy_hints([(level, year_number, section, index.teachers) for year_number, section in members],
+                             index.rooms, grid)
+    year_number, section = members[0]
+    from src.schedule_generator import ScheduleGenerator
+    generator = ScheduleGenerator(
+        level=level,
+        year=year_number,
+        section=section,
+        rooms=index.rooms,
+        teachers=index.teachers,
+        formulation=formulation,
+        index=index,
+        settings=settings,
+        deadline=deadline,
+        grid=grid
+    )
+    return generator.generate_copies([section for _, section in members], hints)
+
+
+def solve_component(sections, rooms, settings, deadline, previous=None, minimize_changes=False,
+                    grid=None):
+    """
+    Solve sections that share teachers in one joint model. Runs in a pool worker.
+    :param sections: List of (level, year, section, teachers) tuples
+    :param previous: Previous entries of each section used as hints, see warm_start
+    :param grid: TimeGrid of the request
+    :return: List of (schedule, status, timings, stats) tuples in input order
+    """
+    if not any(previous or []) and settings.greedy_hint:
+        previous = greedy_hints(sections, rooms, grid)
+        minimize_changes = False
+    from src.joint_schedule_generator import JointScheduleGenerator
+    generator = JointScheduleGenerator(sections, rooms, settings=settings, deadline=deadline,
+                                       previous=previous, minimize_changes=minimize_changes, grid=grid)
+    schedules = generator.generate_schedules()
+    return [(schedule, generator.status, generator.timings, generator.stats)
+            for schedule in schedules]
+
+
+def solve_lns(sections, rooms, settings, deadline, initial=None, grid=None):
+    """
+    Schedule sections by large neighborhood search. Runs in a pool worker.
+    :param sections: List of (level, year, section, teachers) tuples
+    :param initial: Entries of each section to start from, see warm_start;
+                    a greedy pass when omitted
+    :param grid: TimeGrid of the request
+    :return: List of (schedule, status, timings, stats) tuples in input order;
+             a section left with a double-booking or a missing session is PARTIAL
+    """
+    from src.lns import LnsScheduler
+    scheduler = LnsScheduler(sections, rooms, settings=settings, deadline=deadline, grid=grid,
+                             initial=initial)
+    schedules = scheduler.generate_schedules()
+    return [(schedule, status, scheduler.timings, scheduler.stats)
+            for schedule, status in zip(schedules, scheduler.section_statuses)]
+
+
+def solve_greedy(sections, rooms, grid=None):
+    """
+    Schedule sections with the greedy scheduler only.
+    :param sections: List of (level, year, section, teachers) tuples
+    :param grid: TimeGrid of the request
+    :return: List of (schedule, status, timings, stats) tuples in input order;
+             a section with unplaced sessions is PARTIAL
+    """
+    scheduler = GreedyScheduler(sections, rooms, grid=grid)
+    schedules = scheduler.generate_schedules()
+    return [(schedule, STATUS_PARTIAL if unplaced else STATUS_FEASIBLE, scheduler.timings, scheduler.stats)
+            for schedule, unplaced in zip(schedules, scheduler.unplaced)]
+
+
+def greedy_hints(sections, rooms, grid=None):
+    """Placement of a GreedyScheduler run over `sections`, as solver hints."""
+    scheduler = GreedyScheduler(sections, rooms, grid=grid)
+    scheduler.generate_schedules()
+    return scheduler.placement_keys()
+
+
+def find_components(sections):
+    """
+    Split sections into connected components of the section-teacher graph,
+    where a section is linked to every teacher able to teach one of its
+    subjects.
+    :param sections: List of (level, year, section, teachers) tuples
+    :return: List of components, each a list of positions into `sections`
+    """
+    parent = list(range(len(sections)))
+
+    def find(k):
+        while parent[k] != k:
+            parent[k] = parent[parent[k]]
+            k = parent[k]
+        return k
+
+    indexes = {}
+    teacher_owner = {}
+    for k, (_, _, section, teachers) in enumerate(sections):
+        if id(teachers) not in indexes:
+            indexes[id(teachers)] = ScheduleIndex([], teachers)
+        index = indexes[id(teachers)]
+        for subject in section['subjects']:
+            for t in index.find_suitable_teachers_indices(subject['name']):
+                name = teachers[t]['name']
+                if name in teacher_owner:
+                    parent[find(k)] = find(teacher_owner[name])
+                else:
+                    teacher_owner[name] = k
+
+    components = {}
+    for k in range(len(sections)):
+        components.setdefault(find(k), []).append(k)
+    return list(components.values())
+
+
 class ScheduleManager:
-    def __init__(self, data, rooms, teachers):
+    def __init__(self, data, rooms, teachers, solve_mode="section", formulation="sessions",
+                 max_workers=None, settings=None, progress_callback=None, cancel_event=None,
+                 cache=None, previous=None, minimize_changes=False, mode="exact", grid=None):
         """
         :param data: Dictionary containing 'middle_school' and/or 'high_school' data
         :param rooms: List of rooms
         :param teachers: List of teachers
+        :param solve_mode: One of SOLVE_MODES
+        :param formulation: Per-section model, one of schedule_generator.FORMULATIONS
+        :param max_workers: Number of models solved concurrently, defaults to the CPU count
+        :param settings: SolverSettings applied to every model
+        :param progress_callback: Called with (sections done, sections total) after each model
+        :param cancel_event: threading.Event; once set, no further model is started
+        :param cache: ScheduleCache for whole requests and independently solved sections
+        :param previous: Previous timetable as parsed by warm_start.parse_previous_schedules;
+                         its entries are used as solver hints and moved entries are reported
+        :param minimize_changes: Keep as many previous entries as possible
+        :param mode: One of MODES
+        :param grid: TimeGrid of the request; when given it is echoed in the
+                     response as "time_grid", the default grid otherwise
         """
+        if solve_mode not in SOLVE_MODES:
+            raise ValueError(f"Unknown solve mode '{solve_mode}', expected one of {', '.join(SOLVE_MODES)}")
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode '{mode}', expected one of {', '.join(MODES)}")
+        if formulation not in FORMULATIONS:
+            raise ValueError(f"Unknown formulation '{formulation}', expected one of {', '.join(FORMULATIONS)}")
+        if settings is not None and (settings.alternatives or 1) > 1 and (solve_mode != "section" or mode != "exact"):
+            raise ValueError("Alternatives are only collected in the section solve mode of the exact mode")
         self.data = data
         self.rooms = rooms
         self.teachers = teachers
+        self.solve_mode = solve_mode
+        self.formulation = formulation
+        self.max_workers = max_workers or default_workers()
+        self.settings = settings if settings is not None else SolverSettings()
+        self.deadline = None
+        self.progress_callback = progress_callback
+        self.cancel_event = cancel_event
+        self.cache = cache
+        self.previous = previous
+        self.minimize_changes = minimize_changes
+        self.mode = mode
+        self.custom_grid = grid is not None
+        self.grid = grid if grid is not None else TimeGrid()
+        self.timings = {}
+        self.stats = {}
+        self.section_diagnostics = []
+        self.model_runs = []
+        self.request_cache_hit = False
+        self.capacity_problems = None
+        self.check_time = 0.0
         logger.info(f"Total teachers loaded: {len(self.teachers)}")
 
-    def generate_schedules(self):
-        schedules = {}
-
         middle_teachers = [t for t in self.teachers if t['name'].startswith("MS_Teacher_")]
         high_teachers = [t for t in self.teachers if t['name'].startswith("HS_Teacher_")]
 
         logger.info(f"Middle school teachers found: {len(middle_teachers)}")
         logger.info(f"High school teachers found: {len(high_teachers)}")
 
+        # Requested levels as (level, teacher pool) and every requested
+        # section as (level, year, section, teachers), in input order
+        self.levels = []
         if 'middle_school' in self.data:
-            middle_schedule = self.generate_level_schedule(
-                'middle_school',
-                self.data['middle_school'],
-                middle_teachers
-            )
-            schedules['middle_school'] = middle_schedule
-
+            self.levels.append(('middle_school', middle_teachers))
         if 'high_school' in self.data:
-            high_schedule = self.generate_level_schedule(
-                'high_school',
-                self.data['high_school'],
-                high_teachers
-            )
-            schedules['high_school'] = high_schedule
+            self.levels.append(('high_school', high_teachers))
+        self.sections = self.collect_sections(self.levels)
+
+    def generate_schedules(self):
+        request_key = None
+        if self.cache is not None:
+            request_key = request_cache_key(self.data, self.levels, self.solve_mode,
+                                            self.formulation, self.settings,
+                                            self.previous, self.minimize_changes, self.mode, self.grid)
+            schedules = self.cache.get(request_key)
+            if schedules is not None:
+                logger.info("Serving schedules from the request cache")
+                self.request_cache_hit = True
+                if self.progress_callback:
+                    self.progress_callback(len(self.sections), len(self.sections))
+                return schedules
+
+        section_results = [None for _ in self.sections]
+        for k, section_result in self.iter_section_schedules():
+            section_results[k] = section_result
+        schedules = self.assemble_schedules(self.levels, section_results)
+        if self.previous is not None:
+            moved = sum(section_result["moved"] for section_result in section_results)
+            logger.info(f"{moved} entries moved compared to the previous timetable")
 
+        # A timed-out section could be solved given more time, do not pin it
+        statuses = [section_result["status"] for section_result in section_results]
+        if request_key is not None and STATUS_TIMEOUT not in statuses:
+            self.cache.put(request_key, schedules)
         return schedules
 
-    def generate_level_schedule(self, level, level_data, teachers):
-        level_schedule = {"years": []}
-        years = level_data.get('years', [])
+    def check_feasibility(self):
+        """
+        Run the capacity checks of src.feasibility once and raise
+        InfeasibleRequestError when one fails. Teachers only compete across
+        sections when they share a model, i.e. outside the section solve
+        mode or in fast mode.
+        """
+        if self.capacity_problems is None:
+            start = time.perf_counter()
+            shared_teachers = self.mode == "fast" or self.solve_mode != "section"
+            self.capacity_problems = find_capacity_problems(self.levels, self.data, shared_teachers, self.grid)
+            self.check_time = time.perf_counter() - start
+        if self.capacity_problems:
+            logger.warning(f"Rejected infeasible request: {self.capacity_problems}")
+            raise InfeasibleRequestError(self.capacity_problems)
 
-        for year_entry in years:
-            year_number = year_entry.get('year')
-            sections = year_entry.get('sections', [])
-            year_schedule_data = {
+    def iter_section_schedules(self):
+        """
+        Solve every section and yield each one as soon as its model is solved,
+        without keeping earlier results around.
+        :return: Generator of (position in self.sections, section result) where
+                 a section result holds level, year, section, stream, status
+                 and schedule, plus the diagnosis of an infeasible section
+                 when settings.diagnose_infeasible is set and the ranked
+                 alternatives when settings.alternatives asks for several
+        """
+        sections = self.sections
+
+        start = time.perf_counter()
+        self.check_feasibility()
+        self.deadline = self.settings.request_deadline()
+        if self.mode == "fast":
+            tasks, positions = self.plan_fast_tasks(sections)
+        elif self.solve_mode == "section":
+            tasks, positions = self.plan_section_tasks(sections)
+        elif self.solve_mode == "lns":
+            tasks, positions = self.plan_lns_tasks(sections)
+        else:
+            tasks, positions = self.plan_component_tasks(sections)
+        logger.info(f"Solving {len(sections)} sections as {len(tasks)} tasks on up to {self.max_workers} workers")
+
+        self.timings = {"check": self.check_time}
+        # Model size and CP-SAT statistics summed over the solved models
+        self.stats = {"models": 0, "variables": 0, "constraints": 0,
+                      "wall_time": 0.0, "conflicts": 0, "branches": 0}
+        self.section_diagnostics = [None for _ in sections]
+        # (timings, stats) of every model solved by this run
+        self.model_runs = []
+        done = 0
+        if self.progress_callback:
+            self.progress_callback(done, len(sections))
+
+        def section_result(k, schedule, status, infeasibility=None, alternatives=None):
+            level, year_number, section, teachers = sections[k]
+            result = {
+                "level": level,
                 "year": year_number,
-                "sections": []
+                "section": section.get('section'),
+                "stream": section.get('stream'),
+                "status": status,
+                "schedule": schedule
             }
+            if self.previous is not None:
+                result["moved"] = count_moved(self.section_previous(k), schedule, self.grid.days)
+            if infeasibility is not None:
+                result["infeasibility"] = infeasibility
+            if alternatives:
+                # Stripped entries, shared by identical sections and the cache
+                room = self.indexes[id(teachers)].get_assigned_room(level, section['section'])
+                result["alternatives"] = [
+                    dict(alternative, schedule=bind_schedule(alternative['schedule'], room, section))
+                    for alternative in alternatives
+                ]
+            return k, result
 
-            for section in sections:
-                logger.info(f"Generating schedule for {level} {year_number} {section['section']}")
-                logger.info(f"Available teachers: {[t['name'] for t in teachers]}")
-
-                generator = ScheduleGenerator(
-                    level=level,
-                    year=year_number,
-                    section=section,
-                    rooms=self.rooms,
-                    teachers=teachers
-                )
-                schedule = generator.generate_schedule()
-
-                section_schedule = {
-                    "section": section.get('section'),
-                    "stream": section.get('stream'),
-                    "schedule": schedule
-                }
-                year_schedule_data["sections"].append(section_schedule)
+        for k, schedule, status, source, infeasibility, alternatives in self.ready_results:
+            self.section_diagnostics[k] = {"status": status, "source": source}
+            done += 1
+            if self.progress_callback:
+                self.progress_callback(done, len(sections))
+            yield section_result(k, schedule, status, infeasibility, alternatives)
+
+        results_iter = iter_tasks(tasks, self.max_workers)
+        try:
+            for i, results in results_iter:
+                if self.cancel_event is not None and self.cancel_event.is_set():
+                    raise ScheduleCancelled("Schedule generation was cancelled")
+                task_positions = positions[i]
+                # A joint model reports its timings once for all of its
+                # sections, copies of a model template once per section
+                runs = {id(timings): (timings, stats) for _, _, timings, stats in results}
+                for timings, stats in runs.values():
+                    for phase, elapsed in timings.items():
+                        self.timings[phase] = self.timings.get(phase, 0.0) + elapsed
+                    self.model_runs.append((timings, stats))
+                    if stats:
+                        self.stats["models"] += 1
+                        for name in ("variables", "constraints", "wall_time", "conflicts", "branches"):
+                            self.stats[name] += stats.get(name, 0)
+                if self.mode == "exact" and self.solve_mode == "section" and len(results) == 1:
+                    results = self.share_section_result(i, task_positions, results[0])
+                done += len(task_positions)
+                if self.progress_callback:
+                    self.progress_callback(done, len(sections))
+                model_sections = Counter(id(timings) for _, _, timings, _ in results)
+                for k, (schedule, status, timings, stats) in zip(task_positions, results):
+                    stats = stats or {}
+                    self.section_diagnostics[k] = {
+                        "status": status,
+                        "source": "solver",
+                        "model_sections": model_sections[id(timings)],
+                        "timings": timings,
+                        "stats": {name: value for name, value in stats.items() if name != 'alternatives'}
+                    }
+                    yield section_result(k, schedule, status, stats.get('infeasibility'),
+                                         stats.get('alternatives'))
+        finally:
+            # Also reached when the consumer stops early (client disconnect)
+            results_iter.close()
+        self.timings['total'] = time.perf_counter() - start
+
+        logger.info(
+            f"Solved in {self.solve_mode} mode: "
+            + ", ".join(f"{phase} {elapsed:.3f}s" for phase, elapsed in self.timings.items())
+        )
+
+    def diagnostics(self):
+        """
+        Timings, model size and CP-SAT statistics of the last run, overall
+        and per section. A section's "source" is "solver", "cache" or
+        "previous" (kept from the previous timetable); sections solved by
+        one joint or shared model report that model's figures.
+        """
+        sections = []
+        for k, (level, year_number, section, _) in enumerate(self.sections):
+            entry = {"level": level, "year": year_number, "section": section.get('section')}
+            if k < len(self.section_diagnostics) and self.section_diagnostics[k] is not None:
+                entry.update(self.section_diagnostics[k])
+            sections.append(entry)
+        return {
+            "mode": self.mode,
+            "solve_mode": self.solve_mode,
+            "formulation": self.formulation,
+            "request_cache_hit": self.request_cache_hit,
+            "timings": dict(self.timings),
+            "stats": dict(self.stats),
+            "sections": sections
+        }
+
+    def section_previous(self, k):
+        """Previous entries of section k, empty without a previous timetable."""
+        if self.previous is None:
+            return []
+        level, _, section, _ = self.sections[k]
+        return self.previous.get((level, section.get('section')), [])
+
+    def collect_sections(self, levels):
+        """
+        Flatten the requested levels into (level, year, section, teachers)
+        tuples in input order.
+        """
+        sections = []
+        for level, teachers in levels:
+            for year_entry in self.data[level].get('years', []):
+                for section in year_entry.get('sections', []):
+                    sections.append((level, year_entry.get('year'), section, teachers))
+        return sections
+
+    def plan_section_tasks(self, sections):
+        """
+        Sections are solved independently, one task each. The index of a
+        level's pool is built once and shipped with every task of the level.
+        Sections with the same subjects, teacher pool and previous timetable
+        are structurally identical and share the task planned first; with
+        settings.diverse_sections they are instead solved as copies of one
+        model, see solve_section_group. With a cache, sections already
+        solved are served from it. Sections whose previous timetable is
+        still valid keep it without a solve.
+        """
+        tasks = []
+        positions = []
+        self.indexes = {}
+        self.task_keys = []
+        self.ready_results = []
+        planned = {}
+        groups = {}
+        for k, (level, year_number, section, teachers) in enumerate(sections):
+            if id(teachers) not in self.indexes:
+                self.indexes[id(teachers)] = ScheduleIndex(self.rooms, teachers)
+            index = self.indexes[id(teachers)]
+
+            if self.previous is not None:
+                schedule = reuse_previous(level, section, self.section_previous(k), index, self.grid)
+                if schedule is not None:
+                    self.ready_results.append((k, schedule, STATUS_OPTIMAL, "previous", None, None))
+                    continue
+
+            shape = (id(teachers), level,
+                     tuple((s['name'], s['coef'], s.get('length')) for s in section['subjects']),
+                     tuple(sorted(self.section_previous(k))))
+            if self.settings.diverse_sections and not self.section_previous(k):
+                groups.setdefault(shape, []).append(k)
+                continue
+            if shape in planned:
+                if self.cache is not None:
+                    self.cache.count_hit()
+                positions[planned[shape]].append(k)
+                continue
 
-            level_schedule["years"].append(year_schedule_data)
+            key = None
+            if self.cache is not None:
+                key = section_cache_key(level, section, teachers, self.formulation, self.settings,
+                                        self.section_previous(k), self.minimize_changes, self.grid)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    room = index.get_assigned_room(level, section['section'])
+                    self.ready_results.append(
+                        (k, bind_schedule(cached['schedule'], room, section), cached['status'], "cache",
+                         cached.get('infeasibility'), cached.get('alternatives'))
+                    )
+                    continue
+            planned[shape] = len(tasks)
 
-        return level_schedule
+            tasks.append((solve_section,
+                          (level, year_number, section, index, self.formulation,
+                           self.settings, self.deadline, self.section_previous(k),
+                           self.minimize_changes, self.grid)))
+            positions.append([k])
+            self.task_keys.append(key)
+
+        # Diverse copies are not shared through the section cache: a cached
+        # result would hand every copy the same timetable again
+        for members in groups.values():
+            level, _, _, teachers = sections[members[0]]
+            tasks.append((solve_section_group,
+                          (level, [(sections[k][1], sections[k][2]) for k in members],
+                           self.indexes[id(teachers)], self.formulation, self.settings,
+                           self.deadline, self.grid)))
+            positions.append(members)
+            self.task_keys.append(None)
+        return tasks, positions
+
+    def share_section_result(self, i, task_positions, result):
+        """
+        Store the result of section task i in the cache and copy it to the
+        identical sections that were waiting on it.
+        :return: One (schedule, status, timings, stats) tuple per position
+        """
+        schedule, status, timings, stats = result
+        key = self.task_keys[i]
+        if key is None and len(task_positions) == 1:
+            return [result]
+
+        stripped = strip_schedule(schedule)
+        if key is not None and status != STATUS_TIMEOUT:
+            entry = {"schedule": stripped, "status": status}
+            if stats.get('infeasibility') is not None:
+                entry["infeasibility"] = stats['infeasibility']
+            if stats.get('alternatives'):
+                entry["alternatives"] = stats['alternatives']
+            self.cache.put(key, entry)
+
+        results = [result]
+        for k in task_positions[1:]:
+            level, _, section, teachers = self.sections[k]
+            room = self.indexes[id(teachers)].get_assigned_room(level, section['section'])
+            results.append((bind_schedule(stripped, room, section), status, timings, stats))
+        return results
+
+    def plan_fast_tasks(self, sections):
+        """Fast mode: a single greedy pass, run inline, covers every section."""
+        self.ready_results = []
+        if not sections:
+            return [], []
+        return [(solve_greedy, (sections, self.rooms, self.grid))], [list(range(len(sections)))]
+
+    def plan_lns_tasks(self, sections):
+        """LNS mode: one search over every section, started from the previous timetable when given."""
+        self.ready_results = []
+        if not sections:
+            return [], []
+        initial = None
+        if self.previous is not None:
+            initial = [self.section_previous(k) for k in range(len(sections))]
+        return ([(solve_lns, (sections, self.rooms, self.settings, self.deadline, initial, self.grid))],
+                [list(range(len(sections)))])
+
+    def plan_component_tasks(self, sections):
+        """
+        Joint modes: one model per level or for the whole school, further
+        split into connected components of the section-teacher graph since
+        components share no constraint.
+        """
+        self.ready_results = []
+        if self.solve_mode == "school":
+            groups = [list(range(len(sections)))]
+        else:
+            by_level = {}
+            for k, (level, _, _, _) in enumerate(sections):
+                by_level.setdefault(level, []).append(k)
+            groups = list(by_level.values())
+
+        tasks = []
+        positions = []
+        for group in groups:
+            for component in find_components([sections[k] for k in group]):
+                component_positions = [group[k] for k in component]
+                tasks.append((solve_component,
+                              ([sections[k] for k in component_positions], self.rooms,
+                               self.settings, self.deadline,
+                               [self.section_previous(k) for k in component_positions],
+                               self.minimize_changes, self.grid)))
+                positions.append(component_positions)
+        # Largest components first so they are never the last to start
+        order = sorted(range(len(tasks)), key=lambda i: -len(positions[i]))
+        return [tasks[i] for i in order], [positions[i] for i in order]
+
+    def assemble_schedules(self, levels, section_results):
+        """
+        Rebuild the {"level": {"years": [{"sections": [...]}]}} structure in
+        input order from one section result per collected section.
+        """
+        schedules = {}
+        section_results = iter(section_results)
+        for level, _ in levels:
+            level_schedule = {"years": []}
+            for year_entry in self.data[level].get('years', []):
+                year_schedule_data = {
+                    "year": year_entry.get('year'),
+                    "sections": []
+                }
+                for section in year_entry.get('sections', []):
+                    section_result = next(section_results)
+                    section_schedule = {
+                        "section": section.get('section'),
+                        "stream": section.get('stream'),
+                        "schedule": section_result["schedule"],
+                        "status": section_result["status"]
+                    }
+                    if "moved" in section_result:
+                        section_schedule["moved"] = section_result["moved"]
+                    if "infeasibility" in section_result:
+                        section_schedule["infeasibility"] = section_result["infeasibility"]
+                    if "alternatives" in section_result:
+                        section_schedule["alternatives"] = section_result["alternatives"]
+                    year_schedule_data["sections"].append(section_schedule)
+                level_schedule["years"].append(year_schedule_data)
+            schedules[level] = level_schedule
+        if self.custom_grid:
+            schedules["time_grid"] = self.grid.to_dict()
+        return schedules
@@ -0,0 +1,35 @@
+from collections import Counter, defaultdict
+
+from src.warm_start import entry_slots
+
+# Quality figures of a section's timetable, lower is better, in the order
+# alternatives are ranked by
+QUALITY_ORDER = ("gaps", "repeated_subjects", "max_teacher_daily_load")
+
+
+def schedule_quality(schedule):
+    """
+    Quality figures of one section's timetable:
+    "gaps": free slots between the first and the last session of a day
+    "repeated_subjects": sessions of a subject beyond its first one of a day
+    "max_teacher_daily_load": most slots a teacher teaches the section in one day
+    :param schedule: Schedule entries of the section
+    """
+    occupied = defaultdict(set)
+    sessions = Counter()
+    loads = Counter()
+    for entry in schedule:
+        slots = entry_slots(entry)
+        occupied[entry['day']].update(slots)
+        sessions[(entry['day'], entry['subject'])] += 1
+        loads[(entry['teacher'], entry['day'])] += len(slots)
+    return {
+        "gaps": sum(max(slots) - min(slots) + 1 - len(slots) for slots in occupied.values()),
+        "repeated_subjects": sum(count - 1 for count in sessions.values()),
+        "max_teacher_daily_load": max(loads.values(), default=0)
+    }
+
+
+def quality_rank(quality):
+    """Sort key of a schedule_quality result."""
+    return tuple(quality[name] for name in QUALITY_ORDER)
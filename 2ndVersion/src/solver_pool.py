@@ -0,0 +1,105 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def get_pool():
+    """
+    Process pool shared by every request, sized to the machine. Workers are
+    spawned rather than forked so they never inherit solver threads of the
+    parent process.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = default_workers()
+            logger.info(f"Starting solver pool with {workers} workers")
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def warm_pool(function):
+    """
+    Start every worker of the pool now rather than on the first request, each
+    one running `function` (e.g. schedule_manager.warm_up) so it is ready to
+    solve. The executor spawns a new worker for each task submitted while
+    none is idle, so calls submitted back to back reach every worker.
+    :param function: Module-level callable without arguments
+    :return: List of futures of the calls
+    """
+    pool = get_pool()
+    return [pool.submit(function) for _ in range(default_workers())]
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def iter_tasks(tasks, max_workers):
+    """
+    Run callables with their arguments, in the pool when more than one worker
+    is allowed, inline otherwise. Closing the generator early cancels the
+    tasks that have not started yet.
+    :param tasks: List of (function, args) tuples; functions must be module level
+    :param max_workers: Upper bound on concurrently running tasks
+    :return: Generator of (task index, result) in completion order
+    """
+    if max_workers <= 1 or len(tasks) <= 1:
+        for i, (function, args) in enumerate(tasks):
+            yield i, function(*args)
+        return
+
+    pool = get_pool()
+    futures = {}
+    try:
+        pending = list(enumerate(tasks))
+        pending.reverse()
+        # Keep at most max_workers tasks of this request in flight so one
+        # request cannot take over the pool shared with other requests
+        while pending or futures:
+            while pending and len(futures) < max_workers:
+                i, (function, args) = pending.pop()
+                futures[pool.submit(function, *args)] = i
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = futures.pop(future)
+                yield i, future.result()
+    except BrokenProcessPool:
+        # A worker died (OOM, signal); start a fresh pool for the next request
+        logger.error("Solver pool is broken, restarting it")
+        shutdown_pool()
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def run_tasks(tasks, max_workers):
+    """
+    Like iter_tasks but wait for every task.
+    :return: Results in task order
+    """
+    results = [None] * len(tasks)
+    for i, result in iter_tasks(tasks, max_workers):
+        results[i] = result
+    return results
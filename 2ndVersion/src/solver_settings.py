@@ -0,0 +1,208 @@
+import logging
+import os
+import time
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Per-section outcome reported in the response
+STATUS_OPTIMAL = "OPTIMAL"
+STATUS_FEASIBLE = "FEASIBLE"
+STATUS_TIMEOUT = "TIMEOUT"
+STATUS_INFEASIBLE = "INFEASIBLE"
+# Fast mode only: some sessions could not be placed
+STATUS_PARTIAL = "PARTIAL"
+
+# Per-section model formulations of ScheduleGenerator, defined here so the
+# request path can validate them without importing the solver:
+# "sessions": one variable per session copy x[(i, d, s, t)] (original model)
+# "compact":  one variable per subject x[(subject, d, s, t)] with sum == coef
+# "interval": compact variables as presence literals of optional intervals,
+#             with one no-overlap per teacher and per section
+FORMULATIONS = ("sessions", "compact", "interval")
+
+
+class SolverSettings:
+    """
+    CP-SAT parameters and time budgets applied to every model of a request.
+    Server defaults come from the environment; a request may tighten them
+    but never exceed the server time limits.
+    """
+
+    # name -> (type, environment variable)
+    FIELDS = {
+        'max_time_per_section': (float, 'SCHEDULER_MAX_TIME_PER_SECTION'),
+        'max_time_per_request': (float, 'SCHEDULER_MAX_TIME_PER_REQUEST'),
+        'num_workers': (int, 'SCHEDULER_NUM_SEARCH_WORKERS'),
+        'random_seed': (int, 'SCHEDULER_RANDOM_SEED'),
+        'return_best_feasible': (bool, 'SCHEDULER_RETURN_BEST_FEASIBLE'),
+        'greedy_hint': (bool, 'SCHEDULER_GREEDY_HINT'),
+        'diagnose_infeasible': (bool, 'SCHEDULER_DIAGNOSE_INFEASIBLE'),
+        'max_time_diagnosis': (float, 'SCHEDULER_MAX_TIME_DIAGNOSIS'),
+        'diverse_sections': (bool, 'SCHEDULER_DIVERSE_SECTIONS'),
+        'max_time_per_edit': (float, 'SCHEDULER_MAX_TIME_PER_EDIT'),
+        'max_time_lns_iteration': (float, 'SCHEDULER_MAX_TIME_LNS_ITERATION'),
+        'alternatives': (int, 'SCHEDULER_ALTERNATIVES'),
+    }
+
+    def __init__(self, max_time_per_section=None, max_time_per_request=None,
+                 num_workers=None, random_seed=None, return_best_feasible=True, greedy_hint=True,
+                 diagnose_infeasible=False, max_time_diagnosis=5.0, diverse_sections=False,
+                 max_time_per_edit=1.0, max_time_lns_iteration=1.0, alternatives=1):
+        """
+        :param max_time_per_section: Seconds allowed for one model, None for no limit
+        :param max_time_per_request: Seconds allowed for the whole request, None for no limit
+        :param num_workers: CP-SAT search workers, None for the solver default
+        :param random_seed: CP-SAT random seed, None for the solver default
+        :param return_best_feasible: Return a solution found before the time limit
+                                     instead of reporting TIMEOUT
+        :param greedy_hint: Hint every model with a greedy_scheduler solution
+                            when no previous timetable is given
+        :param diagnose_infeasible: Explain infeasible sections with a
+                                    minimal set of conflicting constraints
+        :param max_time_diagnosis: Seconds allowed for the diagnosis of one
+                                   section, None for no limit
+        :param diverse_sections: Solve identical sections of the section
+                                 solve mode as copies of one model with their
+                                 own hints and seeds instead of sharing one
+                                 timetable
+        :param max_time_per_edit: Seconds allowed for the model of an edit of a
+                                  stored timetable, None for no limit; the best
+                                  timetable found by then is kept
+        :param max_time_lns_iteration: Seconds allowed for the model of one
+                                       iteration of the lns solve mode, None
+                                       for no limit
+        :param alternatives: Distinct timetables collected per section in the
+                             section solve mode, ranked by schedule_quality;
+                             every extra one is a solve of up to
+                             max_time_per_section on the same model;
+                             other modes reject more than one
+        """
+        self.max_time_per_section = max_time_per_section
+        self.max_time_per_request = max_time_per_request
+        self.num_workers = num_workers
+        self.random_seed = random_seed
+        self.return_best_feasible = return_best_feasible
+        self.greedy_hint = greedy_hint
+        self.diagnose_infeasible = diagnose_infeasible
+        self.max_time_diagnosis = max_time_diagnosis
+        self.diverse_sections = diverse_sections
+        self.max_time_per_edit = max_time_per_edit
+        self.max_time_lns_iteration = max_time_lns_iteration
+        self.alternatives = alternatives
+
+    @classmethod
+    def parse(cls, name, value):
+        kind = cls.FIELDS[name][0]
+        if value is None:
+            return None
+        if kind is bool:
+            if isinstance(value, str):
+                return value.strip().lower() in ("1", "true", "yes", "on")
+            return bool(value)
+        try:
+            value = kind(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Solver setting '{name}' must be {'an integer' if kind is int else 'a number'}")
+        if value < 0:
+            raise ValueError(f"Solver setting '{name}' must not be negative")
+        return value
+
+    @classmethod
+    def from_env(cls, environ=None):
+        environ = os.environ if environ is None else environ
+        values = {}
+        for name, (_, variable) in cls.FIELDS.items():
+            if environ.get(variable):
+                values[name] = cls.parse(name, environ[variable])
+        return cls(**values)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def merge(self, overrides):
+        """
+        Apply request-level overrides on top of these (server) settings.
+        :param overrides: Dictionary of setting name -> value
+        """
+        if not isinstance(overrides, dict):
+            raise ValueError("'solver' must be an object")
+        unknown = set(overrides) - set(self.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown solver settings: {', '.join(sorted(unknown))}")
+
+        values = self.to_dict()
+        for name, value in overrides.items():
+            value = self.parse(name, value)
+            server_limit = values[name]
+            if name.startswith('max_time') and server_limit is not None:
+                value = server_limit if value is None else min(value, server_limit)
+            values[name] = value
+        return SolverSettings(**values)
+
+    def request_deadline(self):
+        """Wall-clock deadline of a request starting now, or None."""
+        if self.max_time_per_request is None:
+            return None
+        return time.time() + self.max_time_per_request
+
+    def time_limit(self, deadline=None):
+        """Seconds the next model may run given the request deadline, or None."""
+        limit = self.max_time_per_section
+        if deadline is not None:
+            remaining = max(0.0, deadline - time.time())
+            limit = remaining if limit is None else min(limit, remaining)
+        return limit
+
+    def create_solver(self, deadline=None):
+        # Imported on first use: OR-Tools is most of the startup time of the
+        # service, see benchmarks/startup_profile.py
+        from ortools.sat.python import cp_model
+        solver = cp_model.CpSolver()
+        limit = self.time_limit(deadline)
+        if limit is not None:
+            solver.parameters.max_time_in_seconds = limit
+        if self.num_workers:
+            solver.parameters.num_workers = self.num_workers
+        if self.random_seed is not None:
+            solver.parameters.random_seed = self.random_seed
+        return solver
+
+    def diagnosis_deadline(self, deadline=None):
+        """Wall-clock deadline of a diagnosis starting now, or None."""
+        limits = []
+        if self.max_time_diagnosis is not None:
+            limits.append(time.time() + self.max_time_diagnosis)
+        if deadline is not None:
+            limits.append(deadline)
+        return min(limits) if limits else None
+
+    def solver_stats(self, solver, status):
+        """CP-SAT statistics of a finished solve."""
+        return {
+            "solver_status": solver.StatusName(status),
+            "wall_time": solver.WallTime(),
+            "conflicts": solver.NumConflicts(),
+            "branches": solver.NumBranches()
+        }
+
+    def section_status(self, status):
+        """
+        Map a CP-SAT status to the status reported for a section.
+        :return: (status name, whether the solution should be used)
+        """
+        from ortools.sat.python import cp_model
+        if status == cp_model.OPTIMAL:
+            return STATUS_OPTIMAL, True
+        if status == cp_model.FEASIBLE:
+            # A solution exists but the search was cut short by the time limit
+            if self.return_best_feasible:
+                return STATUS_FEASIBLE, True
+            return STATUS_TIMEOUT, False
+        if status == cp_model.INFEASIBLE:
+            return STATUS_INFEASIBLE, False
+        if status == cp_model.MODEL_INVALID:
+            logger.error("CP-SAT rejected the model as invalid")
+            return STATUS_INFEASIBLE, False
+        # UNKNOWN: the time limit was hit before any solution was found
+        return STATUS_TIMEOUT, False
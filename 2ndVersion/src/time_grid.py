@@ -0,0 +1,182 @@
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DAYS = ["lundi", "mardi", "mercredi", "jeudi", "vendredi"]
+TIME_SLOTS = {
+    0: {"start": "8:00", "end": "9:00"},
+    1: {"start": "9:00", "end": "10:00"},
+    2: {"start": "10:00", "end": "11:00"},
+    3: {"start": "11:00", "end": "12:00"},
+    4: {"start": "13:30", "end": "14:30"},
+    5: {"start": "14:30", "end": "15:30"},
+    6: {"start": "15:30", "end": "16:30"},
+    7: {"start": "16:30", "end": "17:30"}
+}
+
+GRID_FIELDS = ("days", "slots", "session_length", "sport_length")
+
+
+def is_sport(subject_name):
+    return subject_name.lower() == "sport"
+
+
+def parse_time(value, path):
+    """'8:30' -> 510 minutes after midnight."""
+    hours, _, minutes = str(value).partition(":")
+    try:
+        hours, minutes = int(hours), int(minutes)
+    except ValueError:
+        raise ValueError(f"'{path}' must be a time such as '8:30'")
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"'{path}' must be a time such as '8:30'")
+    return hours * 60 + minutes
+
+
+def require_length(value, path):
+    # bool is a subclass of int, hence the exact type check
+    if type(value) is not int or value < 1:
+        raise ValueError(f"'{path}' must be a positive integer")
+    return value
+
+
+class TimeGrid:
+    """
+    Days and periods a timetable is built on.
+
+    Periods are numbered from 0 within a day. Consecutive periods whose end
+    and start times meet form a block; a gap between them (the lunch break
+    of the default grid) is never spanned by a session. A session lasts
+    `session_length` periods, Sport `sport_length` and any subject may set
+    its own "length". Sessions start on multiples of the session length
+    from the start of their block, Sport on multiples of its own length,
+    which on the default grid gives the historical Sport slots 0, 2, 4, 6.
+    """
+
+    def __init__(self, days=None, time_slots=None, session_length=1, sport_length=None):
+        """
+        :param days: Day names, DAYS when omitted
+        :param time_slots: {period: {"start": "8:00", "end": "9:00"}}, TIME_SLOTS when omitted
+        :param session_length: Periods of an ordinary session
+        :param sport_length: Periods of a Sport session, twice the session length when omitted
+        """
+        self.days = list(days) if days is not None else list(DAYS)
+        self.time_slots = dict(time_slots) if time_slots is not None else dict(TIME_SLOTS)
+        self.session_length = session_length
+        self.sport_length = sport_length if sport_length is not None else 2 * session_length
+
+        # First period of the block of every period
+        self.block_start = []
+        previous_end = None
+        for s in range(len(self.time_slots)):
+            start = parse_time(self.time_slots[s]['start'], f"time_grid.slots[{s}].start")
+            if s and start == previous_end:
+                self.block_start.append(self.block_start[-1])
+            else:
+                self.block_start.append(s)
+            previous_end = parse_time(self.time_slots[s]['end'], f"time_grid.slots[{s}].end")
+        self._starts = {}
+
+    @classmethod
+    def from_dict(cls, value):
+        """
+        Read the "time_grid" object of a request:
+        {"days": [...], "slots": [{"start": "8:00", "end": "8:30"}, ...],
+         "session_length": 2, "sport_length": 4}, every key optional.
+        Raises ValueError for invalid grids.
+        """
+        if type(value) is not dict:
+            raise ValueError("'time_grid' must be an object")
+        unknown = set(value) - set(GRID_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown time_grid fields: {', '.join(sorted(unknown))}")
+
+        days = value.get('days')
+        if days is not None:
+            if type(days) is not list or not days:
+                raise ValueError("'time_grid.days' must be a non-empty list")
+            for d, day in enumerate(days):
+                if type(day) is not str or not day:
+                    raise ValueError(f"'time_grid.days[{d}]' must be a non-empty string")
+            if len(set(days)) != len(days):
+                raise ValueError("'time_grid.days' must not repeat a day")
+
+        time_slots = None
+        slots = value.get('slots')
+        if slots is not None:
+            if type(slots) is not list or not slots:
+                raise ValueError("'time_grid.slots' must be a non-empty list")
+            time_slots = {}
+            previous_end = None
+            for s, slot in enumerate(slots):
+                path = f"time_grid.slots[{s}]"
+                if type(slot) is not dict:
+                    raise ValueError(f"'{path}' must be an object")
+                start = parse_time(slot.get('start'), f"{path}.start")
+                end = parse_time(slot.get('end'), f"{path}.end")
+                if end <= start:
+                    raise ValueError(f"'{path}' must end after it starts")
+                if previous_end is not None and start < previous_end:
+                    raise ValueError(f"'{path}' must not start before the previous slot ends")
+                previous_end = end
+                time_slots[s] = {"start": slot['start'], "end": slot['end']}
+
+        session_length = require_length(value.get('session_length', 1), "time_grid.session_length")
+        sport_length = value.get('sport_length')
+        if sport_length is not None:
+            require_length(sport_length, "time_grid.sport_length")
+        return cls(days, time_slots, session_length, sport_length)
+
+    def to_dict(self):
+        return {
+            "days": self.days,
+            "slots": [self.time_slots[s] for s in sorted(self.time_slots)],
+            "session_length": self.session_length,
+            "sport_length": self.sport_length
+        }
+
+    @property
+    def num_days(self):
+        return len(self.days)
+
+    @property
+    def num_slots(self):
+        return len(self.time_slots)
+
+    @property
+    def week_slots(self):
+        return len(self.days) * len(self.time_slots)
+
+    def length(self, subject):
+        """Periods taken by one session of a request subject."""
+        length = subject.get('length')
+        if length is not None:
+            return length
+        return self.sport_length if is_sport(subject['name']) else self.session_length
+
+    def subject_starts(self, subject):
+        """Periods a session of `subject` may start on, see the class docstring."""
+        length = self.length(subject)
+        alignment = length if is_sport(subject['name']) else self.session_length
+        return self.starts(length, alignment)
+
+    def starts(self, length, alignment=1):
+        key = (length, alignment)
+        if key not in self._starts:
+            self._starts[key] = tuple(
+                s for s in range(len(self.time_slots) - length + 1)
+                if self.block_start[s + length - 1] == self.block_start[s]
+                and (s - self.block_start[s]) % alignment == 0
+            )
+        return self._starts[key]
+
+    def describe(self, s, length):
+        """
+        (time, slot) labels of a session of `length` periods starting at s,
+        e.g. ("8:00 - 10:00", "1-2"); slot labels are 1-based.
+        """
+        last = s + length - 1
+        time_str = f"{self.time_slots[s]['start']} - {self.time_slots[last]['end']}"
+        slot_label = f"{s+1}" if length == 1 else f"{s+1}-{last+1}"
+        return time_str, slot_label
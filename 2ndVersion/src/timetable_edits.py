@@ -0,0 +1,284 @@
+import logging
+import time
+from collections import defaultdict
+
+from src.scenarios import apply_change
+from src.request_schema import LEVELS, normalize_request, require_list, require_object
+from src.schedule_manager import ScheduleManager
+from src.time_grid import TimeGrid
+from src.warm_start import entry_key, entry_slots
+from src.solver_settings import STATUS_OPTIMAL, STATUS_FEASIBLE
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Changes of a stored timetable, by "op": the request changes of
+# src.scenarios except rooms, plus teacher availability:
+# {"op": "teacher_unavailable", "teacher": "HS_Teacher_Math_0", "day": "lundi", "slots": [1, 2]}
+# {"op": "teacher_available", "teacher": "HS_Teacher_Math_0", "day": "lundi"}
+# "slots" are 1-based like the "slot" of schedule entries; the whole day when omitted.
+REQUEST_OPS = ("remove_teacher", "add_teacher", "set_coef", "add_section", "remove_section")
+EDIT_OPS = REQUEST_OPS + ("teacher_unavailable", "teacher_available")
+
+
+class EditRejectedError(ValueError):
+    """Raised when the sections an edit affects cannot be scheduled around the rest of the timetable."""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+def request_grid(request):
+    if request.get('time_grid') is not None:
+        return TimeGrid.from_dict(request['time_grid'])
+    return None
+
+
+def section_entries(schedules):
+    """{(level, section name): (entries, status)} of a stored response."""
+    sections = {}
+    for level in LEVELS:
+        for year_entry in schedules.get(level, {}).get('years', []):
+            for section in year_entry.get('sections', []):
+                sections[(level, section['section'])] = (section['schedule'], section['status'])
+    return sections
+
+
+def section_shape(section):
+    return [(s['name'], s['coef'], s.get('length')) for s in section['subjects']]
+
+
+def apply_availability(unavailable, change, request, grid, path):
+    teacher = change.get('teacher')
+    if teacher not in {t['name'] for t in request.get('teachers', [])}:
+        raise ValueError(f"'{path}': unknown teacher '{teacher}'")
+    day = change.get('day')
+    if day not in grid.days:
+        raise ValueError(f"'{path}.day' must be one of {', '.join(grid.days)}")
+    slots = change.get('slots')
+    if slots is None:
+        slots = list(range(1, grid.num_slots + 1))
+    for slot in require_list(slots, f"{path}.slots"):
+        if type(slot) is not int or not 1 <= slot <= grid.num_slots:
+            raise ValueError(f"'{path}.slots' must hold slot numbers from 1 to {grid.num_slots}")
+
+    days = unavailable.setdefault(teacher, {})
+    if change['op'] == "teacher_unavailable":
+        days[day] = sorted(set(days.get(day, [])) | set(slots))
+    else:
+        days[day] = sorted(set(days.get(day, [])) - set(slots))
+        if not days[day]:
+            del days[day]
+    if not days:
+        del unavailable[teacher]
+
+
+def apply_edits(timetable, changes, grid):
+    """Apply changes to the request and availability of `timetable` in place."""
+    for j, change in enumerate(require_list(changes, "changes")):
+        path = f"changes[{j}]"
+        require_object(change, path)
+        op = change.get('op')
+        if op not in EDIT_OPS:
+            raise ValueError(f"'{path}.op' must be one of {', '.join(EDIT_OPS)}")
+        if op in REQUEST_OPS:
+            apply_change(timetable['request'], change, path)
+        else:
+            apply_availability(timetable['unavailable'], change, timetable['request'], grid, path)
+    normalize_request(timetable['request'])
+
+
+def edit_timetable(timetable, changes, settings):
+    """
+    Apply changes to a stored timetable and re-solve only the sections they
+    affect: new sections, sections whose subjects changed, sections whose
+    entries use a removed or unavailable teacher and sections the stored
+    timetable left unsolved. Every other section is kept as it is, its
+    teachers' slots being unavailable to the affected ones, which are
+    solved together in one joint model. The model first keeps every entry
+    the edit left valid and only places the others; when that fails, the
+    affected sections are re-solved keeping as many of their entries as
+    possible, then their whole levels. Sections that stay unsolved are
+    kept as stored; when the sections the edit invalidated cannot be
+    solved, EditRejectedError is raised.
+    :param timetable: Record of src.timetable_store, updated in place
+    :param changes: List of changes, see EDIT_OPS
+    :param settings: SolverSettings of the re-solve; a model runs for at
+                     most settings.max_time_per_edit
+    :return: {"sections": [{"level", "section", "added", "removed"}], "resolved_sections",
+              "status", "timings"} describing the edit
+    """
+    start = time.perf_counter()
+    if settings.max_time_per_edit is not None:
+        settings = settings.merge({"max_time_per_section": settings.max_time_per_edit,
+                                   "return_best_feasible": True})
+    before = section_entries(timetable['schedules'])
+    old_shapes = {
+        (level, section['section']): section_shape(section)
+        for level in LEVELS
+        for year_entry in timetable['request'].get(level, {}).get('years', [])
+        for section in year_entry.get('sections', [])
+    }
+    grid = request_grid(timetable['request'])
+    apply_edits(timetable, changes, grid or TimeGrid())
+
+    request = timetable['request']
+    manager = ScheduleManager(request, request.get('rooms', []), request.get('teachers', []),
+                              settings=settings, grid=grid)
+    grid = manager.grid
+    sections = manager.sections
+
+    declared = defaultdict(set)
+    for teacher, days in timetable['unavailable'].items():
+        for day, slots in days.items():
+            declared[teacher].update((grid.days.index(day), slot - 1) for slot in slots)
+
+    # Sections to re-solve, with the entries the edit leaves valid
+    affected = []
+    kept = {}
+    retried = set()
+    for k, (level, _, section, teachers) in enumerate(sections):
+        key = (level, section['section'])
+        if key not in before:
+            affected.append(k)
+            kept[k] = []
+            continue
+        pool = {teacher['name'] for teacher in teachers}
+        old_subjects = {name.lower(): (coef, length) for name, coef, length in old_shapes.get(key, [])}
+        new_subjects = {name.lower(): (coef, length) for name, coef, length in section_shape(section)}
+        valid = []
+        for entry in before[key][0]:
+            subject = entry['subject'].lower()
+            if (entry['teacher'] in pool
+                    and old_subjects.get(subject) == new_subjects.get(subject)
+                    and not any((grid.days.index(entry['day']), slot) in declared[entry['teacher']]
+                                for slot in entry_slots(entry))):
+                valid.append(entry)
+        # A section left unsolved by the stored timetable is retried, the
+        # edit may have made it solvable
+        unsolved = before[key][1] not in (STATUS_OPTIMAL, STATUS_FEASIBLE)
+        if len(valid) < len(before[key][0]) or old_subjects != new_subjects or unsolved:
+            affected.append(k)
+            kept[k] = valid
+            if unsolved:
+                retried.add(k)
+    timings = {"check": time.perf_counter() - start}
+
+    # Sections the edit itself invalidated; when the unsolved sections still
+    # have no solution, they are solved again without them
+    edited = [k for k in affected if k not in retried]
+    attempts = edit_attempts(sections, affected, kept)
+    if len(edited) < len(affected):
+        attempts += edit_attempts(sections, edited, kept)
+
+    results, status, resolved = None, STATUS_OPTIMAL, []
+    for positions, fixed in attempts:
+        results, status = solve_neighborhood(manager, positions, before, declared, settings, timings, fixed)
+        if results is not None:
+            resolved = positions
+            break
+        logger.info(f"Edit neighborhood of {len(positions)} sections has no solution ({status})")
+    if results is None and edited:
+        raise EditRejectedError(f"The edit leaves no valid timetable ({status})", status)
+    if results is None:
+        status = STATUS_OPTIMAL
+
+    start = time.perf_counter()
+    solved = dict(zip(resolved, results or []))
+    section_results = []
+    diff = []
+    for k, (level, _, section, _) in enumerate(sections):
+        key = (level, section['section'])
+        if k not in solved:
+            schedule, section_status = before[key]
+            section_results.append({"schedule": schedule, "status": section_status})
+            continue
+        schedule = solved[k]
+        section_results.append({"schedule": schedule, "status": status})
+
+        old = [entry_signature(entry) for entry in before.get(key, ([], None))[0]]
+        new = [entry_signature(entry) for entry in schedule]
+        added = [entry for entry, signature in zip(schedule, new) if signature not in old]
+        removed = [entry for entry, signature in zip(before.get(key, ([], None))[0], old)
+                   if signature not in new]
+        if added or removed:
+            diff.append({"level": level, "section": section['section'], "added": added, "removed": removed})
+    current = {(level, section['section']) for level, _, section, _ in sections}
+    for (level, name), (entries, _) in before.items():
+        if (level, name) not in current:
+            diff.append({"level": level, "section": name, "added": [], "removed": entries})
+
+    timetable['schedules'] = manager.assemble_schedules(manager.levels, section_results)
+    timetable['version'] += 1
+    timings['extract'] = timings.get('extract', 0.0) + time.perf_counter() - start
+    return {
+        "sections": diff,
+        "resolved_sections": len(solved),
+        "status": status,
+        "timings": timings
+    }
+
+
+def edit_attempts(sections, affected, kept):
+    """
+    Neighborhoods tried for the sections at `affected`, cheapest first: only
+    re-place the sessions the edit invalidated, then re-solve the sections,
+    then their whole levels, whose other sections may have to move too.
+    :return: List of (positions, entries kept per position or None)
+    """
+    if not affected:
+        return []
+    attempts = []
+    if any(kept[k] for k in affected):
+        attempts.append((affected, [kept[k] for k in affected]))
+    attempts.append((affected, None))
+    levels = {sections[k][0] for k in affected}
+    attempts.append(([k for k, (level, _, _, _) in enumerate(sections) if level in levels], None))
+    return attempts
+
+
+def entry_signature(entry):
+    return (entry['day'], str(entry['slot']), entry['subject'], entry['teacher'], entry['room'])
+
+
+def solve_neighborhood(manager, positions, before, declared, settings, timings, fixed=None):
+    """
+    Solve the sections at `positions` of manager.sections in one joint
+    model around the entries of all other sections.
+    :param fixed: One list of entries per position that must be kept, or None
+    :return: (one schedule per position or None when unsolved, status)
+    """
+    from src.joint_schedule_generator import JointScheduleGenerator
+
+    grid = manager.grid
+    chosen = set(positions)
+    unavailable = defaultdict(set)
+    for teacher, slots in declared.items():
+        unavailable[teacher].update(slots)
+    for k, (level, _, section, _) in enumerate(manager.sections):
+        if k in chosen:
+            continue
+        for entry in before.get((level, section['section']), ([], None))[0]:
+            d = grid.days.index(entry['day'])
+            unavailable[entry['teacher']].update((d, slot) for slot in entry_slots(entry))
+
+    neighborhood = [manager.sections[k] for k in positions]
+    previous = []
+    for level, _, section, _ in neighborhood:
+        entries = before.get((level, section['section']), ([], None))[0]
+        previous.append([key for key in (entry_key(entry, grid.days) for entry in entries) if key is not None])
+
+    if fixed is not None:
+        fixed = [[key for key in (entry_key(entry, grid.days) for entry in entries) if key is not None]
+                 for entries in fixed]
+    generator = JointScheduleGenerator(neighborhood, manager.rooms, settings=settings,
+                                       deadline=settings.request_deadline(), previous=previous,
+                                       minimize_changes=True, grid=grid, unavailable=unavailable,
+                                       fixed=fixed)
+    schedules = generator.generate_schedules()
+    for phase, elapsed in generator.timings.items():
+        timings[phase] = timings.get(phase, 0.0) + elapsed
+    if generator.status not in (STATUS_OPTIMAL, STATUS_FEASIBLE):
+        return None, generator.status
+    return schedules, generator.status
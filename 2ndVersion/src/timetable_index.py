@@ -0,0 +1,105 @@
+import logging
+
+from src.request_schema import LEVELS
+from src.time_grid import DAYS, TIME_SLOTS
+from src.warm_start import entry_slots, parse_slot_start
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Views of a stored timetable, by URL segment: the entry field each one is
+# keyed by. "days" answers "what happens on mardi (at slot 3)".
+VIEWS = {
+    "teachers": "teacher",
+    "rooms": "room",
+    "sections": "section",
+    "days": "day"
+}
+
+
+class TimetableIndex:
+    """
+    Entries of one version of a stored timetable indexed by teacher, room,
+    section and day, each also by day and by (day, slot), so that a lookup
+    is a couple of dictionary reads returning only the entries asked for.
+    A session spanning several slots is listed under each of them.
+    """
+
+    def __init__(self, timetable):
+        """
+        :param timetable: Record of src.timetable_store
+        """
+        self.id = timetable['id']
+        self.version = timetable['version']
+        schedules = timetable['schedules']
+        if isinstance(schedules.get('time_grid'), dict):
+            self.days = list(schedules['time_grid']['days'])
+            self.num_slots = len(schedules['time_grid']['slots'])
+        else:
+            self.days = list(DAYS)
+            self.num_slots = len(TIME_SLOTS)
+
+        request = timetable['request']
+        # Names a view knows, so that a free teacher is told apart from an unknown one
+        self.names = {
+            "teacher": {teacher['name'] for teacher in request.get('teachers', [])},
+            "room": {room['name'] for room in request.get('rooms', [])},
+            "section": set(),
+            "day": set(self.days)
+        }
+        # view -> name -> None (every entry), day or (day, 1-based slot) -> entries
+        self.entries = {field: {} for field in VIEWS.values()}
+        for level in LEVELS:
+            for year_entry in schedules.get(level, {}).get('years', []):
+                for section in year_entry.get('sections', []):
+                    self.names['section'].add(section['section'])
+                    for entry in section.get('schedule', []):
+                        self.add(dict(entry, level=level, year=year_entry.get('year')))
+
+        order = {day: d for d, day in enumerate(self.days)}
+        for by_name in self.entries.values():
+            for by_key in by_name.values():
+                for entries in by_key.values():
+                    entries.sort(key=lambda entry: (order.get(entry['day'], len(order)),
+                                                    parse_slot_start(entry['slot'])))
+
+    def add(self, entry):
+        day = entry['day']
+        keys = [None, day] + [(day, slot + 1) for slot in entry_slots(entry)]
+        for field in VIEWS.values():
+            name = entry.get(field)
+            if name is None:
+                continue
+            by_key = self.entries[field].setdefault(name, {})
+            for key in keys:
+                by_key.setdefault(key, []).append(entry)
+
+    def knows(self, field, name):
+        return name in self.names[field] or name in self.entries[field]
+
+    def lookup(self, field, name, day=None, slot=None, level=None):
+        """
+        Entries of `name` in the view keyed by `field`, sorted by day and slot.
+        :param day: Only the entries of this day
+        :param slot: Only the entries holding this 1-based slot of `day`
+        :param level: Only the entries of this level, e.g. for a section
+                      name used by both levels
+        """
+        if field == "day":
+            if day is not None and day != name:
+                raise ValueError(f"'day' must be {name} in the view of day {name}")
+            day = name
+        if slot is not None and day is None:
+            raise ValueError("'slot' requires a 'day'")
+        if day is not None and day not in self.days:
+            raise ValueError(f"'day' must be one of {', '.join(self.days)}")
+        if slot is not None and not 1 <= slot <= self.num_slots:
+            raise ValueError(f"'slot' must be a slot number from 1 to {self.num_slots}")
+        if level is not None and level not in LEVELS:
+            raise ValueError(f"'level' must be one of {', '.join(LEVELS)}")
+
+        key = (day, slot) if slot is not None else day
+        entries = self.entries[field].get(name, {}).get(key, [])
+        if level is not None:
+            entries = [entry for entry in entries if entry['level'] == level]
+        return entries
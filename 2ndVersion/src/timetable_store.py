@@ -0,0 +1,147 @@
+import logging
+import os
+import threading
+import time
+import uuid
+
+from src import json_codec
+from src.timetable_index import TimetableIndex
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def new_timetable(request, schedules):
+    """
+    :param request: Normalized schedule request the timetable was solved from
+    :param schedules: Its /generate-schedule response
+    """
+    now = time.time()
+    return {
+        "id": uuid.uuid4().hex,
+        "version": 1,
+        "request": request,
+        "schedules": schedules,
+        # {teacher name: {day: [1-based slots]}}
+        "unavailable": {},
+        "created_at": now,
+        "updated_at": now
+    }
+
+
+class InMemoryTimetableStore:
+    """
+    Timetables kept in a dictionary of the serving process, each with a
+    TimetableIndex of its current version for the teacher, room, section
+    and day views.
+    """
+
+    def __init__(self):
+        self.timetables = {}
+        self.lock = threading.Lock()
+        # One lock per timetable serializes its edits
+        self.edit_locks = {}
+        self.indexes = {}
+
+    def create(self, timetable):
+        index = TimetableIndex(timetable)
+        with self.lock:
+            self.timetables[timetable['id']] = json_codec.dumps(timetable)
+            self.indexes[timetable['id']] = index
+        return timetable
+
+    def get(self, timetable_id):
+        with self.lock:
+            encoded = self.timetables.get(timetable_id)
+        return json_codec.loads(encoded) if encoded is not None else None
+
+    def put(self, timetable):
+        timetable['updated_at'] = time.time()
+        index = TimetableIndex(timetable)
+        with self.lock:
+            self.timetables[timetable['id']] = json_codec.dumps(timetable)
+            self.indexes[timetable['id']] = index
+        return timetable
+
+    def delete(self, timetable_id):
+        with self.lock:
+            self.edit_locks.pop(timetable_id, None)
+            self.indexes.pop(timetable_id, None)
+            return self.timetables.pop(timetable_id, None) is not None
+
+    def index(self, timetable_id):
+        """TimetableIndex of a timetable, None when it is unknown."""
+        with self.lock:
+            index = self.indexes.get(timetable_id)
+        if index is None:
+            # Stored before this process started (FileTimetableStore)
+            timetable = self.get(timetable_id)
+            if timetable is None:
+                return None
+            index = TimetableIndex(timetable)
+            with self.lock:
+                self.indexes.setdefault(timetable_id, index)
+        return index
+
+    def edit_lock(self, timetable_id):
+        with self.lock:
+            return self.edit_locks.setdefault(timetable_id, threading.Lock())
+
+
+class FileTimetableStore(InMemoryTimetableStore):
+    """
+    One JSON file per timetable in a local directory, so timetables survive
+    a restart. Edits are serialized within one process; run a single server
+    process per directory.
+    """
+
+    def __init__(self, directory):
+        super().__init__()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, timetable_id):
+        # Timetable ids are uuid4 hex strings; anything else cannot name a file here
+        if not timetable_id.isalnum():
+            return None
+        return os.path.join(self.directory, f"{timetable_id}.json")
+
+    def write(self, timetable):
+        path = self.path(timetable['id'])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(json_codec.dumps(timetable))
+        os.replace(tmp_path, path)
+
+    def create(self, timetable):
+        index = TimetableIndex(timetable)
+        with self.lock:
+            self.write(timetable)
+            self.indexes[timetable['id']] = index
+        return timetable
+
+    def get(self, timetable_id):
+        path = self.path(timetable_id)
+        with self.lock:
+            if path is None or not os.path.exists(path):
+                return None
+            with open(path, "rb") as f:
+                return json_codec.loads(f.read())
+
+    def put(self, timetable):
+        timetable['updated_at'] = time.time()
+        index = TimetableIndex(timetable)
+        with self.lock:
+            self.write(timetable)
+            self.indexes[timetable['id']] = index
+        return timetable
+
+    def delete(self, timetable_id):
+        path = self.path(timetable_id)
+        with self.lock:
+            self.edit_locks.pop(timetable_id, None)
+            self.indexes.pop(timetable_id, None)
+            if path is None or not os.path.exists(path):
+                return False
+            os.remove(path)
+            return True
@@ -0,0 +1,59 @@
+import logging
+import time
+from ortools.sat.python import cp_model
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def minimal_core(model, literals, settings, deadline=None):
+    """
+    Find a minimal set of guard literals under which `model` is infeasible.
+    The literals guard groups of constraints with OnlyEnforceIf. Starting
+    from all of them, each literal is dropped in turn and kept out whenever
+    the model stays infeasible without it.
+
+    Each check fixes the literals in a copy of the model rather than
+    passing them as solver assumptions: assumptions turn presolve off, and
+    without it CP-SAT cannot even prove a plain teacher overload in time.
+    :param model: CpModel whose constraint groups are guarded by `literals`
+    :param literals: List of BoolVar
+    :param settings: SolverSettings of the checks
+    :param deadline: Wall-clock time by which the search must stop
+    :return: (positions in `literals` of the core, whether it is proven
+             minimal), or None when the model was not proved infeasible in time
+    """
+    def infeasible(candidates):
+        trial = model.Clone()
+        chosen = set(candidates)
+        for p, literal in enumerate(literals):
+            value = 1 if p in chosen else 0
+            trial.Add(trial.GetBoolVarFromProtoIndex(literal.Index()) == value)
+        status = settings.create_solver(deadline).Solve(trial)
+        if status == cp_model.INFEASIBLE:
+            return True
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return False
+        # Undecided in time
+        return None
+
+    core = list(range(len(literals)))
+    if not infeasible(core):
+        return None
+
+    minimal = True
+    position = 0
+    while position < len(core):
+        if deadline is not None and time.time() >= deadline:
+            minimal = False
+            break
+        candidate = core[:position] + core[position + 1:]
+        result = infeasible(candidate)
+        if result:
+            core = candidate
+        else:
+            # Keep the literal, also when undecided, to stay sound
+            if result is None:
+                minimal = False
+            position += 1
+    return core, minimal
@@ -0,0 +1,326 @@
+"""
+Independent check of a schedule response against its request: teacher,
+room and section double-bookings, sessions per subject against `coef`,
+session lengths and start slots (Sport double slots), room assignment and
+teacher qualification.
+
+Library:
+    from src.validator import validate_response
+    report = validate_response(request_data, schedules)
+
+Command line, from 2ndVersion/ (exit status 1 when the response is invalid):
+    python -m src.validator Data/response/1.json Data/schedule_data.json
+"""
+import argparse
+import logging
+import sys
+import time
+
+import numpy as np
+
+from src import json_codec
+from src.request_schema import LEVELS, normalize_request
+from src.schedule_index import room_prefix
+from src.time_grid import TimeGrid
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Problems a report counts, by "type"
+ISSUE_TYPES = (
+    "teacher_conflict",     # a teacher booked twice in one (day, slot)
+    "room_conflict",        # a room booked twice in one (day, slot)
+    "section_conflict",     # a section attending two sessions in one (day, slot)
+    "session_count",        # sessions of a subject other than its coef
+    "misaligned_session",   # wrong length or start slot, e.g. a Sport session off its double slot
+    "wrong_room",           # not the room assigned to the section
+    "unknown_teacher",      # no teacher of the request, e.g. "No teacher available"
+    "unqualified_teacher",  # a teacher who does not teach the subject
+    "invalid_entry",        # unknown day, slot or subject
+    "missing_section",      # a requested section without a schedule
+    "unknown_section"       # a scheduled section the request does not have
+)
+
+
+class SlotLabels:
+    """(start, length) of 1-based slot labels such as '3' or '1-2', parsed once each."""
+
+    def __init__(self, num_slots):
+        self.num_slots = num_slots
+        self.parsed = {}
+
+    def get(self, label):
+        label = str(label)
+        if label not in self.parsed:
+            first, _, last = label.partition("-")
+            try:
+                start, end = int(first) - 1, int(last or first)
+            except ValueError:
+                start, end = -1, -1
+            valid = 0 <= start < end <= self.num_slots
+            self.parsed[label] = (start, end - start) if valid else None
+        return self.parsed[label]
+
+
+class Report:
+    """Issue counts by type and the first `max_issues` issues."""
+
+    def __init__(self, max_issues):
+        self.max_issues = max_issues
+        self.counts = {}
+        self.issues = []
+        self.found = 0
+
+    def count(self, kind, count, found):
+        self.counts[kind] = self.counts.get(kind, 0) + count
+        self.found += found
+
+    def add(self, issue, count=1):
+        self.count(issue['type'], count, 1)
+        if len(self.issues) < self.max_issues:
+            self.issues.append(issue)
+
+    def room(self):
+        return self.max_issues - len(self.issues)
+
+
+def response_schedules(response):
+    """The schedules of a /generate-schedule response or of a stored timetable record."""
+    if not any(level in response for level in LEVELS) and isinstance(response.get('schedules'), dict):
+        return response['schedules']
+    return response
+
+
+def validate_response(data, schedules, max_issues=100):
+    """
+    Check a schedule response against the request it answers. Entries are
+    read once into integer arrays; double-bookings are then found by
+    counting the (owner, day, slot) cells every session holds, so the cost
+    is one pass over the entries plus a few array operations.
+    :param data: Normalized schedule request
+    :param schedules: Its response, {"middle_school": {"years": [...]}, ...}
+    :param max_issues: Issues listed at most; counts always cover all of them
+    :return: {"valid", "entries", "sections", "counts": {type: n},
+              "issues": [...], "truncated", "time"}
+    """
+    start = time.perf_counter()
+    grid = TimeGrid.from_dict(data['time_grid']) if data.get('time_grid') is not None else TimeGrid()
+    num_slots = grid.num_slots
+    week_slots = grid.week_slots
+    day_index = {day: d for d, day in enumerate(grid.days)}
+    labels = SlotLabels(num_slots)
+    report = Report(max_issues)
+
+    teacher_names = [teacher['name'] for teacher in data.get('teachers', [])]
+    teacher_index = {name: t for t, name in enumerate(teacher_names)}
+    room_names = [room['name'] for room in data.get('rooms', [])]
+    room_index = {name: r for r, name in enumerate(room_names)}
+
+    # Requested sections k and their subjects g, numbered across the request
+    sections = []           # (level, section name, expected room index or -1)
+    section_index = {}      # (level, section name) -> k
+    section_subjects = []   # k -> {lowercased subject: g}
+    subject_names = []      # g -> subject name
+    subject_section = []    # g -> k
+    coefs = []
+    lengths = []
+    start_masks = []        # g -> row of allowed starts
+    name_ids = {}           # lowercased subject -> column of the qualification matrix
+    subject_name_ids = []
+    mask_rows = {}
+    for level in LEVELS:
+        for year_entry in data.get(level, {}).get('years', []):
+            for section in year_entry.get('sections', []):
+                key = (level, section['section'])
+                if key in section_index:
+                    continue
+                section_index[key] = len(sections)
+                expected_room = room_index.get(f"{room_prefix(level)}{section['section']}", -1)
+                sections.append((level, section['section'], expected_room))
+                subjects = {}
+                for subject in section['subjects']:
+                    name = subject['name'].lower()
+                    if name in subjects:
+                        coefs[subjects[name]] += subject['coef']
+                        continue
+                    subjects[name] = len(subject_names)
+                    subject_names.append(subject['name'])
+                    subject_section.append(len(sections) - 1)
+                    coefs.append(subject['coef'])
+                    length = grid.length(subject)
+                    lengths.append(length)
+                    starts = grid.subject_starts(subject)
+                    if starts not in mask_rows:
+                        mask_rows[starts] = len(mask_rows)
+                    start_masks.append(mask_rows[starts])
+                    subject_name_ids.append(name_ids.setdefault(name, len(name_ids)))
+                section_subjects.append(subjects)
+
+    allowed_starts = np.zeros((max(len(mask_rows), 1), num_slots), dtype=bool)
+    for starts, row in mask_rows.items():
+        allowed_starts[row, list(starts)] = True
+    qualified = np.zeros((max(len(teacher_names), 1), max(len(name_ids), 1)), dtype=bool)
+    for t, teacher in enumerate(data.get('teachers', [])):
+        for subject in teacher.get('subjects', []):
+            column = name_ids.get(subject['name'].lower())
+            if column is not None:
+                qualified[t, column] = True
+
+    # One pass over the entries into parallel integer lists
+    entry_refs = []
+    ks, gs, ts, rs, ds, ss, ls = [], [], [], [], [], [], []
+    seen = set()
+    for level in LEVELS:
+        for year_entry in schedules.get(level, {}).get('years', []):
+            for section in year_entry.get('sections', []):
+                name = section.get('section')
+                k = section_index.get((level, name))
+                if k is None:
+                    report.add({"type": "unknown_section", "level": level, "section": name})
+                    continue
+                seen.add(k)
+                subjects = section_subjects[k]
+                for entry in section.get('schedule', []):
+                    d = day_index.get(entry.get('day'))
+                    span = labels.get(entry.get('slot'))
+                    g = subjects.get(str(entry.get('subject', '')).lower())
+                    if d is None or span is None or g is None:
+                        reason = "day" if d is None else "slot" if span is None else "subject"
+                        report.add({"type": "invalid_entry", "level": level, "section": name,
+                                    "reason": f"unknown {reason}", "entry": entry})
+                        continue
+                    entry_refs.append(entry)
+                    ks.append(k)
+                    gs.append(g)
+                    ts.append(teacher_index.get(entry.get('teacher'), -1))
+                    rs.append(room_index.get(entry.get('room'), -1))
+                    ds.append(d)
+                    ss.append(span[0])
+                    ls.append(span[1])
+    for k, (level, name, _) in enumerate(sections):
+        if k not in seen:
+            report.add({"type": "missing_section", "level": level, "section": name})
+
+    k = np.array(ks, dtype=np.int64)
+    g = np.array(gs, dtype=np.int64)
+    t = np.array(ts, dtype=np.int64)
+    r = np.array(rs, dtype=np.int64)
+    d = np.array(ds, dtype=np.int64)
+    s = np.array(ss, dtype=np.int64)
+    length = np.array(ls, dtype=np.int64)
+    n = len(entry_refs)
+
+    def describe(i):
+        level, name, _ = sections[k[i]]
+        return {"level": level, "section": name, "subject": entry_refs[i].get('subject'),
+                "day": entry_refs[i].get('day'), "slot": str(entry_refs[i].get('slot'))}
+
+    # Sessions per subject against coef
+    placed = np.bincount(g, minlength=len(coefs)) if n else np.zeros(len(coefs), dtype=np.int64)
+    for j in np.flatnonzero(placed != np.array(coefs, dtype=np.int64)):
+        level, name, _ = sections[subject_section[j]]
+        report.add({"type": "session_count", "level": level, "section": name, "subject": subject_names[j],
+                    "required": coefs[j], "placed": int(placed[j])})
+
+    if n:
+        # Session length and start slot
+        expected_length = np.array(lengths, dtype=np.int64)[g]
+        misaligned = (length != expected_length) | ~allowed_starts[np.array(start_masks, dtype=np.int64)[g], s]
+        for i in np.flatnonzero(misaligned):
+            report.add(dict(describe(i), type="misaligned_session", expected_length=int(expected_length[i])))
+
+        # Room assignment
+        expected_room = np.array([room for _, _, room in sections], dtype=np.int64)[k]
+        for i in np.flatnonzero((r < 0) | ((expected_room >= 0) & (r != expected_room))):
+            report.add(dict(describe(i), type="wrong_room", room=entry_refs[i].get('room'),
+                            expected=room_names[expected_room[i]] if expected_room[i] >= 0 else None))
+
+        # Teachers of the request able to teach the subject
+        for i in np.flatnonzero(t < 0):
+            report.add(dict(describe(i), type="unknown_teacher", teacher=entry_refs[i].get('teacher')))
+        known = t >= 0
+        unqualified = np.zeros(n, dtype=bool)
+        unqualified[known] = ~qualified[t[known], np.array(subject_name_ids, dtype=np.int64)[g[known]]]
+        for i in np.flatnonzero(unqualified):
+            report.add(dict(describe(i), type="unqualified_teacher", teacher=entry_refs[i].get('teacher')))
+
+        # Every (day, slot) cell held by every session: a session of
+        # length L is repeated L times with offsets 0..L-1
+        owner = np.repeat(np.arange(n), length)
+        offsets = np.arange(len(owner)) - np.repeat(np.cumsum(length) - length, length)
+        cells = d[owner] * num_slots + s[owner] + offsets
+
+        # Cells counted per (owner, cell): a count above 1 is a double-booking
+        for kind, ids, count, names in (("teacher_conflict", t, len(teacher_names), teacher_names),
+                                        ("room_conflict", r, len(room_names), room_names),
+                                        ("section_conflict", k, len(sections), None)):
+            held = ids[owner] >= 0
+            holders = owner[held]
+            keys = ids[holders] * week_slots + cells[held]
+            counts = np.bincount(keys, minlength=count * week_slots)
+            over = np.flatnonzero(counts > 1)
+            if not len(over):
+                continue
+            listed = over[:report.room()]
+            report.count(kind, int((counts[over[len(listed):]] - 1).sum()), len(over) - len(listed))
+            if not len(listed):
+                continue
+            # Holders of the listed cells grouped by cell
+            selected = np.flatnonzero(np.isin(keys, listed))
+            selected = selected[np.argsort(keys[selected], kind="stable")]
+            _, first = np.unique(keys[selected], return_index=True)
+            for cell_key, group in zip(listed, np.split(holders[selected], first[1:])):
+                day, slot = divmod(int(cell_key % week_slots), num_slots)
+                issue = {"type": kind, "day": grid.days[day], "slot": slot + 1}
+                if names is not None:
+                    issue[kind.split("_")[0]] = names[cell_key // week_slots]
+                    issue["sections"] = sorted({sections[k[i]][1] for i in group})
+                else:
+                    level, name, _ = sections[cell_key // week_slots]
+                    issue.update(level=level, section=name,
+                                 subjects=sorted(str(entry_refs[i].get('subject')) for i in group))
+                report.add(issue, int(counts[cell_key]) - 1)
+
+    return {
+        "valid": not report.counts,
+        "entries": n,
+        "sections": len(sections),
+        "counts": report.counts,
+        "issues": report.issues,
+        "truncated": report.found > len(report.issues),
+        "time": time.perf_counter() - start
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a schedule response against its request")
+    parser.add_argument("response", help="JSON response of /generate-schedule or a stored timetable")
+    parser.add_argument("request", help="JSON request the response answers")
+    parser.add_argument("--max-issues", type=int, default=20, help="Issues listed at most")
+    parser.add_argument("--json", action="store_true", help="Print the whole report as JSON")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    with open(args.request, "rb") as f:
+        data = normalize_request(json_codec.loads(f.read()))
+    with open(args.response, "rb") as f:
+        schedules = response_schedules(json_codec.loads(f.read()))
+    report = validate_response(data, schedules, max_issues=args.max_issues)
+
+    if args.json:
+        print(json_codec.dumps(report).decode("utf-8"))
+    else:
+        verdict = "valid" if report['valid'] else "INVALID"
+        print(f"{args.response}: {verdict}, {report['entries']} entries, {report['sections']} sections, "
+              f"checked in {report['time'] * 1000:.1f} ms")
+        for kind in ISSUE_TYPES:
+            if kind in report['counts']:
+                print(f"  {kind:<20}{report['counts'][kind]:>8}")
+        for issue in report['issues']:
+            print("  " + ", ".join(f"{key}={value}" for key, value in issue.items() if key != "type")
+                  + f"  [{issue['type']}]")
+    sys.exit(0 if report['valid'] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import logging
+from collections import Counter
+
+from src.time_grid import DAYS, TimeGrid
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def parse_slot_start(slot_label):
+    """'3' -> 2 and '1-2' -> 0: the 0-based start slot of a schedule entry."""
+    return int(str(slot_label).split("-")[0]) - 1
+
+
+def entry_slots(entry):
+    """0-based slots spanned by a schedule entry, e.g. '1-2' -> [0, 1]."""
+    first, _, last = str(entry['slot']).partition("-")
+    return range(int(first) - 1, int(last or first))
+
+
+def entry_key(entry, days=DAYS):
+    """
+    (lowercased subject, day index, start slot, teacher name) of a schedule
+    entry, or None when the entry cannot be placed on the grid.
+    """
+    try:
+        return (entry['subject'].lower(), days.index(entry['day']),
+                parse_slot_start(entry['slot']), entry['teacher'])
+    except (KeyError, ValueError, AttributeError):
+        return None
+
+
+def parse_previous_schedules(previous, days=DAYS):
+    """
+    Read a previous /generate-schedule response.
+    :param previous: {"middle_school": {"years": [{"sections": [{"schedule": [...]}]}]}, ...}
+    :return: {(level, section name): [entry keys]}
+    """
+    if not isinstance(previous, dict):
+        raise ValueError("'previous' must be a schedule response object")
+
+    parsed = {}
+    skipped = 0
+    for level in ('middle_school', 'high_school'):
+        for year_entry in previous.get(level, {}).get('years', []):
+            for section in year_entry.get('sections', []):
+                keys = []
+                for entry in section.get('schedule', []):
+                    key = entry_key(entry, days)
+                    if key is None:
+                        skipped += 1
+                    else:
+                        keys.append(key)
+                parsed[(level, section.get('section'))] = keys
+    if skipped:
+        logger.warning(f"Ignored {skipped} unreadable entries of the previous schedule")
+    return parsed
+
+
+def count_moved(previous_keys, schedule, days=DAYS):
+    """Number of previous entries that are not found unchanged in `schedule`."""
+    if not previous_keys:
+        return 0
+    current = Counter(entry_key(entry, days) for entry in schedule)
+    return sum((Counter(previous_keys) - current).values())
+
+
+def reuse_previous(level, section, previous_keys, index, grid=None):
+    """
+    Rebuild the previous schedule of an independently solved section when it
+    still satisfies the section model: every subject has exactly `coef`
+    sessions on valid slots, taught by a teacher of the pool who teaches it
+    and is never booked twice, and the section attends one session at a
+    time.
+    :param index: ScheduleIndex of the section's level
+    :param grid: TimeGrid of the request, the default grid when omitted
+    :return: The schedule entries, or None when the section must be re-solved
+    """
+    grid = grid if grid is not None else TimeGrid()
+    subjects = {subject['name'].lower(): subject for subject in section['subjects']}
+    demand = Counter()
+    for subject in section['subjects']:
+        demand[subject['name'].lower()] += subject['coef']
+    if not previous_keys or Counter(key[0] for key in previous_keys) != demand:
+        return None
+
+    teacher_positions = {teacher['name']: t for t, teacher in enumerate(index.teachers)}
+    busy = set()
+    for subject, d, s, teacher in previous_keys:
+        t = teacher_positions.get(teacher)
+        if t is None or t not in index.find_suitable_teachers_indices(subject):
+            return None
+        if not 0 <= d < grid.num_days or s not in grid.subject_starts(subjects[subject]):
+            return None
+        for slot in range(s, s + grid.length(subjects[subject])):
+            if (d, slot, teacher) in busy or (d, slot) in busy:
+                return None
+            busy.add((d, slot, teacher))
+            busy.add((d, slot))
+
+    room = index.get_assigned_room(level, section['section'])
+    schedule = []
+    for subject, d, s, teacher in previous_keys:
+        time_str, slot_label = grid.describe(s, grid.length(subjects[subject]))
+        schedule.append({
+            "day": grid.days[d],
+            "room": room,
+            "subject": subjects[subject]['name'],
+            "teacher": teacher,
+            "time": time_str,
+            "slot": slot_label,
+            "section": section['section'],
+            "stream": section.get('stream')
+        })
+    return schedule
@@ -0,0 +1,34 @@
+import pytest
+
+from src.schedule_quality import quality_rank, schedule_quality
+
+PLACEMENT = ("day", "slot", "subject", "teacher")
+
+
+def placements(schedule):
+    return sorted(tuple(entry[name] for name in PLACEMENT) for entry in schedule)
+
+
+def test_alternatives_are_distinct_and_ranked(client, sample):
+    response = client.post('/generate-schedule', json=dict(sample, solver={"alternatives": 3}))
+    assert response.status_code == 200
+    for level in ("middle_school", "high_school"):
+        for year_entry in response.get_json()[level]['years']:
+            for section in year_entry['sections']:
+                alternatives = section['alternatives']
+                assert 1 < len(alternatives) <= 3
+                assert placements(alternatives[0]['schedule']) == placements(section['schedule'])
+                assert len({tuple(placements(alternative['schedule'])) for alternative in alternatives}) \
+                    == len(alternatives)
+                ranks = [quality_rank(alternative['quality']) for alternative in alternatives]
+                assert ranks == sorted(ranks)
+                for alternative in alternatives:
+                    assert alternative['quality'] == schedule_quality(alternative['schedule'])
+
+
+@pytest.mark.parametrize("options", [{"solve_mode": "level"}, {"solve_mode": "lns"}, {"mode": "fast"}])
+@pytest.mark.parametrize("path", ['/generate-schedule', '/jobs'])
+def test_alternatives_outside_the_section_mode_are_rejected(client, sample, options, path):
+    response = client.post(path, json=dict(sample, solver={"alternatives": 2}, **options))
+    assert response.status_code == 400
+    assert "Alternatives" in response.get_json()['error']
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+import time
+
+from app import create_app
+from src.solver_settings import SolverSettings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_the_app_does_not_load_the_solver():
+    code = "import sys, app; app.create_app(environ={}); print(any(m.startswith('ortools') for m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+
+def test_settings_come_from_the_environment_and_config():
+    app = create_app(environ={"SCHEDULER_MAX_TIME_PER_SECTION": "3"})
+    assert app.config['SOLVER_SETTINGS'].max_time_per_section == 3
+    settings = SolverSettings(max_time_per_section=1)
+    assert create_app({"SOLVER_SETTINGS": settings}, environ={}).config['SOLVER_SETTINGS'] is settings
+
+
+def test_apps_do_not_share_state(sample):
+    first = create_app({"TESTING": True}, environ={})
+    second = create_app({"TESTING": True}, environ={})
+    assert first.extensions['scheduler'] is not second.extensions['scheduler']
+    first.test_client().post('/generate-schedule', json=dict(sample, mode="fast"))
+    assert first.test_client().get('/cache/stats').get_json() != second.test_client().get('/cache/stats').get_json()
+
+
+def test_ready_after_prewarm():
+    client = create_app({"TESTING": True}, environ={"SCHEDULER_PREWARM": "1"}).test_client()
+    deadline = time.time() + 60
+    response = client.get('/ready')
+    while response.status_code == 503:
+        assert response.get_json() == {"status": "warming"}
+        assert time.time() < deadline
+        time.sleep(0.05)
+        response = client.get('/ready')
+    assert response.get_json() == {"status": "ready"}
@@ -0,0 +1,45 @@
+import gzip
+import json
+
+import pytest
+
+from src.compact_format import COMPACT_FORMAT, COMPACT_MIMETYPE, from_compact, to_compact
+
+GRID = {"days": ["lundi", "mardi", "mercredi"],
+        "slots": [{"start": f"{8 + i}:00", "end": f"{9 + i}:00"} for i in range(6)]}
+
+
+@pytest.mark.parametrize("extra", [{}, {"solver": {"alternatives": 2}}, {"time_grid": GRID, "mode": "fast"}])
+def test_round_trip(client, sample, extra):
+    schedules = client.post('/generate-schedule', json=dict(sample, **extra)).get_json()
+    compact = to_compact(schedules)
+    assert compact['format'] == COMPACT_FORMAT
+    assert from_compact(json.loads(json.dumps(compact))) == schedules
+
+
+def test_missing_teacher_round_trips():
+    schedules = {"high_school": {"years": [{"year": 1, "sections": [{
+        "section": "1S1", "stream": "science", "status": "PARTIAL", "schedule": [
+            {"day": "lundi", "slot": "1-2", "time": "8:00 - 10:00", "subject": "Sport",
+             "teacher": None, "room": "HS_Room_1S1", "section": "1S1", "stream": "science"}]}]}]}}
+    assert from_compact(to_compact(schedules)) == schedules
+
+
+def test_other_payloads_are_rejected():
+    with pytest.raises(ValueError):
+        from_compact({"format": "compact-v0"})
+
+
+def test_compact_responses_are_smaller(client, sample):
+    default = client.post('/generate-schedule', json=sample)
+    compact = client.post('/generate-schedule?format=compact', json=sample)
+    assert compact.mimetype == COMPACT_MIMETYPE
+    assert len(compact.get_data()) < len(default.get_data()) / 2
+    assert from_compact(compact.get_json()) == default.get_json()
+
+    by_header = client.post('/generate-schedule', json=sample, headers={"Accept": COMPACT_MIMETYPE})
+    assert by_header.get_json() == compact.get_json()
+
+    zipped = client.post('/generate-schedule', json=sample, headers={"Accept-Encoding": "gzip"})
+    assert zipped.headers['Content-Encoding'] == "gzip"
+    assert json.loads(gzip.decompress(zipped.get_data())) == default.get_json()
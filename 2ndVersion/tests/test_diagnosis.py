@@ -0,0 +1,51 @@
+from src.schedule_cache import ScheduleCache
+from src.schedule_manager import ScheduleManager
+from src.solver_settings import SolverSettings
+from src.time_grid import TimeGrid
+
+# Five days of three periods: a two-period Lab fits once a day, so six Labs cannot
+GRID = TimeGrid.from_dict({
+    "days": ["d1", "d2", "d3", "d4", "d5"],
+    "slots": [{"start": "8:00", "end": "9:00"}, {"start": "9:00", "end": "10:00"},
+              {"start": "10:00", "end": "11:00"}]
+})
+TEACHERS = [{"name": "HS_Teacher_Lab_0", "subjects": [{"name": "Lab"}]},
+            {"name": "HS_Teacher_Math_0", "subjects": [{"name": "Math"}]}]
+
+
+def lab_request(*names):
+    sections = [{"section": name, "subjects": [{"name": "Lab", "coef": 6, "length": 2},
+                                               {"name": "Math", "coef": 3}]}
+                for name in names]
+    rooms = [{"name": f"HS_Room_{name}"} for name in names]
+    return {"high_school": {"years": [{"year": 1, "sections": sections}]}}, rooms
+
+
+def solve(names, cache=None):
+    data, rooms = lab_request(*names)
+    manager = ScheduleManager(data, rooms, TEACHERS, max_workers=1, cache=cache, grid=GRID,
+                              settings=SolverSettings(diagnose_infeasible=True, max_time_per_section=5))
+    return manager.generate_schedules()['high_school']['years'][0]['sections']
+
+
+def test_infeasible_section_is_explained():
+    section, = solve(["1S1"])
+    assert section['status'] == "INFEASIBLE"
+    assert section['infeasibility']['minimal']
+    types = {constraint['type'] for constraint in section['infeasibility']['constraints']}
+    assert "subject_demand" in types
+
+
+def test_identical_sections_share_a_diagnosis_without_a_section_name():
+    sections = solve(["1S1", "1L1"])
+    assert [section['status'] for section in sections] == ["INFEASIBLE", "INFEASIBLE"]
+    assert sections[0]['infeasibility'] == sections[1]['infeasibility']
+    assert "1S1" not in sections[1]['infeasibility']['reason']
+
+
+def test_cached_diagnosis_does_not_name_the_first_section():
+    cache = ScheduleCache()
+    solve(["1S1"], cache)
+    section, = solve(["1L1"], cache)
+    assert section['status'] == "INFEASIBLE"
+    assert "1S1" not in section['infeasibility']['reason']
@@ -0,0 +1,57 @@
+from src.feasibility import find_capacity_problems, level_capacity_problems
+from src.time_grid import TimeGrid
+
+# One day of four periods
+GRID = TimeGrid.from_dict({
+    "days": ["d1"],
+    "slots": [{"start": f"{8 + i}:00", "end": f"{9 + i}:00"} for i in range(4)]
+})
+
+
+def teacher(name, *subjects):
+    return {"name": name, "subjects": [{"name": subject} for subject in subjects]}
+
+
+def section(name, **coefs):
+    return (1, {"section": name, "subjects": [{"name": subject, "coef": coef} for subject, coef in coefs.items()]})
+
+
+def problem_types(sections, teachers, shared_teachers=True):
+    return sorted(problem['type'] for problem in
+                  level_capacity_problems("high_school", sections, teachers, GRID, shared_teachers))
+
+
+def test_feasible_level_has_no_problem():
+    assert problem_types([section("1S1", Math=2), section("1S2", Math=2)], [teacher("T0", "Math")]) == []
+
+
+def test_section_and_subject_problems():
+    assert problem_types([section("1S1", Math=3, Art=2)], [teacher("T0", "Math")]) \
+        == ["section_over_capacity", "subject_without_teacher"]
+    long = (1, {"section": "1S1", "subjects": [{"name": "Lab", "coef": 1, "length": 5}]})
+    assert "session_too_long" in problem_types([long], [teacher("T0", "Lab")])
+
+
+def test_shared_teacher_problems_only_apply_to_shared_models():
+    sections = [section("1S1", Math=3), section("1S2", Math=3)]
+    assert problem_types(sections, [teacher("T0", "Math")]) == ["subject_over_capacity", "teacher_over_capacity"]
+    assert problem_types(sections, [teacher("T0", "Math")], shared_teachers=False) == []
+
+    # Two teachers for three subjects: each subject fits, the group does not
+    sections = [section("1S1", Math=2, Physics=2), section("1S2", Math=2, Chemistry=2),
+                section("1S3", Physics=1, Chemistry=1)]
+    teachers = [teacher("T0", "Math", "Physics"), teacher("T1", "Physics", "Chemistry")]
+    assert problem_types(sections, teachers) == ["pool_over_capacity"]
+
+
+def test_request_problems_answer_422(client, sample):
+    sample['teachers'] = [teacher for teacher in sample['teachers']
+                          if teacher['name'] not in ("HS_Teacher_Math_0", "HS_Teacher_Math_1")]
+    levels = [("high_school", [t for t in sample['teachers'] if t['name'].startswith("HS_")])]
+    problems = find_capacity_problems(levels, sample, shared_teachers=False)
+    assert [problem['type'] for problem in problems] == ["subject_without_teacher"]
+
+    response = client.post('/generate-schedule', json=sample)
+    assert response.status_code == 422
+    assert response.get_json()['problems'] == problems
+    assert client.post('/jobs', json=sample).status_code == 422
@@ -0,0 +1,47 @@
+import copy
+
+import pytest
+
+from benchmarks.instances import generate_instance
+from src.greedy_scheduler import GreedyScheduler
+from src.request_schema import normalize_request
+from src.schedule_manager import ScheduleManager
+from src.time_grid import TimeGrid
+from src.validator import validate_response
+from src.warm_start import entry_key, entry_slots
+
+
+def level_sections(data):
+    return ScheduleManager(data, data['rooms'], data['teachers']).sections
+
+
+@pytest.mark.parametrize("arguments", [{"sections_per_year": 2},
+                                       {"sections_per_year": 3, "tightness": "tight", "multi_subject": 0.3,
+                                        "coef_jitter": 1, "seed": 4}])
+def test_fast_mode_places_every_session_without_conflicts(client, arguments):
+    data = generate_instance(**arguments)
+    response = client.post('/generate-schedule', json=dict(data, mode="fast"))
+    assert response.status_code == 200
+    report = validate_response(normalize_request(copy.deepcopy(data)), response.get_json())
+    assert report['valid'], report['issues']
+
+
+def test_placement_keys_match_the_schedules(sample):
+    sections = level_sections(sample)
+    scheduler = GreedyScheduler(sections, sample['rooms'])
+    schedules = scheduler.generate_schedules()
+    assert scheduler.status == "FEASIBLE" and sum(scheduler.unplaced) == 0
+    for schedule, keys in zip(schedules, scheduler.placement_keys()):
+        assert sorted(entry_key(entry) for entry in schedule) == sorted(keys)
+
+
+def test_sessions_that_do_not_fit_are_left_out(sample):
+    grid = TimeGrid.from_dict({"days": ["lundi", "mardi"],
+                               "slots": [{"start": f"{8 + i}:00", "end": f"{9 + i}:00"} for i in range(8)]})
+    scheduler = GreedyScheduler(level_sections(sample), sample['rooms'], grid=grid)
+    schedules = scheduler.generate_schedules()
+    assert scheduler.status == "PARTIAL"
+    assert scheduler.stats['unplaced'] == sum(scheduler.unplaced) > 0
+    for schedule in schedules:
+        cells = [(entry['day'], slot) for entry in schedule for slot in entry_slots(entry)]
+        assert len(cells) == len(set(cells)) <= grid.week_slots
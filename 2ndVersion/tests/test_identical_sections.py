@@ -0,0 +1,47 @@
+import copy
+
+from src.request_schema import normalize_request
+from src.validator import validate_response
+
+
+def with_copies(sample, count=3):
+    """The first high-school section and `count` identical copies of it, named 1S10, 1S11, ..."""
+    year_entry = sample['high_school']['years'][0]
+    first = year_entry['sections'][0]
+    for i in range(count):
+        name = f"1S1{i}"
+        year_entry['sections'].append(dict(copy.deepcopy(first), section=name))
+        sample['rooms'].append({"name": f"HS_Room_{name}"})
+    return sample
+
+
+def copies_of(body, count=3):
+    sections = {section['section']: section for section in body['high_school']['years'][0]['sections']}
+    return [sections['1S1']] + [sections[f"1S1{i}"] for i in range(count)]
+
+
+def placements(section):
+    return sorted((entry['day'], entry['slot'], entry['subject'], entry['teacher']) for entry in section['schedule'])
+
+
+def test_identical_sections_share_one_model(client, sample):
+    with_copies(sample)
+    body = client.post('/generate-schedule', json=dict(sample, diagnostics=True, cache=False)).get_json()
+    copies = copies_of(body)
+    for section in copies:
+        assert {entry['section'] for entry in section['schedule']} == {section['section']}
+        assert {entry['room'] for entry in section['schedule']} == {f"HS_Room_{section['section']}"}
+        assert placements(section) == placements(copies[0])
+    sections = body['diagnostics']['sections']
+    assert body['diagnostics']['stats']['models'] <= len(sections) - 3
+
+
+def test_diverse_sections_get_their_own_timetables(client, sample):
+    with_copies(sample)
+    request = dict(sample, solve_mode="section", solver={"diverse_sections": True}, cache=False)
+    body = client.post('/generate-schedule', json=request).get_json()
+    copies = copies_of(body)
+    assert len({tuple(placements(section)) for section in copies}) == len(copies)
+    assert {section['status'] for section in copies} <= {"OPTIMAL", "FEASIBLE"}
+    report = validate_response(normalize_request(copy.deepcopy(request)), body)
+    assert set(report['counts']) <= {"teacher_conflict"}, report['issues']
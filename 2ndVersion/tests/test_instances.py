@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.instances import COEF_PROFILES, count_sessions, generate_instance, weekly_slots
+from benchmarks.run_benchmarks import check_schedules
+from src.request_schema import normalize_request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_same_arguments_give_the_same_instance():
+    arguments = {"sections_per_year": 2, "coef_jitter": 1, "multi_subject": 0.5, "seed": 7}
+    assert generate_instance(**arguments) == generate_instance(**arguments)
+    assert generate_instance(**arguments) != generate_instance(**dict(arguments, seed=8))
+
+
+def test_instance_shape():
+    data = normalize_request(generate_instance(sections_per_year=3, levels=("high_school",)))
+    sections = [section for year_entry in data['high_school']['years'] for section in year_entry['sections']]
+    assert "middle_school" not in data
+    assert len(data['rooms']) == len(sections) == 3 * len(data['high_school']['years'])
+    assert all(section['stream'] in ("science", "litterature") for section in sections)
+    assert count_sessions(data) == len(sections) * (sum(COEF_PROFILES["standard"].values()) + 1)
+
+
+def test_loose_supply_doubles_the_tight_one():
+    tight = generate_instance(sections_per_year=4, tightness="tight")
+    loose = generate_instance(sections_per_year=4, tightness="loose")
+    assert len(loose['teachers']) == 2 * len(tight['teachers'])
+    assert len(generate_instance(teachers_per_subject=3, levels=("middle_school",))['teachers']) \
+        == 3 * (len(COEF_PROFILES["standard"]) + 1)
+
+
+@pytest.mark.parametrize("arguments", [{"coef_profile": "extreme"}, {"tightness": "medium"},
+                                       {"coef_profile": "heavy", "days": 2}])
+def test_invalid_arguments_are_rejected(arguments):
+    with pytest.raises(ValueError):
+        generate_instance(**arguments)
+
+
+def test_weekly_slots_count_sport_twice():
+    assert weekly_slots([{"name": "Math", "coef": 3}, {"name": "Sport", "coef": 2}]) == 7
+
+
+def test_check_schedules_counts_sessions_and_conflicts(client):
+    data = generate_instance(sections_per_year=1)
+    schedules = client.post('/generate-schedule', json=dict(data, mode="fast")).get_json()
+    quality = check_schedules(data, schedules)
+    assert quality == {"sessions_required": count_sessions(data), "sessions_placed": count_sessions(data),
+                       "teacher_conflicts": 0, "section_conflicts": 0}
+
+    section = schedules['high_school']['years'][0]['sections'][0]
+    section['schedule'].append(dict(section['schedule'][0]))
+    quality = check_schedules(data, schedules)
+    assert quality['teacher_conflicts'] >= 1 and quality['section_conflicts'] >= 1
+
+
+def test_generator_does_not_load_the_solver():
+    code = "import sys, benchmarks.instances; print(any(m.startswith('ortools') for m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+import app as app_module
+from src.job_runner import JobRunner, QueueFullError
+from src.job_store import FileJobStore, InMemoryJobStore, new_job
+from src.schedule_manager import ScheduleCancelled, ScheduleManager
+
+
+def wait(store, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = store.get(job_id)
+        if job['status'] in ("done", "failed", "cancelled"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+@pytest.mark.parametrize("kind", ["memory", "file"])
+def test_job_lifecycle(tmp_path, kind):
+    store = InMemoryJobStore() if kind == "memory" else FileJobStore(str(tmp_path))
+
+    def work(progress_callback, cancel_event):
+        progress_callback(2, 2)
+        return {"answer": 42}
+
+    job = JobRunner(store).submit(work, total=2)
+    assert job['status'] == "queued"
+    job = wait(store, job['id'])
+    assert job['status'] == "done"
+    assert job['progress'] == {"done": 2, "total": 2}
+    assert job['result'] == {"answer": 42}
+
+    failing = JobRunner(store).submit(lambda progress_callback, cancel_event: 1 / 0)
+    assert wait(store, failing['id'])['status'] == "failed"
+
+
+def test_file_store_rejects_foreign_ids(tmp_path):
+    store = FileJobStore(str(tmp_path))
+    store.create(new_job())
+    assert store.get("../escape") is None
+
+
+def test_queue_limit_and_cancellation():
+    store = InMemoryJobStore()
+    runner = JobRunner(store, max_workers=1, max_queue=2)
+    release = threading.Event()
+
+    def work(progress_callback, cancel_event):
+        release.wait(10)
+        if cancel_event.is_set():
+            raise ScheduleCancelled("cancelled")
+        return {}
+
+    running = runner.submit(work)
+    queued = runner.submit(work)
+    with pytest.raises(QueueFullError):
+        runner.submit(work)
+
+    assert runner.cancel(queued['id'])['status'] == "cancelled"
+    runner.cancel(running['id'])
+    release.set()
+    assert wait(store, running['id'])['status'] == "cancelled"
+    assert runner.cancel("unknown") is None
+
+
+def test_cancelled_manager_stops(sample):
+    cancel_event = threading.Event()
+    cancel_event.set()
+    manager = ScheduleManager(sample, sample['rooms'], sample['teachers'], max_workers=1,
+                              cancel_event=cancel_event)
+    with pytest.raises(ScheduleCancelled):
+        manager.generate_schedules()
+
+
+def test_job_api_matches_the_synchronous_response(client, sample):
+    expected = client.post('/generate-schedule', json=sample).get_json()
+
+    response = client.post('/jobs', json=sample)
+    assert response.status_code == 202
+    job_id = response.get_json()['id']
+    deadline = time.time() + 60
+    job = client.get(f"/jobs/{job_id}").get_json()
+    while job['status'] not in ("done", "failed", "cancelled"):
+        assert time.time() < deadline
+        time.sleep(0.05)
+        job = client.get(f"/jobs/{job_id}").get_json()
+    assert job['status'] == "done"
+    assert job['result'] == expected
+    assert job['progress']['done'] == job['progress']['total']
+
+    assert client.get("/jobs/unknown").status_code == 404
+    assert client.delete("/jobs/unknown").status_code == 404
+    assert client.post('/jobs', json={"rooms": []}).status_code == 400
+
+
+def test_unexpected_submit_errors_answer_500(client, sample, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(app_module, "create_schedule_manager", fail)
+    response = client.post('/jobs', json=sample)
+    assert response.status_code == 500
+    assert "disk full" in response.get_json()['error']
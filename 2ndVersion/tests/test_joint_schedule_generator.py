@@ -0,0 +1,41 @@
+from src.joint_schedule_generator import JointScheduleGenerator
+from src.solver_settings import SolverSettings
+from src.time_grid import TimeGrid
+from src.warm_start import entry_slots
+
+# One day of four periods shared by every section of a single Math teacher
+GRID = TimeGrid.from_dict({
+    "days": ["d1"],
+    "slots": [{"start": f"{8 + i}:00", "end": f"{9 + i}:00"} for i in range(4)]
+})
+TEACHERS = [{"name": "HS_Teacher_Math_0", "subjects": [{"name": "Math"}]},
+            {"name": "HS_Teacher_Art_0", "subjects": [{"name": "Art"}]}]
+
+
+def math_sections(names, coef, subject="Math"):
+    sections = [("high_school", 1, {"section": name, "subjects": [{"name": subject, "coef": coef}]}, TEACHERS)
+                for name in names]
+    rooms = [{"name": f"HS_Room_{name}"} for name in names]
+    return sections, rooms
+
+
+def solve(sections, rooms):
+    generator = JointScheduleGenerator(sections, rooms, grid=GRID,
+                                       settings=SolverSettings(max_time_per_section=10))
+    return generator, generator.generate_schedules()
+
+
+def test_shared_teacher_is_never_double_booked():
+    generator, schedules = solve(*math_sections(["1S1", "1S2"], coef=2))
+    assert generator.status == "OPTIMAL"
+    cells = [(entry['day'], slot) for schedule in schedules for entry in schedule for slot in entry_slots(entry)]
+    assert len(cells) == 4
+    assert len(set(cells)) == 4
+    assert {entry['teacher'] for schedule in schedules for entry in schedule} == {"HS_Teacher_Math_0"}
+
+
+def test_shared_teacher_over_capacity_is_infeasible():
+    generator, schedules = solve(*math_sections(["1S1", "1S2"], coef=3))
+    assert generator.status == "INFEASIBLE"
+    assert schedules == [[], []]
+
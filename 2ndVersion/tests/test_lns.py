@@ -0,0 +1,60 @@
+import copy
+
+from src.lns import LnsScheduler
+from src.request_schema import normalize_request
+from src.schedule_manager import ScheduleManager
+from src.solver_settings import SolverSettings
+from src.validator import validate_response
+from src.warm_start import entry_slots
+
+
+def test_lns_warm_start_drops_teachers_removed_from_the_pool(client, sample):
+    previous = client.post('/generate-schedule', json=dict(sample, mode="fast")).get_json()
+    sample['teachers'] = [teacher for teacher in sample['teachers']
+                          if teacher['name'] != "HS_Teacher_Math_0"]
+
+    response = client.post('/generate-schedule',
+                           json=dict(sample, solve_mode="lns", previous=previous))
+    assert response.status_code == 200
+    body = response.get_json()
+    report = validate_response(normalize_request(copy.deepcopy(sample)), body)
+    assert report['counts'].get('unknown_teacher', 0) == 0, report['issues']
+    assert report['valid'], report['issues']
+    assert all(entry['teacher'] != "HS_Teacher_Math_0"
+               for year_entry in body['high_school']['years']
+               for section in year_entry['sections'] for entry in section['schedule'])
+
+
+def test_lns_repairs_an_empty_start(sample):
+    sections = ScheduleManager(sample, sample['rooms'], sample['teachers']).sections
+    scheduler = LnsScheduler(sections, sample['rooms'], settings=SolverSettings(random_seed=1),
+                             initial=[[] for _ in sections])
+    schedules = scheduler.generate_schedules()
+    assert scheduler.section_statuses == ["FEASIBLE"] * len(sections)
+    assert scheduler.stats['missing'] == 0 < scheduler.stats['initial_missing']
+    curve = [point['missing'] for point in scheduler.curve]
+    assert curve == sorted(curve, reverse=True)
+    cells = [(entry['teacher'], entry['day'], slot) for schedule in schedules
+             for entry in schedule for slot in entry_slots(entry)]
+    assert len(cells) == len(set(cells))
+
+
+def test_lns_drops_clashing_start_entries(sample):
+    sections = ScheduleManager(sample, sample['rooms'], sample['teachers']).sections
+    key = ("math", 0, 0, "HS_Teacher_Math_0")
+    positions = [k for k, section in enumerate(sections) if section[0] == "high_school"][:2]
+    initial = [[key] if k in positions else [] for k in range(len(sections))]
+    scheduler = LnsScheduler(sections, sample['rooms'], initial=initial, max_iterations=0)
+    scheduler.generate_schedules()
+    assert scheduler.stats['dropped'] == 1
+
+
+def test_lns_warm_start_drops_slots_off_the_grid(client, sample):
+    previous = client.post('/generate-schedule', json=dict(sample, mode="fast")).get_json()
+    entry = previous['high_school']['years'][0]['sections'][0]['schedule'][0]
+    entry['slot'] = "9"
+
+    response = client.post('/generate-schedule', json=dict(sample, solve_mode="lns", previous=previous))
+    assert response.status_code == 200
+    report = validate_response(normalize_request(copy.deepcopy(sample)), response.get_json())
+    assert report['valid'], report['issues']
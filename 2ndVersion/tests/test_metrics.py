@@ -0,0 +1,43 @@
+from src.metrics import MetricsRegistry
+
+
+def test_registry_renders_the_prometheus_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", labels=("code",))
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    registry.add_collector(lambda: [("entries", "gauge", "Entries", 3)])
+    registry.add_collector(lambda: 1 / 0)
+
+    requests.inc(code=200)
+    requests.inc(2, code='5"0')
+    latency.observe(0.5)
+    lines = registry.render().splitlines()
+
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{code="200"} 1' in lines
+    assert 'requests_total{code="5\\"0"} 2' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 0' in lines
+    assert 'latency_seconds_bucket{le="1.0"} 1' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 1' in lines
+    assert "latency_seconds_sum 0.5" in lines
+    assert "latency_seconds_count 1" in lines
+    assert "entries 3" in lines
+
+
+def test_diagnostics_and_metrics_endpoint(client, sample):
+    response = client.post('/generate-schedule', json=dict(sample, diagnostics=True, cache=False))
+    assert response.status_code == 200
+    assert "solve;dur=" in response.headers['Server-Timing']
+    diagnostics = response.get_json()['diagnostics']
+    assert diagnostics['solve_mode'] == "section" and not diagnostics['request_cache_hit']
+    assert diagnostics['stats']['models'] >= 1
+    assert {"parse", "solve", "total"} <= set(diagnostics['timings'])
+    assert len(diagnostics['sections']) == sum(len(year_entry['sections'])
+                                               for level in ("middle_school", "high_school")
+                                               for year_entry in sample[level]['years'])
+    assert "diagnostics" not in client.post('/generate-schedule', json=sample).get_json()
+
+    metrics = client.get('/metrics').get_data(as_text=True)
+    assert 'scheduler_requests_total{endpoint="/generate-schedule",code="200"} 2' in metrics
+    assert 'scheduler_sections_total{status="OPTIMAL",source="solver"}' in metrics
+    assert "scheduler_cache_hits_total" in metrics
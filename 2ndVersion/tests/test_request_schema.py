@@ -0,0 +1,48 @@
+import copy
+import json
+import sys
+
+import pytest
+
+from src import json_codec
+from src.request_schema import normalize_request
+
+
+def test_codec_round_trip(sample):
+    payload = json_codec.dumps(sample, sort_keys=True)
+    assert json_codec.loads(payload) == sample
+    assert json_codec.loads(payload.decode("utf-8")) == sample
+    assert payload == json.dumps(sample, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    with pytest.raises(ValueError):
+        json_codec.loads(b"{not json")
+
+
+def test_valid_request_is_kept_and_interned(sample):
+    data = normalize_request(copy.deepcopy(sample))
+    assert data == sample
+    subject = data['high_school']['years'][0]['sections'][0]['subjects'][0]['name']
+    assert subject is sys.intern(subject)
+
+
+@pytest.mark.parametrize("change,path", [
+    (lambda data: data['teachers'][3]['subjects'][0].pop('name'), "teachers[3].subjects[0].name"),
+    (lambda data: data['teachers'].__setitem__(1, "HS_Teacher_Math_0"), "teachers[1]"),
+    (lambda data: data['rooms'][0].__setitem__('name', ""), "rooms[0].name"),
+    (lambda data: data['high_school']['years'][0]['sections'][1]['subjects'][2].__setitem__('coef', True),
+     "high_school.years[0].sections[1].subjects[2].coef"),
+    (lambda data: data['middle_school']['years'][0]['sections'][0].__setitem__('section', 3),
+     "middle_school.years[0].sections[0].section"),
+    (lambda data: data['high_school'].__setitem__('years', {}), "high_school.years"),
+])
+def test_malformed_records_name_their_path(client, sample, change, path):
+    change(sample)
+    with pytest.raises(ValueError, match=path.replace("[", r"\[").replace("]", r"\]")):
+        normalize_request(copy.deepcopy(sample))
+    response = client.post('/generate-schedule', json=sample)
+    assert response.status_code == 400
+    assert path in response.get_json()['error']
+
+
+def test_malformed_body_is_rejected(client):
+    response = client.post('/generate-schedule', data=b"{not json", content_type="application/json")
+    assert response.status_code == 400
@@ -0,0 +1,73 @@
+import copy
+
+import pytest
+
+from app import create_app
+from src.request_schema import normalize_request
+from src.scenarios import build_scenarios
+
+
+def test_scenarios_are_compared_with_the_base(client, sample):
+    last_year = sample['high_school']['years'][-1]
+    extra = dict(copy.deepcopy(last_year['sections'][0]), section="9S9")
+    scenarios = [
+        {"name": "more math", "changes": [{"op": "set_coef", "level": "high_school", "section": "1S1",
+                                           "subject": "Math", "coef": 5}]},
+        {"name": "new section", "changes": [{"op": "add_section", "level": "high_school",
+                                             "year": last_year['year'], "section": extra},
+                                            {"op": "add_room", "room": {"name": "HS_Room_9S9"}}]},
+        {"name": "no math", "changes": [{"op": "remove_teacher", "name": "HS_Teacher_Math_0"},
+                                        {"op": "remove_teacher", "name": "HS_Teacher_Math_1"}]},
+    ]
+    response = client.post('/scenarios', json={"base": sample, "scenarios": scenarios})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['base']['summary']['feasible']
+    more_math, new_section, no_math = body['scenarios']
+
+    assert more_math['summary']['feasible']
+    assert {"level": "high_school", "section": "1S1", "change": "changed"} in more_math['summary']['changed_sections']
+    assert sum(entry['subject'] == "Math" for year_entry in more_math['schedules']['high_school']['years']
+               for section in year_entry['sections'] if section['section'] == "1S1"
+               for entry in section['schedule']) == 5
+    assert more_math['summary']['sources'].get('cache', 0) > 0
+
+    assert new_section['summary']['changed_sections'] == [
+        {"level": "high_school", "section": "9S9", "change": "added"}]
+
+    assert not no_math['summary']['feasible']
+    assert no_math['schedules'] is None
+    assert no_math['summary']['problems'][0]['type'] == "subject_without_teacher"
+
+
+def test_schedules_can_be_left_out(client, sample):
+    body = client.post('/scenarios?schedules=0', json={"base": sample, "scenarios": [{"name": "same"}]}).get_json()
+    assert "schedules" not in body['base'] and "schedules" not in body['scenarios'][0]
+    assert body['scenarios'][0]['summary']['changed_sections'] == []
+
+
+@pytest.mark.parametrize("scenarios,path", [
+    ([{"name": "base"}], "scenarios[0].name"),
+    ([{"name": "a"}, {"name": "a"}], "scenarios[1].name"),
+    ([{"changes": [{"op": "rename"}]}], "scenarios[0].changes[0].op"),
+    ([{"changes": [{"op": "remove_section", "level": "high_school", "section": "9Z9"}]}],
+     "scenarios[0].changes[0]"),
+    ([{"changes": [{"op": "set_coef", "level": "high_school", "subject": "Math", "coef": -1}]}],
+     "scenarios[0].changes[0].coef"),
+])
+def test_invalid_scenarios_are_rejected(client, sample, scenarios, path):
+    with pytest.raises(ValueError, match=path.replace("[", r"\[").replace("]", r"\]")):
+        build_scenarios(normalize_request(copy.deepcopy(sample)), scenarios)
+    assert client.post('/scenarios', json={"base": sample, "scenarios": scenarios}).status_code == 400
+
+
+def test_scenario_limit(sample):
+    client = create_app({"TESTING": True}, environ={"SCHEDULER_MAX_SCENARIOS": "1"}).test_client()
+    response = client.post('/scenarios', json={"base": sample, "scenarios": [{"name": "a"}, {"name": "b"}]})
+    assert response.status_code == 400
+    assert client.post('/scenarios', json={"scenarios": []}).status_code == 400
+
+
+@pytest.mark.parametrize("body", [[1], "base", {"base": [1]}])
+def test_bodies_without_a_base_object_are_rejected(client, body):
+    assert client.post('/scenarios', json=body).status_code == 400
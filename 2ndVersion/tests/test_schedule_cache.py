@@ -0,0 +1,37 @@
+import pytest
+
+from src.schedule_cache import ScheduleCache
+from src.schedule_manager import ScheduleManager
+from src.solver_settings import SolverSettings
+
+
+def solve(data, cache, **kwargs):
+    progress = []
+    manager = ScheduleManager(data, data['rooms'], data['teachers'], max_workers=1, cache=cache,
+                              settings=SolverSettings(max_time_per_section=10),
+                              progress_callback=lambda done, total: progress.append((done, total)),
+                              **kwargs)
+    return manager, manager.generate_schedules(), progress
+
+
+@pytest.mark.parametrize("options", [{}, {"solve_mode": "level"}, {"mode": "fast"}])
+def test_request_cache_hit_matches_the_miss(sample, options):
+    cache = ScheduleCache()
+    manager, miss, _ = solve(sample, cache, **options)
+    assert not manager.request_cache_hit
+
+    manager, hit, progress = solve(sample, cache, **options)
+    assert manager.request_cache_hit
+    assert hit == miss
+    assert progress == [(len(manager.sections), len(manager.sections))]
+
+
+def test_section_cache_serves_other_requests(sample):
+    cache = ScheduleCache()
+    _, miss, _ = solve(sample, cache)
+    del sample['middle_school']
+
+    manager, hit, _ = solve(sample, cache)
+    assert not manager.request_cache_hit
+    assert {section['source'] for section in manager.diagnostics()['sections']} == {"cache"}
+    assert hit['high_school'] == miss['high_school']
@@ -0,0 +1,52 @@
+from collections import Counter
+
+import pytest
+
+from src.schedule_generator import ScheduleGenerator
+from src.warm_start import entry_slots
+
+
+def level_teachers(data, level):
+    prefix = "MS_Teacher_" if level == "middle_school" else "HS_Teacher_"
+    return [teacher for teacher in data['teachers'] if teacher['name'].startswith(prefix)]
+
+
+def sample_sections(data):
+    for level in ("middle_school", "high_school"):
+        for year_entry in data[level]['years']:
+            for section in year_entry['sections']:
+                yield level, year_entry['year'], section
+
+
+@pytest.mark.parametrize("formulation", ["sessions", "compact"])
+def test_formulation_schedules_every_session_without_overlap(sample, formulation):
+    level, year, section = next(sample_sections(sample))
+    generator = ScheduleGenerator(level, year, section, sample['rooms'], level_teachers(sample, level),
+                                  formulation=formulation)
+    schedule = generator.generate_schedule()
+
+    assert generator.status == "OPTIMAL"
+    placed = Counter(entry['subject'] for entry in schedule)
+    assert placed == Counter({subject['name']: subject['coef'] for subject in section['subjects']})
+    section_cells = Counter((entry['day'], slot) for entry in schedule for slot in entry_slots(entry))
+    teacher_cells = Counter((entry['teacher'], entry['day'], slot)
+                            for entry in schedule for slot in entry_slots(entry))
+    assert max(section_cells.values()) == 1
+    assert max(teacher_cells.values()) == 1
+
+
+def test_compact_formulation_is_smaller(sample):
+    level, year, section = next(sample_sections(sample))
+    teachers = level_teachers(sample, level)
+    sizes = {}
+    for formulation in ("sessions", "compact"):
+        generator = ScheduleGenerator(level, year, section, sample['rooms'], teachers, formulation=formulation)
+        generator.build_model()
+        sizes[formulation] = generator.stats['variables']
+    assert sizes['compact'] < sizes['sessions']
+
+
+def test_unknown_formulation_is_rejected(sample):
+    level, year, section = next(sample_sections(sample))
+    with pytest.raises(ValueError):
+        ScheduleGenerator(level, year, section, sample['rooms'], [], formulation="bogus")
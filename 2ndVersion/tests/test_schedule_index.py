@@ -0,0 +1,20 @@
+from src.schedule_index import ScheduleIndex
+
+TEACHERS = [{"name": "HS_Teacher_Math_0", "subjects": [{"name": "Math"}, {"name": "math"}]},
+            {"name": "HS_Teacher_Physics_0", "subjects": [{"name": "Physics"}, {"name": "Math"}]},
+            {"name": "HS_Teacher_Math_1", "subjects": [{"name": "MATH"}]}]
+ROOMS = [{"name": "HS_Room_1S1"}, {"name": "MS_Room_1S1"}]
+
+
+def test_teachers_by_subject_ignore_case_and_keep_pool_order():
+    index = ScheduleIndex(ROOMS, TEACHERS)
+    assert index.find_suitable_teachers_indices("Math") == [0, 1, 2]
+    assert index.find_suitable_teachers_indices("physics") == [1]
+    assert index.find_suitable_teachers_indices("Art") == []
+
+
+def test_rooms_follow_the_level_prefix():
+    index = ScheduleIndex(ROOMS, TEACHERS)
+    assert index.get_assigned_room("high_school", "1S1") == "HS_Room_1S1"
+    assert index.get_assigned_room("middle_school", "1S1") == "MS_Room_1S1"
+    assert index.get_assigned_room("high_school", "2S1") is None
@@ -0,0 +1,36 @@
+import pytest
+
+from src.schedule_manager import ScheduleManager, find_components
+from src.solver_pool import shutdown_pool
+
+TEACHERS = [{"name": "HS_Teacher_Math_0", "subjects": [{"name": "Math"}]},
+            {"name": "HS_Teacher_Art_0", "subjects": [{"name": "Art"}]}]
+
+
+def section(name, subject):
+    return ("high_school", 1, {"section": name, "subjects": [{"name": subject, "coef": 1}]}, TEACHERS)
+
+
+def sections_of(schedules):
+    return [(level, year_entry['year'], section['section'], section['status'])
+            for level in ("middle_school", "high_school")
+            for year_entry in schedules[level]['years'] for section in year_entry['sections']]
+
+
+def test_components_split_on_teachers():
+    sections = [section("1S1", "Math"), section("1S2", "Math"), section("1S3", "Art"), section("1S4", "Math")]
+    components = find_components(sections)
+    assert sorted(sorted(component) for component in components) == [[0, 1, 3], [2]]
+
+
+@pytest.mark.parametrize("solve_mode", ["section", "level"])
+def test_process_pool_keeps_the_input_order(sample, solve_mode):
+    inline = ScheduleManager(sample, sample['rooms'], sample['teachers'], solve_mode=solve_mode, max_workers=1)
+    pooled = ScheduleManager(sample, sample['rooms'], sample['teachers'], solve_mode=solve_mode, max_workers=2)
+    try:
+        expected = sections_of(inline.generate_schedules())
+        assert sections_of(pooled.generate_schedules()) == expected
+    finally:
+        shutdown_pool()
+    assert {status for _, _, _, status in expected} <= {"OPTIMAL", "FEASIBLE"}
+
@@ -0,0 +1,46 @@
+import pytest
+
+from src.solver_settings import SolverSettings
+
+
+def test_environment_defaults():
+    settings = SolverSettings.from_env({"SCHEDULER_MAX_TIME_PER_SECTION": "2.5",
+                                        "SCHEDULER_NUM_SEARCH_WORKERS": "4",
+                                        "SCHEDULER_RETURN_BEST_FEASIBLE": "no"})
+    assert settings.max_time_per_section == 2.5
+    assert settings.num_workers == 4
+    assert settings.return_best_feasible is False
+    assert SolverSettings.from_env({}).to_dict() == SolverSettings().to_dict()
+
+
+def test_requests_never_exceed_the_server_time_limits():
+    server = SolverSettings(max_time_per_section=10, max_time_per_request=60)
+    assert server.merge({"max_time_per_section": 30}).max_time_per_section == 10
+    assert server.merge({"max_time_per_section": 3}).max_time_per_section == 3
+    assert server.merge({"max_time_per_request": None}).max_time_per_request == 60
+    assert SolverSettings().merge({"max_time_per_section": 30}).max_time_per_section == 30
+
+
+@pytest.mark.parametrize("overrides", [{"bogus": 1}, {"num_workers": "many"},
+                                       {"max_time_per_section": -1}, []])
+def test_invalid_overrides_are_rejected(overrides):
+    with pytest.raises(ValueError):
+        SolverSettings().merge(overrides)
+
+
+def test_solver_parameters():
+    solver = SolverSettings(max_time_per_section=7, num_workers=2, random_seed=3).create_solver()
+    assert solver.parameters.max_time_in_seconds == 7
+    assert solver.parameters.num_workers == 2
+    assert solver.parameters.random_seed == 3
+
+
+def test_api_overrides(client, sample):
+    response = client.post('/generate-schedule', json=dict(sample, solver={"bogus": 1}))
+    assert response.status_code == 400
+
+    response = client.post('/generate-schedule', json=dict(sample, solver={"max_time_per_request": 0}, cache=False))
+    assert response.status_code == 200
+    statuses = {section['status'] for year_entry in response.get_json()['high_school']['years']
+                for section in year_entry['sections']}
+    assert statuses == {"TIMEOUT"}
@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+
+def sections_by_name(schedules):
+    return {(level, year_entry['year'], section['section']): section
+            for level in ("middle_school", "high_school")
+            for year_entry in schedules[level]['years'] for section in year_entry['sections']}
+
+
+@pytest.mark.parametrize("query,headers", [("?stream=1", {}), ("", {"Accept": "application/x-ndjson"})])
+def test_stream_has_one_line_per_section_then_a_summary(client, sample, query, headers):
+    expected = sections_by_name(client.post('/generate-schedule', json=sample).get_json())
+
+    response = client.post(f'/generate-schedule{query}', json=sample, headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    *sections, summary = lines
+    assert summary['summary']['sections'] == len(expected) == len(sections)
+    assert sum(summary['summary']['statuses'].values()) == len(expected)
+    for section in sections:
+        assert section['schedule'] == expected[(section['level'], section['year'], section['section'])]['schedule']
+
+
+def test_rejected_request_is_not_streamed(client, sample):
+    sample['teachers'] = [teacher for teacher in sample['teachers'] if not teacher['name'].startswith("HS_")]
+    response = client.post('/generate-schedule?stream=1', json=sample)
+    assert response.status_code == 422
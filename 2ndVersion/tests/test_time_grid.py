@@ -0,0 +1,57 @@
+import copy
+
+import pytest
+
+from src.request_schema import normalize_request
+from src.time_grid import TimeGrid
+from src.validator import validate_response
+
+# Half-hour periods, two blocks a day, hour-long sessions
+HALF_HOURS = {
+    "days": ["mon", "tue", "wed", "thu", "fri", "sat"],
+    "slots": [{"start": f"{h}:{m:02d}", "end": f"{h + (m + 30) // 60}:{(m + 30) % 60:02d}"}
+              for h, m in [(8 + i // 2, 30 * (i % 2)) for i in range(8)]]
+             + [{"start": f"{h}:{m:02d}", "end": f"{h + (m + 30) // 60}:{(m + 30) % 60:02d}"}
+                for h, m in [(14 + i // 2, 30 * (i % 2)) for i in range(6)]],
+    "session_length": 2
+}
+
+
+def test_default_grid_keeps_the_historical_sport_slots():
+    grid = TimeGrid()
+    assert grid.subject_starts({"name": "Sport"}) == (0, 2, 4, 6)
+    assert grid.subject_starts({"name": "Math"}) == tuple(range(8))
+    assert grid.describe(2, 2) == ("10:00 - 12:00", "3-4")
+
+
+def test_sessions_never_span_a_break():
+    grid = TimeGrid.from_dict(HALF_HOURS)
+    assert grid.week_slots == 6 * 14
+    assert grid.subject_starts({"name": "Math"}) == (0, 2, 4, 6, 8, 10, 12)
+    assert grid.subject_starts({"name": "Sport"}) == (0, 4, 8)
+    assert grid.subject_starts({"name": "Lab", "length": 3}) == (0, 2, 4, 8, 10)
+    assert TimeGrid.from_dict(grid.to_dict()).to_dict() == grid.to_dict()
+
+
+@pytest.mark.parametrize("value", [[], {"days": []}, {"days": ["a", "a"]}, {"hours": 3},
+                                   {"slots": [{"start": "9:00", "end": "8:00"}]},
+                                   {"slots": [{"start": "8:00", "end": "9:00"}, {"start": "8:30", "end": "9:30"}]},
+                                   {"slots": [{"start": "25:00", "end": "26:00"}]}, {"session_length": 0}])
+def test_invalid_grids_are_rejected(client, sample, value):
+    with pytest.raises(ValueError):
+        TimeGrid.from_dict(value)
+    assert client.post('/generate-schedule', json=dict(sample, time_grid=value)).status_code == 400
+
+
+@pytest.mark.parametrize("options", [{}, {"formulation": "sessions"}, {"solve_mode": "level"}, {"mode": "fast"}])
+def test_custom_grid_schedules_are_valid(client, sample, options):
+    request = dict(sample, time_grid=HALF_HOURS, **options)
+    response = client.post('/generate-schedule', json=request)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['time_grid'] == TimeGrid.from_dict(HALF_HOURS).to_dict()
+    report = validate_response(normalize_request(copy.deepcopy(request)), body)
+    section_mode = "solve_mode" not in options and "mode" not in options
+    assert set(report['counts']) <= ({"teacher_conflict"} if section_mode else set()), report['issues']
+    assert {entry['day'] for year_entry in body['high_school']['years']
+            for section in year_entry['sections'] for entry in section['schedule']} <= set(HALF_HOURS['days'])
@@ -0,0 +1,80 @@
+import app as app_module
+
+
+def store(client, sample):
+    response = client.post('/timetables', json=sample)
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def test_edit_bumps_the_version_and_stale_edits_conflict(client, sample):
+    timetable = store(client, sample)
+    teacher = next(entry['teacher'] for year_entry in timetable['schedules']['high_school']['years']
+                   for section in year_entry['sections'] for entry in section['schedule'])
+    change = {"op": "teacher_unavailable", "teacher": teacher, "day": "lundi", "slots": [1, 2]}
+
+    response = client.post(f"/timetables/{timetable['id']}/edits",
+                           json={"changes": [change], "version": timetable['version']})
+    assert response.status_code == 200
+    edit = response.get_json()
+    assert edit['version'] == timetable['version'] + 1
+
+    stored = client.get(f"/timetables/{timetable['id']}").get_json()
+    assert stored['version'] == edit['version']
+    assert not client.get(f"/timetables/{timetable['id']}/teachers/{teacher}?day=lundi&slot=1").get_json()['entries']
+
+    response = client.post(f"/timetables/{timetable['id']}/edits",
+                           json={"changes": [change], "version": timetable['version']})
+    assert response.status_code == 409
+    assert response.get_json()['version'] == edit['version']
+
+
+def test_edit_errors(client, sample):
+    timetable = store(client, sample)
+    assert client.post("/timetables/missing/edits", json={"changes": []}).status_code == 404
+    response = client.post(f"/timetables/{timetable['id']}/edits", json={"changes": [{"op": "rename"}]})
+    assert response.status_code == 400
+
+
+def test_unexpected_errors_answer_500(client, sample, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    timetable = store(client, sample)
+    monkeypatch.setattr(app_module, "edit_timetable", fail)
+    response = client.post(f"/timetables/{timetable['id']}/edits", json={"changes": []})
+    assert response.status_code == 500
+    assert "disk full" in response.get_json()['error']
+
+    monkeypatch.setattr(app_module, "new_timetable", fail)
+    response = client.post('/timetables', json=sample)
+    assert response.status_code == 500
+    assert "disk full" in response.get_json()['error']
+
+
+def test_edit_repairs_an_unsolved_section(client):
+    # One Lab teacher gives at most one two-period Lab a day: five of the
+    # six Labs of the two sections fit the week
+    grid = {"days": ["d1", "d2", "d3", "d4", "d5"],
+            "slots": [{"start": f"{8 + i}:00", "end": f"{9 + i}:00"} for i in range(3)]}
+    sections = [{"section": name, "subjects": [{"name": "Lab", "coef": 3, "length": 2}]}
+                for name in ("1S1", "1S2")]
+    request = {"high_school": {"years": [{"year": 1, "sections": sections}]},
+               "teachers": [{"name": "HS_Teacher_Lab_0", "subjects": [{"name": "Lab"}]}],
+               "rooms": [{"name": "HS_Room_1S1"}, {"name": "HS_Room_1S2"}], "time_grid": grid}
+    timetable = store(client, request)
+    statuses = [section['status'] for section in timetable['schedules']['high_school']['years'][0]['sections']]
+    assert statuses == ["INFEASIBLE", "INFEASIBLE"]
+
+    # An unrelated edit keeps them as they are
+    change = {"op": "teacher_unavailable", "teacher": "HS_Teacher_Lab_0", "day": "d1", "slots": [3]}
+    assert client.post(f"/timetables/{timetable['id']}/edits", json={"changes": [change]}).status_code == 200
+
+    change = {"op": "add_teacher", "teacher": {"name": "HS_Teacher_Lab_1", "subjects": [{"name": "Lab"}]}}
+    response = client.post(f"/timetables/{timetable['id']}/edits", json={"changes": [change]})
+    assert response.status_code == 200
+    assert response.get_json()['resolved_sections'] == 2
+    stored = client.get(f"/timetables/{timetable['id']}").get_json()
+    for section in stored['schedules']['high_school']['years'][0]['sections']:
+        assert section['status'] in ("OPTIMAL", "FEASIBLE")
+        assert len(section['schedule']) == 3
@@ -0,0 +1,67 @@
+import pytest
+
+from src.time_grid import DAYS
+from src.timetable_index import TimetableIndex
+from src.warm_start import entry_slots
+
+
+@pytest.fixture
+def stored(client, sample):
+    response = client.post('/timetables', json=sample)
+    assert response.status_code == 201
+    return response.get_json()
+
+
+def all_entries(schedules):
+    return [dict(entry, level=level) for level in ("middle_school", "high_school")
+            for year_entry in schedules[level]['years']
+            for section in year_entry['sections'] for entry in section['schedule']]
+
+
+def test_lookup_returns_exactly_the_matching_entries(stored, sample):
+    index = TimetableIndex({"id": stored['id'], "version": stored['version'],
+                            "schedules": stored['schedules'], "request": sample})
+    entries = all_entries(stored['schedules'])
+    sport = next(entry for entry in entries if len(entry_slots(entry)) > 1)
+    teacher, day = sport['teacher'], sport['day']
+
+    expected = [entry for entry in entries if entry['teacher'] == teacher]
+    assert len(index.lookup("teacher", teacher)) == len(expected)
+    on_day = index.lookup("teacher", teacher, day=day)
+    assert on_day == [entry for entry in index.lookup("teacher", teacher) if entry['day'] == day]
+    for slot in entry_slots(sport):
+        assert sport['subject'] in [entry['subject']
+                                    for entry in index.lookup("teacher", teacher, day=day, slot=slot + 1)]
+    assert len(index.lookup("day", day)) == len([entry for entry in entries if entry['day'] == day])
+    assert len(index.lookup("section", sport['section'], level=sport['level'])) == len(
+        [entry for entry in entries if entry['section'] == sport['section'] and entry['level'] == sport['level']])
+
+
+def test_unknown_teacher_is_told_apart_from_a_free_one(stored, sample):
+    index = TimetableIndex({"id": stored['id'], "version": stored['version'],
+                            "schedules": stored['schedules'], "request": sample})
+    assert index.knows("teacher", sample['teachers'][0]['name'])
+    assert not index.knows("teacher", "Nobody")
+
+
+def test_query_routes(client, stored):
+    entries = all_entries(stored['schedules'])
+    room, day = entries[0]['room'], entries[0]['day']
+    response = client.get(f"/timetables/{stored['id']}/rooms/{room}?day={day}")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['version'] == stored['version'] and body['day'] == day
+    assert len(body['entries']) == len([entry for entry in entries
+                                        if entry['room'] == room and entry['day'] == day])
+
+    assert client.get(f"/timetables/{stored['id']}/rooms/Nowhere").status_code == 404
+    assert client.get(f"/timetables/{stored['id']}/floors/{room}").status_code == 404
+    assert client.get(f"/timetables/missing/rooms/{room}").status_code == 404
+    assert client.get(f"/timetables/{stored['id']}/rooms/{room}?slot=2").status_code == 400
+    assert client.get(f"/timetables/{stored['id']}/rooms/{room}?day={day}&slot=99").status_code == 400
+
+
+def test_day_view_rejects_another_day(client, stored):
+    response = client.get(f"/timetables/{stored['id']}/days/{DAYS[0]}?day={DAYS[1]}")
+    assert response.status_code == 400
+    assert client.get(f"/timetables/{stored['id']}/days/{DAYS[0]}?day={DAYS[0]}").status_code == 200
@@ -0,0 +1,94 @@
+import copy
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app import create_app
+from src import json_codec
+from src.request_schema import normalize_request
+from src.validator import validate_response
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Request options and the issues they may leave: the section solve mode
+# solves every section on its own, so only it may double-book a teacher
+MODES = [
+    ({"formulation": "sessions"}, {"teacher_conflict"}),
+    ({"formulation": "compact"}, {"teacher_conflict"}),
+    ({"formulation": "interval"}, {"teacher_conflict"}),
+    ({"solve_mode": "level"}, set()),
+    ({"solve_mode": "school"}, set()),
+    ({"solve_mode": "lns"}, set()),
+    ({"mode": "fast"}, set()),
+]
+
+
+def sections_of(schedules):
+    return [section for level in ("middle_school", "high_school")
+            for year_entry in schedules[level]['years'] for section in year_entry['sections']]
+
+
+@pytest.fixture
+def fast_response(client, sample):
+    return client.post('/generate-schedule', json=dict(sample, mode="fast")).get_json()
+
+
+@pytest.mark.parametrize("options,allowed", MODES)
+def test_every_mode_passes_the_validator(client, sample, options, allowed):
+    response = client.post('/generate-schedule', json=dict(sample, **options))
+    assert response.status_code == 200
+    report = validate_response(normalize_request(copy.deepcopy(sample)), response.get_json())
+    assert set(report['counts']) <= allowed, report['issues']
+
+
+def test_double_booking_is_reported(sample, fast_response):
+    section = sections_of(fast_response)[0]
+    section['schedule'].append(dict(section['schedule'][0]))
+
+    report = validate_response(normalize_request(sample), fast_response)
+    assert not report['valid']
+    for kind in ("teacher_conflict", "room_conflict", "section_conflict", "session_count"):
+        assert report['counts'][kind] >= 1
+
+
+def test_entry_problems_are_reported(sample, fast_response):
+    schedule = sections_of(fast_response)[0]['schedule']
+    sport = next(entry for entry in schedule if entry['subject'] == "Sport")
+    sport['slot'] = "2-3"
+    others = [entry for entry in schedule if entry is not sport]
+    others[0]['teacher'] = "No teacher available"
+    others[1]['room'] = "Elsewhere"
+
+    report = validate_response(normalize_request(sample), fast_response)
+    for kind in ("misaligned_session", "unknown_teacher", "wrong_room"):
+        assert report['counts'][kind] == 1
+
+
+def test_missing_section_and_truncated_issues(sample, fast_response):
+    fast_response['high_school']['years'].pop()
+    report = validate_response(normalize_request(sample), fast_response, max_issues=1)
+    assert report['counts']['missing_section'] >= 2
+    assert len(report['issues']) == 1
+    assert report['truncated']
+
+
+def test_command_line_exit_status(tmp_path, sample, fast_response):
+    request_path = tmp_path / "request.json"
+    request_path.write_bytes(json_codec.dumps(sample))
+    response_path = tmp_path / "response.json"
+    response_path.write_bytes(json_codec.dumps(fast_response))
+    command = [sys.executable, "-m", "src.validator", str(response_path), str(request_path)]
+    assert subprocess.run(command, cwd=ROOT, capture_output=True).returncode == 0
+
+    sections_of(fast_response)[0]['schedule'].pop()
+    response_path.write_bytes(json_codec.dumps(fast_response))
+    assert subprocess.run(command, cwd=ROOT, capture_output=True).returncode == 1
+
+
+def test_post_solve_guard_reports_in_diagnostics(sample):
+    client = create_app({"TESTING": True}, environ={"SCHEDULER_VALIDATE_RESPONSES": "1"}).test_client()
+    body = client.post('/generate-schedule', json=dict(sample, mode="fast", diagnostics=True)).get_json()
+    assert body['diagnostics']['validation']['valid']
+    assert "validate" in body['diagnostics']['timings']
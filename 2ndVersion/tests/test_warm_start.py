@@ -0,0 +1,62 @@
+import copy
+
+from src.request_schema import normalize_request
+from src.schedule_index import ScheduleIndex
+from src.validator import validate_response
+from src.warm_start import count_moved, entry_key, entry_slots, parse_previous_schedules, reuse_previous
+
+
+def sections_of(schedules):
+    return [section for level in ("middle_school", "high_school")
+            for year_entry in schedules[level]['years'] for section in year_entry['sections']]
+
+
+def test_entry_helpers():
+    entry = {"subject": "Sport", "day": "mardi", "slot": "3-4", "teacher": "HS_Teacher_Sport_0"}
+    assert list(entry_slots(entry)) == [2, 3]
+    assert entry_key(entry) == ("sport", 1, 2, "HS_Teacher_Sport_0")
+    assert entry_key(dict(entry, day="someday")) is None
+    assert count_moved([entry_key(entry)], [dict(entry, slot="5-6")]) == 1
+
+
+def test_unchanged_request_keeps_every_entry(client, sample):
+    previous = client.post('/generate-schedule', json=sample).get_json()
+    response = client.post('/generate-schedule', json=dict(sample, previous=previous, cache=False))
+    assert response.status_code == 200
+    for section in sections_of(response.get_json()):
+        assert section['moved'] == 0
+
+
+def test_removed_teacher_moves_only_its_entries(client, sample):
+    previous = client.post('/generate-schedule', json=dict(sample, solve_mode="level")).get_json()
+    sample['teachers'] = [teacher for teacher in sample['teachers'] if teacher['name'] != "HS_Teacher_Math_0"]
+    request = dict(sample, solve_mode="level", previous=previous, minimize_changes=True)
+    body = client.post('/generate-schedule', json=request).get_json()
+
+    report = validate_response(normalize_request(copy.deepcopy(sample)), body)
+    assert report['valid'], report['issues']
+    removed = sum(entry['teacher'] == "HS_Teacher_Math_0"
+                  for section in sections_of(previous) for entry in section['schedule'])
+    assert sum(section['moved'] for section in sections_of(body)) >= removed > 0
+
+
+def test_overlapping_previous_entries_are_not_reused(client, sample):
+    previous = client.post('/generate-schedule', json=sample).get_json()
+    section = sample['high_school']['years'][0]['sections'][0]
+    teachers = [teacher for teacher in sample['teachers'] if teacher['name'].startswith("HS_Teacher_")]
+    index = ScheduleIndex(sample['rooms'], teachers)
+    keys = parse_previous_schedules(previous)[("high_school", section['section'])]
+    assert reuse_previous("high_school", section, keys, index) is not None
+
+    # The first single-slot session moved onto another teacher's session
+    first = next(i for i, key in enumerate(keys) if key[0] != "sport")
+    other = next(key for key in keys if key[0] != "sport" and key[3] != keys[first][3])
+    keys[first] = (keys[first][0], other[1], other[2], keys[first][3])
+    assert reuse_previous("high_school", section, keys, index) is None
+
+
+def test_malformed_previous_is_rejected(client, sample):
+    response = client.post('/generate-schedule', json=dict(sample, previous=[1, 2]))
+    assert response.status_code == 400
+    assert parse_previous_schedules({"high_school": {"years": [{"sections": [
+        {"section": "1S1", "schedule": [{"day": "someday", "slot": "1"}]}]}]}}) == {("high_school", "1S1"): []}
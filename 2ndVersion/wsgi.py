@@ -0,0 +1,8 @@
+"""
+Production entry point for a WSGI server, run from 2ndVersion/:
+    SCHEDULER_PREWARM=1 gunicorn --workers 2 --timeout 300 wsgi:app
+Route traffic to a process once GET /ready answers 200.
+"""
+from app import create_app
+
+app = create_app()